@@ -0,0 +1,47 @@
+"""
+Run an app as python -m finance <provider> <dataset> [arguments].
+
+The provider packages (and their API clients) are only imported when their apps are used.
+"""
+import argparse
+import typing
+import sys
+
+
+import finance.helpers
+import finance.apps
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    epilog: str = '\n'.join(f'  {p} {d}' for p, datasets in finance.apps.APPS.items() for d in datasets)
+    parser = argparse.ArgumentParser(prog='python -m finance', description=__doc__, epilog='apps:\n' + epilog,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('provider', choices=list(finance.apps.APPS), help='the data provider')
+    parser.add_argument('dataset', help='the dataset of the provider')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='the arguments of the app')
+    opts: argparse.Namespace = parser.parse_args(args=args)
+    if opts.dataset not in finance.apps.APPS[opts.provider]:
+        parser.error(f'unknown dataset for {opts.provider}: {opts.dataset}')
+
+    return opts
+
+
+def main(args=None):
+    """
+    Run the app for the provider and dataset.
+    """
+    args: list = list(args if args is not None else sys.argv[1:])
+    profile: typing.Union[str, None] = finance.helpers.pop_option(args, '--profile')
+    cprofile: typing.Union[str, None] = finance.helpers.pop_option(args, '--cprofile')
+    opts: argparse.Namespace = get_arguments(args)
+
+    app = finance.apps.load(opts.provider, opts.dataset)
+    finance.helpers.run(app.main, lambda: app.get_arguments(opts.args), profile=profile, cprofile=cprofile)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,18 +7,57 @@ import typing
 import os
 
 
-import dotenv
+import finance.throttle
+
+
+def flag(value: str) -> bool:
+    """
+    Parse an on/off environment variable, anything but 0 is on.
+    """
+    return str(value) != '0'
 
 
 @dataclasses.dataclass()
 class BaseConfig:
     """
     The finance configuration.
+
+    The settings that are not given are read from the environment variables of __settings__, after the
+    environment file of the working directory was loaded.
     """
+    #: The environment variable, default value and type of each setting
+    __settings__: typing.ClassVar[typing.Dict[str, tuple]] = {
+        'cache_format': ('FINANCE_CACHE_FORMAT', 'json', str),
+        'rate': ('FINANCE_RATE', 10, float),
+        'burst': ('FINANCE_BURST', 10, int),
+        'shared_rate': ('FINANCE_SHARED_RATE', '0', flag),
+        'warehouse': ('FINANCE_WAREHOUSE', '0', flag),
+        'archive': ('FINANCE_ARCHIVE', '1', flag),
+        'snapshots': ('FINANCE_SNAPSHOTS', '0', flag),
+        'priority': ('FINANCE_PRIORITY', 'interactive', str),
+    }
+
     #: The working directory
     workdir: str = dataclasses.field(default_factory=lambda: os.getcwd())
     #: The path to the personal capital environment files
     environ: str = dataclasses.field(init=False, default='.env')
+    #: The format of the cache files (yaml, json, msgpack or parquet)
+    cache_format: str = None
+    #: The sustained number of API requests per second
+    rate: float = None
+    #: The number of API requests that can be sent at once
+    burst: int = None
+    #: Share the rate limits with the other processes of the working directory (cache/throttle.sqlite)?
+    #: Every token is a write transaction, so it is opt-in (the batch app turns it on).
+    shared_rate: bool = None
+    #: Store the scraped objects in the warehouse (warehouse.sqlite)? It slows down every fetch, so it is opt-in.
+    warehouse: bool = None
+    #: Write (and memory map) a columnar archive of the dataframes of the archived scrapers (requires pyarrow)?
+    archive: bool = None
+    #: Store the daily snapshots (holdings and accounts) as full snapshots and deltas, instead of daily files?
+    snapshots: bool = None
+    #: The priority of the API requests (interactive or background)
+    priority: str = None
     #: The time at configuration creation
     dt: datetime.datetime = dataclasses.field(
         init=False, default_factory=lambda: datetime.datetime.now(tz=datetime.timezone.utc))
@@ -37,14 +76,22 @@ class BaseConfig:
         return path
 
     def __post_init__(self):
+        import dotenv
         self.environ = os.path.join(self.workdir, self.environ)
         dotenv.load_dotenv(verbose=True, dotenv_path=self.environ)
 
+        for name, (variable, default, kind) in self.__settings__.items():
+            if getattr(self, name) is None:
+                setattr(self, name, kind(os.environ.get(variable, default)))
+
 
 class BaseHandler:
     """
     Handler to create a REST session.
     """
+    #: The name of the provider, the handlers of a provider share one request scheduler
+    __provider__: str = 'finance'
+
     def __init__(self, config: typing.Union[None, BaseConfig]):
         self._obj_config: BaseConfig = config
 
@@ -61,3 +108,21 @@ class BaseHandler:
         API client session instance.
         """
         raise NotImplementedError
+
+    @property
+    def scheduler(self) -> finance.throttle.Scheduler:
+        """
+        The request scheduler of the provider, shared with the other processes of the working directory.
+        """
+        path: typing.Union[str, None] = None
+        if self.config.shared_rate:
+            path: str = os.path.join(os.path.abspath(self.config.workdir), 'cache', 'throttle.sqlite')
+
+        return finance.throttle.scheduler(self.__provider__, self.config.rate, self.config.burst, path=path)
+
+    @property
+    def priority(self) -> int:
+        """
+        The priority of the requests of the handler.
+        """
+        return finance.throttle.PRIORITIES[self.config.priority]
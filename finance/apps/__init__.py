@@ -0,0 +1,68 @@
+"""
+The registry of command line apps, imported only when they are used.
+"""
+import importlib
+import types
+import typing
+
+
+#: The module of each app, keyed by provider and dataset
+APPS: typing.Dict[str, typing.Dict[str, str]] = {
+    'pcap': {
+        'histories': 'finance.pcap.apps.histories',
+        'holdings': 'finance.pcap.apps.holdings',
+        'marketvalue': 'finance.pcap.apps.marketvalue',
+        'transactions': 'finance.pcap.apps.transactions',
+    },
+    'ynab': {
+        'accounts': 'finance.ynab.apps.accounts',
+        'budgets': 'finance.ynab.apps.budgets',
+        'transactions': 'finance.ynab.apps.transactions',
+    },
+    'cache': {
+        'migrate': 'finance.apps.migrate',
+        'catalog': 'finance.apps.catalog',
+        'prune': 'finance.apps.prune',
+        'snapshots': 'finance.apps.snapshots',
+    },
+    'warehouse': {
+        'load': 'finance.apps.warehouse',
+        'query': 'finance.apps.query',
+    },
+    'batch': {
+        'run': 'finance.apps.batch',
+    },
+    'bench': {
+        'scrapers': 'finance.apps.bench',
+    },
+}
+
+#: The API handler class of each provider
+HANDLERS: typing.Dict[str, str] = {
+    'pcap': 'finance.pcap.api.PCAPHandler',
+    'ynab': 'finance.ynab.api.YNABHandler',
+}
+
+
+def load(provider: str, dataset: str) -> types.ModuleType:
+    """
+    Import the app module for the provider and dataset.
+
+    The module has a get_arguments(args) function and a main(**kwargs) function.
+    """
+    try:
+        return importlib.import_module(APPS[provider][dataset])
+    except KeyError:
+        raise KeyError(f'unknown app: {provider} {dataset}')
+
+
+def handler(provider: str) -> typing.Union[typing.Any, None]:
+    """
+    Create an API handler for the provider, or None if the provider does not use one.
+    """
+    try:
+        module, name = HANDLERS[provider].rsplit('.', 1)
+    except KeyError:
+        return None
+
+    return getattr(importlib.import_module(module), name)(config=None)
@@ -0,0 +1,100 @@
+"""
+A script to run many exports from a job file, sharing one API session per provider.
+
+The job file is a YAML mapping with a list of jobs.
+
+    workers: 4
+    priority: background
+    shared_rate: true
+    jobs:
+      - app: pcap holdings
+      - app: pcap transactions
+        args: ['--t0', '2020-01-01', '--dt', '30']
+      - app: ynab accounts
+        args: ['--budget-id', 'last-used']
+
+Each job names an app (as given to python -m finance) and its command line arguments.
+The jobs are run concurrently, and every job of a provider uses the same API handler,
+so the provider is authenticated at most once per run.
+The API requests of the jobs are sent with the given priority (background by default),
+so that interactive runs of the same provider are served first.
+The rate limits are shared with the other processes of the working directory (unless shared_rate is false),
+since batches are often run concurrently, from a scheduler, next to interactive runs.
+"""
+import concurrent.futures
+import argparse
+import logging
+import typing
+
+
+import yaml
+
+
+import finance.helpers
+import finance.apps
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('jobs', type=str, help='the YAML job file')
+    parser.add_argument('--workers', default=None, type=int, help='the maximum number of concurrent jobs')
+    return parser.parse_args(args=args)
+
+
+def run_job(job: dict, handlers: typing.Dict[str, typing.Any]) -> int:
+    """
+    Run one job with the shared handler of its provider.
+
+    Returns:
+        The exitcode, which is >= 0 if the job succeeded.
+    """
+    provider, dataset = job['app'].split()
+
+    # noinspection PyBroadException
+    try:
+        app = finance.apps.load(provider, dataset)
+        kwargs: dict = app.get_arguments([str(arg) for arg in job.get('args', [])]).__dict__
+        if handlers.get(provider) is not None:
+            kwargs['handler'] = handlers[provider]
+        app.main(**kwargs)
+    except Exception:
+        logging.exception('job failed: %s', job['app'])
+        return -1
+    else:
+        return 0
+
+
+def main(jobs: str, workers: int = None):
+    """
+    Run the jobs from the job file.
+    """
+    with open(jobs, 'r') as stream:
+        spec: dict = yaml.load(stream, yaml.SafeLoader)
+
+    jobs: list = spec.get('jobs', [])
+    workers: int = workers if workers is not None else spec.get('workers', 4)
+
+    handlers: dict = {}
+    for job in jobs:
+        provider, dataset = job['app'].split()
+        finance.apps.load(provider, dataset)
+        if provider not in handlers:
+            handlers[provider] = finance.apps.handler(provider)
+            if handlers[provider] is not None:
+                handlers[provider].config.priority = spec.get('priority', 'background')
+                handlers[provider].config.shared_rate = bool(spec.get('shared_rate', True))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        exitcodes: list = list(executor.map(lambda job: run_job(job, handlers), jobs))
+
+    failed: list = [job['app'] for job, exitcode in zip(jobs, exitcodes) if exitcode < 0]
+    if failed:
+        raise RuntimeError(f'{len(failed)} of {len(jobs)} jobs failed: {", ".join(failed)}')
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
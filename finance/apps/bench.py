@@ -0,0 +1,197 @@
+"""
+A script to benchmark the scrapers offline, against synthetic Personal Capital and YNAB clients.
+
+Each scraper is timed through the stages fetch (a forced reload, which also writes the cache), reload (from
+the cache), objects, frame and export, all through the public scraper methods, and the peak memory allocated
+in each stage is traced. The results are saved as JSON, and can be compared to the results of an earlier run.
+
+    python -m finance bench scrapers --scale 0.01 --output bench.json
+    python -m finance bench scrapers --scale 0.01 --compare bench.json
+"""
+import tracemalloc
+import argparse
+import datetime
+import tempfile
+import platform
+import logging
+import typing
+import json
+import time
+import os
+
+
+import finance.helpers
+import finance.memo
+import finance.fake
+
+
+def measure(results: list, scraper: str, stage: str, func: typing.Callable[[], int]):
+    """
+    Time the stage and trace its peak memory, and add the result to the list.
+
+    Parameters:
+        results: The list of results.
+        scraper: The name of the scraper.
+        stage: The name of the stage.
+        func: The stage, which returns the number of rows it handled.
+    """
+    # restart the tracing, so the peak is that of the stage alone
+    tracemalloc.stop()
+    tracemalloc.start()
+
+    start: float = time.perf_counter()
+    try:
+        rows: int = func()
+        seconds: float = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    results.append({
+        'scraper': scraper, 'stage': stage, 'rows': rows, 'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else None, 'peak_bytes': peak,
+    })
+    logging.debug('%-20s %-8s %9d rows %8.3fs %10.1f MiB', scraper, stage, rows, seconds, peak / 2 ** 20)
+
+
+def bench_scraper(results: list, name: str, create: typing.Callable[..., typing.Any], export: str):
+    """
+    Benchmark the stages of one scraper.
+
+    Parameters:
+        results: The list of results.
+        name: The name of the scraper.
+        create: Create a new instance of the scraper, given the force key word argument.
+        export: The path of the exported file.
+    """
+    scrapers: list = [create(force=True)]
+
+    def fetch() -> int:
+        return len(scrapers[0].reload().data)
+
+    def reload() -> int:
+        finance.memo.frames.clear()
+        scrapers[0] = create(force=False).reload()
+        return len(scrapers[0].data)
+
+    def frame() -> int:
+        finance.memo.invalidate(scrapers[0], 'frame')
+        finance.memo.frames.clear()
+        return len(scrapers[0].frame)
+
+    measure(results, name, 'fetch', fetch)
+    measure(results, name, 'reload', reload)
+    measure(results, name, 'objects', lambda: len(scrapers[0].objects))
+    measure(results, name, 'frame', frame)
+    measure(results, name, 'export', lambda: len(scrapers[0].save(export, debug=False).frame))
+
+
+def bench_histories(results: list, handler, start: datetime.datetime, years: int, workers: int):
+    """
+    Benchmark the daily histories of many years, and the months derived from them.
+    """
+    import finance.pcap.planner
+
+    days: list = [(start + datetime.timedelta(days=i), 1) for i in range(365 * years)]
+    months: list = []
+    for year in range(start.year, start.year + years):
+        for month in range(1, 13):
+            t0 = datetime.datetime(year, month, 1) - datetime.timedelta(days=1)
+            t1 = datetime.datetime(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+            if t0 >= start and t1 <= days[-1][0] + datetime.timedelta(days=1):
+                months.append((t0, (t1 - t0).days))
+
+    fetched = finance.pcap.planner.IntervalPlanner(handler=handler, force=True)
+    planner = finance.pcap.planner.IntervalPlanner(handler=handler)
+    measure(results, 'pcap histories', 'fetch', lambda: sum(len(f) for f in fetched.frames(days, workers=workers)))
+    finance.memo.frames.clear()
+    measure(results, 'pcap histories', 'reload', lambda: sum(len(f) for f in planner.frames(days, workers=workers)))
+    measure(results, 'pcap histories', 'derive', lambda: sum(len(f) for f in planner.frames(months, workers=workers)))
+
+
+def compare_results(results: list, path: str):
+    """
+    Log the ratio of the time and peak memory of each stage to those of an earlier run.
+    """
+    with open(path, 'r') as stream:
+        earlier: dict = {(r['scraper'], r['stage']): r for r in json.load(stream).get('results', [])}
+
+    for result in results:
+        other: typing.Union[dict, None] = earlier.get((result['scraper'], result['stage']))
+        if other is None or not other['seconds'] or not other['peak_bytes']:
+            continue
+
+        logging.debug('%-20s %-8s time x%.2f memory x%.2f', result['scraper'], result['stage'],
+                      result['seconds'] / other['seconds'], result['peak_bytes'] / other['peak_bytes'])
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default=1.0, type=float, help='the fraction of the full size datasets')
+    parser.add_argument('--years', default=5, type=int, help='the number of years of histories')
+    parser.add_argument('--workers', default=4, type=int, help='the maximum number of concurrent API calls')
+    parser.add_argument('--workdir', default=None, type=str, help='the working directory (temporary by default)')
+    parser.add_argument('--output', default='bench.json', type=str, help='the JSON file to save the results to')
+    parser.add_argument('--compare', default=None, type=str, help='the JSON results of an earlier run')
+    return parser.parse_args(args=args)
+
+
+def main(scale: float, years: int, workers: int, workdir: str, output: str, compare: str = None):
+    """
+    Benchmark the scrapers against synthetic clients at 1M transactions, 10k holdings and many years of histories.
+    """
+    import pandas as pd
+
+    import finance.pcap.scrapers
+    import finance.pcap.api
+    import finance.ynab.scrapers
+    import finance.ynab.api
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        workdir: str = workdir if workdir is not None else tempdir
+        export: str = os.path.join(workdir, 'export', '{name}.csv')
+        os.makedirs(os.path.dirname(export), exist_ok=True)
+
+        start: datetime.datetime = datetime.datetime(2015, 1, 1)
+        end: datetime.datetime = start + datetime.timedelta(days=365 * years)
+
+        # no rate limits against the synthetic clients
+        pcap = finance.pcap.api.PCAPHandler(finance.pcap.api.PCAPConfig(workdir=workdir, rate=1e9, burst=10 ** 6))
+        ynab = finance.ynab.api.YNABHandler(finance.ynab.api.YNABConfig(workdir=workdir, rate=1e9, burst=10 ** 6))
+        finance.fake.install_pcap(pcap, transactions=int(1_000_000 * scale), holdings=int(10_000 * scale),
+                                  start=start.date(), end=end.date())
+        finance.fake.install_ynab(ynab, transactions=int(100_000 * scale), start=start.date())
+
+        results: list = []
+        bench_scraper(results, 'pcap holdings',
+                      lambda **kwargs: finance.pcap.scrapers.HoldingsScraper(pcap, **kwargs),
+                      export.format(name='pcap-holdings'))
+        bench_scraper(results, 'pcap transactions',
+                      lambda **kwargs: finance.pcap.scrapers.TransactionsScraper(
+                          pcap, t0=start, dt=(end - start).days, hot=0, **kwargs),
+                      export.format(name='pcap-transactions'))
+        bench_scraper(results, 'ynab transactions',
+                      lambda **kwargs: finance.ynab.scrapers.TransactionsScraper(ynab, budget_id='Budget 0', **kwargs),
+                      export.format(name='ynab-transactions'))
+        bench_histories(results, pcap, start, years, workers)
+
+    report: dict = {
+        'meta': {
+            'dt': datetime.datetime.now(tz=datetime.timezone.utc).isoformat(), 'scale': scale, 'years': years,
+            'python': platform.python_version(), 'pandas': pd.__version__, 'cache_format': pcap.config.cache_format,
+        },
+        'results': results,
+    }
+    with open(output, 'w') as stream:
+        json.dump(report, stream, indent=1)
+
+    if compare is not None:
+        compare_results(results, compare)
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
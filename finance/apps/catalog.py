@@ -0,0 +1,48 @@
+"""
+A script to list the entries of the cache catalog.
+
+    python -m finance cache catalog --provider pcap --scraper HistoriesScraper --start 2025-01-01 --end 2025-12-31
+"""
+import argparse
+import datetime
+import logging
+
+
+import finance.catalog
+import finance.helpers
+
+
+from finance.helpers import yyyy_mm_dd
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workdir', default='.', type=str, help='the working directory of the cache')
+    parser.add_argument('--provider', default=None, type=str, help='only the entries of the provider')
+    parser.add_argument('--scraper', default=None, type=str, help='only the entries of the scraper class')
+    parser.add_argument('--start', default=None, type=yyyy_mm_dd, help='only the intervals that start on or after')
+    parser.add_argument('--end', default=None, type=yyyy_mm_dd, help='only the intervals that end on or before')
+    return parser.parse_args(args=args)
+
+
+def main(workdir: str, provider: str, scraper: str, start: datetime.datetime, end: datetime.datetime):
+    """
+    Log the entries of the cache catalog, oldest first.
+    """
+    catalog: finance.catalog.Catalog = finance.catalog.of(workdir)
+    entries: list = catalog.entries(provider=provider, scraper=scraper, start=start, end=end)
+
+    for entry in entries:
+        logging.debug('%-40s %-5s %-20s %-10s %-10s %s %10d %s', entry.key, entry.provider, entry.scraper,
+                      entry.t0 or '', entry.t1 or '', datetime.datetime.fromtimestamp(entry.fetched).isoformat(
+                          timespec='seconds'), entry.size, entry.hash)
+
+    logging.debug('%d entries (%d bytes)', len(entries), sum(e.size for e in entries))
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
@@ -0,0 +1,53 @@
+"""
+A script to rewrite the cache directory in a different cache format.
+"""
+import argparse
+import logging
+import os
+
+
+import finance.helpers
+import finance.store
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cache', default='cache', type=str, help='the cache directory to migrate')
+    parser.add_argument('--format', dest='name', default='json', choices=list(finance.store.FORMATS), type=str)
+    parser.add_argument('--keep', action='store_true', help='keep the original cache files?')
+    return parser.parse_args(args=args)
+
+
+def main(cache: str, name: str, keep: bool):
+    """
+    Rewrite every known cache file that is not already in the given format.
+    """
+    for root, dirs, files in os.walk(cache):
+        for file in sorted(files):
+            source: str = os.path.join(root, file)
+            if finance.store.guess_format(source) in (None, finance.store.get_format(name)):
+                continue
+
+            target: str = finance.store.with_format(source, name)
+            if os.path.exists(target):
+                logging.debug('skipping %s (%s exists)', source, target)
+                continue
+
+            data = finance.store.load(source)
+            if not isinstance(data, list):
+                logging.debug('skipping %s (not a cache file)', source)
+                continue
+
+            finance.store.dump(data, target)
+            logging.debug('migrated %s -> %s', source, target)
+
+            if not keep:
+                os.remove(source)
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
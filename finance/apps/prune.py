@@ -0,0 +1,58 @@
+"""
+A script to prune (or compact) the old cache files that are in the cache catalog.
+
+    python -m finance cache prune --days 90 --keep 1 --dry-run
+    python -m finance cache prune --days 30 --compact msgpack
+"""
+import argparse
+import datetime
+import logging
+import time
+
+
+import finance.catalog
+import finance.helpers
+import finance.store
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workdir', default='.', type=str, help='the working directory of the cache')
+    parser.add_argument('--days', default=90, type=float, help='the age (in days) of the entries to prune')
+    parser.add_argument('--keep', default=1, type=int, help='the number of recent versions of each cache file to keep')
+    parser.add_argument('--provider', default=None, type=str, help='only prune the entries of the provider')
+    parser.add_argument('--scraper', default=None, type=str, help='only prune the entries of the scraper class')
+    parser.add_argument('--compact', default=None, choices=list(finance.store.FORMATS), type=str,
+                        help='rewrite the old entries in this cache format instead of removing them')
+    parser.add_argument('--dry-run', dest='dry_run', action='store_true', help='only log the entries')
+    return parser.parse_args(args=args)
+
+
+def main(workdir: str, days: float, keep: int, provider: str, scraper: str, compact: str, dry_run: bool):
+    """
+    Remove (or rewrite) the cache files fetched more than the given number of days ago.
+    """
+    catalog: finance.catalog.Catalog = finance.catalog.of(workdir)
+    before: float = time.time() - days * 86400
+
+    if compact is not None:
+        entries: list = catalog.compact(before, compact, provider=provider, scraper=scraper, dry_run=dry_run)
+        action: str = f'compacted to {compact}'
+    else:
+        entries: list = catalog.prune(before, keep=keep, provider=provider, scraper=scraper, dry_run=dry_run)
+        action: str = 'removed'
+
+    for entry in entries:
+        logging.debug('%s %s (%s, fetched %s, %d bytes)', action, entry.key, entry.scraper,
+                      datetime.datetime.fromtimestamp(entry.fetched).isoformat(timespec='seconds'), entry.size)
+
+    logging.debug('%s %d entries (%d bytes)%s', action, len(entries), sum(e.size for e in entries),
+                  ' (dry run)' if dry_run else '')
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
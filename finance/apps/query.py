@@ -0,0 +1,41 @@
+"""
+A script to query the warehouse with SQL, and save the result to a CSV file.
+
+    python -m finance warehouse query \
+        "SELECT snapshot, SUM(quantity) FROM pcap_holdings WHERE ticker = 'VTI' GROUP BY snapshot"
+"""
+import argparse
+import logging
+
+
+import finance.warehouse
+import finance.helpers
+import finance.config
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sql', type=str, help='the SQL query')
+    parser.add_argument('--workdir', default='.', type=str, help='the working directory of the warehouse')
+    parser.add_argument('--output', default=None, type=str, help='the CSV file to save the result to')
+    return parser.parse_args(args=args)
+
+
+def main(sql: str, workdir: str, output: str = None):
+    """
+    Run the query and log (or save) the resulting dataframe.
+    """
+    finance.config.pandas()
+    frame = finance.warehouse.of(workdir).query(sql)
+    if output is not None:
+        frame.to_csv(output, index=False)
+
+    logging.debug('\n%s', frame)
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
@@ -0,0 +1,86 @@
+"""
+A script to move the catalogued daily holdings and accounts cache files into the snapshot stores.
+
+Each day is written in date order, as a periodic full snapshot or as a delta to the day before.
+Set FINANCE_SNAPSHOTS=1 so that the scrapers then read and write the snapshot stores.
+
+    python -m finance cache snapshots
+    python -m finance cache snapshots --provider pcap --remove
+"""
+import argparse
+import logging
+import typing
+import os
+
+
+import finance.catalog
+import finance.helpers
+import finance.store
+import finance.apps
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--provider', default=None, choices=['pcap', 'ynab'], help='only move the provider')
+    parser.add_argument('--remove', action='store_true', help='remove the daily cache files that were moved')
+    return parser.parse_args(args=args)
+
+
+def scraper_classes(provider: str) -> typing.Dict[str, type]:
+    """
+    Get the scraper classes of the provider that have snapshot keys, keyed by class name.
+    """
+    if provider == 'pcap':
+        import finance.pcap.scrapers as scrapers
+    else:
+        import finance.ynab.scrapers as scrapers
+
+    classes: dict = {}
+    for name in dir(scrapers):
+        cls = getattr(scrapers, name)
+        if isinstance(cls, type) and getattr(cls, '__snapshot_keys__', None) is not None:
+            classes[cls.__name__] = cls
+
+    return classes
+
+
+def move_entries(provider: str, handler, remove: bool) -> int:
+    """
+    Write each catalogued daily cache file of the provider into its snapshot store, oldest day first.
+    """
+    classes: dict = scraper_classes(provider)
+    catalog: finance.catalog.Catalog = finance.catalog.of(handler.config.workdir)
+
+    entries: list = [e for e in catalog.entries(provider=provider) if e.scraper in classes]
+    count: int = 0
+    for entry in sorted(entries, key=lambda e: e.date):
+        if not os.path.exists(entry.path):
+            continue
+
+        scraper = classes[entry.scraper].from_catalog(entry, handler=handler)
+        scraper.snapshots.write(entry.date, finance.store.load(entry.path))
+        logging.debug('moved %s to %s', entry.key, scraper.snapshots.root)
+        count += 1
+
+        if remove:
+            os.remove(entry.path)
+            catalog.forget(entry.path)
+
+    return count
+
+
+def main(provider: str, remove: bool, handler=None):
+    """
+    Move the catalogued daily cache files into the snapshot stores.
+    """
+    for provider in [provider] if provider is not None else ['pcap', 'ynab']:
+        handler_ = handler if handler is not None else finance.apps.handler(provider)
+        logging.debug('%s: moved %d cache files', provider, move_entries(provider, handler_, remove))
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
@@ -0,0 +1,140 @@
+"""
+A script to load the cached objects of earlier days into the warehouse.
+
+The objects are read from the catalogued cache files, the PCAP transaction partitions and the YNAB delta stores.
+
+With FINANCE_WAREHOUSE=1, scrapers upsert their objects into the warehouse when they fetch them, so this is
+only needed once, for the cache files that were written before the warehouse was turned on.
+
+    python -m finance warehouse load
+    python -m finance warehouse load --provider pcap
+"""
+import itertools
+import argparse
+import datetime
+import logging
+import typing
+import os
+
+
+import finance.partitions
+import finance.warehouse
+import finance.catalog
+import finance.helpers
+import finance.frames
+import finance.store
+import finance.apps
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    """
+    Get the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--provider', default=None, choices=['pcap', 'ynab'], help='only load the provider')
+    parser.add_argument('--chunk', default=100_000, type=int, help='the number of transactions stored at once')
+    return parser.parse_args(args=args)
+
+
+def scraper_classes(provider: str) -> typing.Dict[str, type]:
+    """
+    Get the scraper classes of the provider that have a warehouse table, keyed by class name.
+    """
+    if provider == 'pcap':
+        import finance.pcap.scrapers as scrapers
+    else:
+        import finance.ynab.scrapers as scrapers
+
+    classes: dict = {}
+    for name in dir(scrapers):
+        cls = getattr(scrapers, name)
+        if isinstance(cls, type) and getattr(cls, '__warehouse__', None) is not None:
+            classes[cls.__name__] = cls
+
+    return classes
+
+
+def load_entries(provider: str, handler) -> int:
+    """
+    Store the objects of each catalogued cache file of the provider, unless the file was already stored.
+    """
+    classes: dict = scraper_classes(provider)
+    catalog: finance.catalog.Catalog = finance.catalog.of(handler.config.workdir)
+
+    count: int = 0
+    for entry in catalog.entries(provider=provider):
+        cls: typing.Union[type, None] = classes.get(entry.scraper)
+        if cls is None or not os.path.exists(entry.path):
+            continue
+
+        scraper = cls.from_catalog(entry, handler=handler)
+        if not scraper.warehouse.loaded(entry.key, entry.hash):
+            scraper.warehouse.upsert(
+                cls.__warehouse__, finance.frames.build_frame(
+                    cls.__store_class__, finance.store.load(entry.path), instance=scraper, rules=scraper.rules),
+                snapshot=entry.date)
+            scraper.warehouse.mark_loaded(entry.key, entry.hash)
+            logging.debug('loaded %s', entry.key)
+            count += 1
+
+    return count
+
+
+def load_transactions(handler, chunk: int) -> int:
+    """
+    Store the PCAP transactions of every covered day of the partitions, a chunk of transactions at a time.
+    """
+    import finance.pcap.scrapers
+
+    scraper = finance.pcap.scrapers.TransactionsScraper(handler, t0=datetime.datetime(1900, 1, 1), dt=0)
+    partitions: finance.partitions.PartitionStore = scraper.partitions
+    days: list = [datetime.datetime.strptime(day, '%Y-%m-%d').date() for day in partitions.manifest()]
+
+    count: int = 0
+    for d0, d1 in finance.partitions.ranges_of(days):
+        rows: typing.Iterator[dict] = partitions.iter_read(d0, d1)
+        for batch in iter(lambda: list(itertools.islice(rows, chunk)), []):
+            frame = finance.frames.build_frame(scraper.__store_class__, batch, instance=scraper, rules=scraper.rules)
+            count += scraper.warehouse.upsert(scraper.__warehouse__, frame, snapshot=f'{d1:%Y-%m-%d}')
+        logging.debug('loaded pcap transactions %s to %s', d0, d1)
+
+    return count
+
+
+def load_deltas(handler) -> int:
+    """
+    Store the YNAB transactions of the persistent delta store of every known budget.
+    """
+    import finance.ynab.scrapers
+    import finance.ynab.index
+
+    count: int = 0
+    for budget_id in finance.ynab.index.of(handler.config.workdir).ids('budgets'):
+        scraper = finance.ynab.scrapers.TransactionsScraper(handler, budget_id=budget_id)
+        path: typing.Union[str, None] = finance.store.find(scraper.delta_store)
+        if path is not None:
+            count += scraper.store_warehouse(finance.frames.build_frame(
+                scraper.__store_class__, finance.store.load(path), instance=scraper, rules=scraper.rules))
+            logging.debug('loaded ynab transactions of budget %s', budget_id)
+
+    return count
+
+
+def main(provider: str, chunk: int, handler=None):
+    """
+    Load the catalogued cache files, the PCAP transaction partitions and the YNAB delta stores into the warehouse.
+    """
+    for provider in [provider] if provider is not None else ['pcap', 'ynab']:
+        handler_ = handler if handler is not None else finance.apps.handler(provider)
+        # loading is an explicit request for the warehouse
+        handler_.config.warehouse = True
+        logging.debug('%s: loaded %d cache files', provider, load_entries(provider, handler_))
+        if provider == 'pcap':
+            logging.debug('%s: loaded %d transactions', provider, load_transactions(handler_, chunk))
+        else:
+            logging.debug('%s: loaded %d transactions', provider, load_deltas(handler_))
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
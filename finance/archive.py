@@ -0,0 +1,124 @@
+"""
+A columnar archive of the typed dataframes, written next to the cache files as uncompressed Arrow IPC files.
+
+An archive is memory mapped when it is read, so the numeric and datetime columns of the dataframe point into
+the OS page cache instead of being decoded from JSON again, and processes that load the same archive share
+those pages. The archive records the version (modification time and size) of the cache file and fillna rules
+it was built from, and an archive of another version is ignored.
+
+The archives require the pyarrow package.
+"""
+import importlib.util
+import typing
+import json
+import os
+
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+import finance.exports
+
+from finance.objmap import ObjectMapping
+
+
+#: The schema metadata key of the version of the source of the archive
+_STAMP_KEY: bytes = b'finance.stamp'
+
+#: The file extension of the archives
+EXTENSION: str = '.arrow'
+
+
+def available() -> bool:
+    """
+    Is the pyarrow package installed?
+    """
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def path_of(path: str) -> str:
+    """
+    Get the path of the archive of a cache file (written in any format).
+    """
+    return os.path.splitext(path)[0] + EXTENSION
+
+
+def write(frame: 'pd.DataFrame', path: str, cls: typing.Type[ObjectMapping], stamp: typing.Sequence):
+    """
+    Save the dataframe to an uncompressed Arrow IPC file, which can be memory mapped.
+
+    Parameters:
+        frame: The typed dataframe.
+        path: The path of the archive.
+        cls: The store class, which gives the column types.
+        stamp: The JSON version of the source of the dataframe.
+    """
+    import pyarrow as pa
+
+    table = finance.exports.to_table(frame, cls)
+    metadata: dict = dict(table.schema.metadata or {})
+    metadata[_STAMP_KEY] = json.dumps(list(stamp))
+    table = table.replace_schema_metadata(metadata)
+
+    temp: str = os.path.join(os.path.dirname(path), '.tmp-' + os.path.basename(path))
+    with pa.OSFile(temp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp, path)
+
+
+def current(path: str, stamp: typing.Sequence) -> bool:
+    """
+    Was the archive built from the source with this version? Only the schema of the archive is read.
+    """
+    import pyarrow as pa
+
+    if not os.path.exists(path):
+        return False
+
+    try:
+        schema = pa.ipc.open_file(pa.memory_map(path, 'r')).schema
+    except (OSError, pa.ArrowInvalid):
+        return False
+
+    return (schema.metadata or {}).get(_STAMP_KEY) == json.dumps(list(stamp)).encode()
+
+
+def read(path: str, stamp: typing.Sequence) -> typing.Union['pd.DataFrame', None]:
+    """
+    Load the dataframe of an archive through a memory map.
+
+    The numeric and datetime columns without missing values are not copied, the string columns are.
+
+    Parameters:
+        path: The path of the archive.
+        stamp: The JSON version of the source that the archive must have been built from.
+
+    Returns:
+        The dataframe, or None if there is no archive of that version.
+    """
+    import pyarrow as pa
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        # the buffers of the table keep the file mapped
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    if (table.schema.metadata or {}).get(_STAMP_KEY) != json.dumps(list(stamp)).encode():
+        return None
+
+    return table.to_pandas(split_blocks=True)
+
+
+def remove(path: str):
+    """
+    Remove the archive of a cache file, if there is one.
+    """
+    archive: str = path_of(path)
+    if os.path.exists(archive):
+        os.remove(archive)
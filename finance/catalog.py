@@ -0,0 +1,327 @@
+"""
+A SQLite catalog of the cache files, with their provider, scraper, parameters, fetch time, size and hash.
+
+Each cache file has one entry, keyed by its path in the cache directory without the extension, so an entry
+is found with one index lookup whatever the cache format. Interval scrapers record the dates they span,
+so the cached intervals of a period are found with one range query instead of listing the cache directory.
+"""
+import dataclasses
+import threading
+import datetime
+import hashlib
+import sqlite3
+import typing
+import json
+import time
+import os
+
+
+import finance.archive
+import finance.store
+
+
+#: The catalogs, keyed by path, shared by all scrapers in the process
+_CATALOGS: typing.Dict[str, 'Catalog'] = {}
+_CATALOGS_LOCK: threading.Lock = threading.Lock()
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    scraper TEXT NOT NULL,
+    params TEXT NOT NULL,
+    t0 TEXT,
+    t1 TEXT,
+    fetched REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_intervals ON entries (provider, scraper, t0, t1);
+CREATE INDEX IF NOT EXISTS entries_fetched ON entries (fetched);
+CREATE TABLE IF NOT EXISTS scans (
+    name TEXT PRIMARY KEY,
+    scanned REAL NOT NULL
+);
+"""
+
+
+def file_hash(path: str) -> str:
+    """
+    Get the blake2b digest of the file contents.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _date(value: typing.Union[datetime.date, datetime.datetime, str, None]) -> typing.Union[str, None]:
+    """
+    Get the YYYY-MM-DD string of a date, which sorts like the date.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    else:
+        return f'{value:%Y-%m-%d}'
+
+
+@dataclasses.dataclass()
+class Entry:
+    """
+    A cache file in the catalog.
+    """
+    key: str
+    path: str
+    provider: str
+    scraper: str
+    params: dict
+    t0: typing.Union[str, None]
+    t1: typing.Union[str, None]
+    fetched: float
+    size: int
+    hash: str
+
+    @property
+    def date(self) -> str:
+        """
+        Get the YYYY-MM-DD date of the snapshot in the cache file, or else the UTC date it was fetched.
+        """
+        fetched: datetime.datetime = datetime.datetime.fromtimestamp(self.fetched, tz=datetime.timezone.utc)
+        return self.params.get('date', f'{fetched:%Y-%m-%d}')
+
+    @property
+    def series(self) -> tuple:
+        """
+        Get the provider, scraper and parameters (without the snapshot date) of the cache files that are
+        versions of the same data: the daily snapshots of a scraper are one series, each interval is its own.
+        """
+        params: dict = {k: v for k, v in self.params.items() if k != 'date'}
+        return self.provider, self.scraper, json.dumps(params, sort_keys=True)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Entry':
+        values: list = list(row)
+        values[4] = json.loads(values[4])
+        return cls(*values)
+
+
+class Catalog:
+    """
+    A SQLite catalog of the cache files of one cache directory.
+    """
+    def __init__(self, root: str):
+        """
+        Parameters:
+            root: The cache directory, the catalog is saved in its catalog.sqlite file.
+        """
+        self.root: str = root
+        self.path: str = os.path.join(root, 'catalog.sqlite')
+        self._lock: threading.RLock = threading.RLock()
+
+        os.makedirs(root, exist_ok=True)
+        self._db: sqlite3.Connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def key(self, path: str) -> str:
+        """
+        Get the key of a cache file, its path in the cache directory without the extension.
+        """
+        return os.path.splitext(os.path.relpath(os.path.abspath(path), self.root))[0].replace(os.sep, '/')
+
+    def record(self, path: str, provider: str, scraper: str, params: dict = None,
+               t0: typing.Union[datetime.date, str] = None, t1: typing.Union[datetime.date, str] = None,
+               fetched: float = None) -> Entry:
+        """
+        Add (or replace) the entry of a cache file that was just written.
+
+        Parameters:
+            path: The path of the cache file.
+            provider: The name of the provider, such as pcap.
+            scraper: The name of the scraper class.
+            params: The JSON parameters of the scraper.
+            t0: The first date spanned by an interval.
+            t1: The last date spanned by an interval.
+            fetched: The time the data was fetched (default now).
+
+        Returns:
+            The entry.
+        """
+        entry: Entry = Entry(
+            key=self.key(path), path=os.path.abspath(path), provider=provider, scraper=scraper,
+            params=params if params is not None else {}, t0=_date(t0), t1=_date(t1),
+            fetched=fetched if fetched is not None else time.time(), size=os.path.getsize(path), hash=file_hash(path))
+
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+                entry.key, entry.path, entry.provider, entry.scraper, json.dumps(entry.params, sort_keys=True),
+                entry.t0, entry.t1, entry.fetched, entry.size, entry.hash))
+            self._db.commit()
+
+        return entry
+
+    def lookup(self, path: str) -> typing.Union[Entry, None]:
+        """
+        Get the entry of the cache file, written in any format, or None if it is not in the catalog.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT * FROM entries WHERE key = ?', (self.key(path),)).fetchone()
+
+        return Entry.from_row(row) if row is not None else None
+
+    def find(self, path: str) -> typing.Union[str, None]:
+        """
+        Find the existing cache file for the path, like finance.store.find.
+
+        Entries whose file was removed are forgotten, and cache files that are not in the catalog
+        (such as files written before the catalog existed) are left to the caller to record.
+        """
+        entry: typing.Union[Entry, None] = self.lookup(path)
+        if entry is not None:
+            if os.path.exists(entry.path):
+                return entry.path
+            self.forget(entry.path)
+
+        return finance.store.find(path)
+
+    def forget(self, path: str):
+        """
+        Remove the entry of the cache file, but not the file.
+        """
+        with self._lock:
+            self._db.execute('DELETE FROM entries WHERE key = ?', (self.key(path),))
+            self._db.commit()
+
+    def entries(self, provider: str = None, scraper: str = None, start: typing.Union[datetime.date, str] = None,
+                end: typing.Union[datetime.date, str] = None, before: float = None) -> typing.List[Entry]:
+        """
+        Query the entries, oldest first.
+
+        Parameters:
+            provider: Only the entries of the provider.
+            scraper: Only the entries of the scraper class.
+            start: Only the intervals that start on or after the date.
+            end: Only the intervals that end on or before the date.
+            before: Only the entries fetched before the time.
+
+        Returns:
+            The entries.
+        """
+        where, args = [], []
+        for clause, value in (('provider = ?', provider), ('scraper = ?', scraper), ('t0 >= ?', _date(start)),
+                              ('t1 <= ?', _date(end)), ('fetched < ?', before)):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+
+        query: str = 'SELECT * FROM entries'
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+
+        with self._lock:
+            rows: list = self._db.execute(query + ' ORDER BY fetched', args).fetchall()
+
+        return [Entry.from_row(row) for row in rows]
+
+    def scanned(self, name: str) -> bool:
+        """
+        Was the named one-time scan of the cache directory (to adopt older cache files) done?
+        """
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM scans WHERE name = ?', (name,)).fetchone() is not None
+
+    def mark_scanned(self, name: str):
+        """
+        Remember that the named scan of the cache directory was done.
+        """
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO scans VALUES (?, ?)', (name, time.time()))
+            self._db.commit()
+
+    def prune(self, before: float, keep: int = 1, provider: str = None, scraper: str = None,
+              dry_run: bool = False) -> typing.List[Entry]:
+        """
+        Remove the cache files (with their archives, and entries) fetched before the time.
+
+        Parameters:
+            before: Remove the entries fetched before this time.
+            keep: The number of most recent entries of each series (see Entry.series) that are never removed,
+                  so the only version of an interval is always kept.
+            provider: Only the entries of the provider.
+            scraper: Only the entries of the scraper class.
+            dry_run: Only return the entries that would be removed?
+
+        Returns:
+            The removed entries.
+        """
+        entries: typing.List[Entry] = self.entries(provider=provider, scraper=scraper)
+
+        kept: typing.Dict[tuple, int] = {}
+        removed: list = []
+        for entry in reversed(entries):
+            kept[entry.series] = kept.get(entry.series, 0) + 1
+            if kept[entry.series] > keep and entry.fetched < before:
+                removed.append(entry)
+
+        if not dry_run:
+            for entry in removed:
+                if os.path.exists(entry.path):
+                    os.remove(entry.path)
+                finance.archive.remove(entry.path)
+                self.forget(entry.path)
+
+        return removed[::-1]
+
+    def compact(self, before: float, store_format: str, provider: str = None, scraper: str = None,
+                dry_run: bool = False) -> typing.List[Entry]:
+        """
+        Rewrite the cache files fetched before the time in another (smaller) cache format.
+        The entries keep their fetch time.
+
+        Parameters:
+            before: Rewrite the entries fetched before this time.
+            store_format: The name of the cache format, such as msgpack or parquet.
+            provider: Only the entries of the provider.
+            scraper: Only the entries of the scraper class.
+            dry_run: Only return the entries that would be rewritten?
+
+        Returns:
+            The entries of the rewritten files.
+        """
+        entries: typing.List[Entry] = []
+        for entry in self.entries(provider=provider, scraper=scraper, before=before):
+            target: str = finance.store.with_format(entry.path, store_format)
+            if target == entry.path or not os.path.exists(entry.path):
+                continue
+
+            if not dry_run:
+                finance.store.dump(finance.store.load(entry.path), target)
+                os.remove(entry.path)
+                finance.archive.remove(entry.path)
+                entry = self.record(target, entry.provider, entry.scraper, entry.params, entry.t0, entry.t1,
+                                    fetched=entry.fetched)
+
+            entries.append(entry)
+
+        return entries
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def of(workdir: str) -> Catalog:
+    """
+    Get the catalog of the cache directory of the working directory, opening it on first use.
+    """
+    root: str = os.path.abspath(os.path.join(workdir, 'cache'))
+    with _CATALOGS_LOCK:
+        try:
+            return _CATALOGS[root]
+        except KeyError:
+            _CATALOGS[root] = Catalog(root)
+            return _CATALOGS[root]
@@ -0,0 +1,226 @@
+"""
+Write the dataframes of the scrapers to CSV, Parquet or Arrow IPC files.
+
+Parquet and Arrow IPC files require the pyarrow package, and their schema is derived from the store class.
+In the partitioned mode each export is written to its own partition of a dataset, such as
+`<root>/dataset=pcap-holdings/date=2020-01-31/part-0.parquet`, so later exports append new partitions
+(and replace their own) without rewriting the others.
+"""
+import argparse
+import typing
+import os
+
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+from finance.objmap import ObjectMapping
+
+
+#: The arrow types of the dataframe dtypes
+_ARROW_TYPES: typing.Dict[str, typing.Callable] = {
+    'int64': lambda pa: pa.int64(),
+    'float64': lambda pa: pa.float64(),
+    'bool': lambda pa: pa.bool_(),
+    'category': lambda pa: pa.dictionary(pa.int32(), pa.string()),
+}
+
+
+def arrow_schema(cls: typing.Type[ObjectMapping]) -> dict:
+    """
+    Get the arrow type of each field of the class, from its dataframe dtype or its str annotation.
+
+    Returns:
+        The arrow types, keyed by field name.
+    """
+    import pyarrow as pa
+    import dataclasses
+
+    dtypes: dict = cls.frame_dtypes()
+
+    types: dict = {}
+    for f in dataclasses.fields(cls):
+        if dtypes.get(f.name) in _ARROW_TYPES:
+            types[f.name] = _ARROW_TYPES[dtypes[f.name]](pa)
+        elif f.name not in dtypes and f.type is str:
+            types[f.name] = pa.string()
+
+    return types
+
+
+def to_table(frame: 'pd.DataFrame', cls: typing.Type[ObjectMapping]):
+    """
+    Convert the dataframe to an arrow table, with the types of the store class.
+    Columns that are not fields of the class (and datetime columns) keep their inferred types.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    types: dict = arrow_schema(cls)
+
+    fields: list = []
+    for field in table.schema:
+        if field.name in types and not pa.types.is_timestamp(field.type):
+            fields.append(pa.field(field.name, types[field.name]))
+        else:
+            fields.append(field)
+
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+class ExportFormat:
+    """
+    An export file format for a dataframe.
+    """
+    #: The unique name of the format
+    name: str = ''
+    #: The file extensions of the format, the first one is used for new files
+    extensions: typing.Tuple[str, ...] = ()
+    #: The name of the format in pyarrow.dataset
+    dataset: str = ''
+
+    def write(self, frame: 'pd.DataFrame', path: str, cls: typing.Type[ObjectMapping], compression: str = None):
+        """
+        Save the dataframe to the path.
+        """
+        raise NotImplementedError
+
+
+class CSVExport(ExportFormat):
+    """
+    The original CSV export format.
+    """
+    name: str = 'csv'
+    extensions: typing.Tuple[str, ...] = ('.csv',)
+    dataset: str = 'csv'
+
+    def write(self, frame: 'pd.DataFrame', path: str, cls: typing.Type[ObjectMapping], compression: str = None):
+        frame.to_csv(path, index=False, compression=compression if compression is not None else 'infer')
+
+
+class ParquetExport(ExportFormat):
+    """
+    A compressed columnar export format, requires the pyarrow package.
+    """
+    name: str = 'parquet'
+    extensions: typing.Tuple[str, ...] = ('.parquet',)
+    dataset: str = 'parquet'
+
+    def write(self, frame: 'pd.DataFrame', path: str, cls: typing.Type[ObjectMapping], compression: str = None):
+        import pyarrow.parquet as pq
+        pq.write_table(to_table(frame, cls), path, compression=compression if compression is not None else 'snappy')
+
+
+class ArrowExport(ExportFormat):
+    """
+    The Arrow IPC file format, which can be memory mapped when reading, requires the pyarrow package.
+    """
+    name: str = 'arrow'
+    extensions: typing.Tuple[str, ...] = ('.arrow', '.feather')
+    dataset: str = 'ipc'
+
+    def write(self, frame: 'pd.DataFrame', path: str, cls: typing.Type[ObjectMapping], compression: str = None):
+        import pyarrow as pa
+
+        table = to_table(frame, cls)
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+
+
+#: The known export formats, keyed by name
+FORMATS: typing.Dict[str, ExportFormat] = {
+    f.name: f for f in (CSVExport(), ParquetExport(), ArrowExport())
+}
+
+
+def get_format(name: str) -> ExportFormat:
+    """
+    Get the export format with the given name.
+    """
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f'unknown export format: {name} (expected one of {", ".join(FORMATS)})')
+
+
+def guess_format(path: str) -> ExportFormat:
+    """
+    Get the export format from the extension of the path, CSV if the extension is not known.
+    """
+    extension: str = os.path.splitext(path)[1]
+    for f in FORMATS.values():
+        if extension in f.extensions:
+            return f
+
+    return FORMATS['csv']
+
+
+def write(frame: 'pd.DataFrame', path: str, cls: typing.Type[ObjectMapping], export_format: str = None,
+          compression: str = None):
+    """
+    Save the dataframe, using the given format or the format given by the extension of the path.
+
+    Parameters:
+        frame: The dataframe.
+        path: The path of the file.
+        cls: The store class of the dataframe rows.
+        export_format: The name of the format.
+        compression: The compression codec (e.g. gzip for CSV files, snappy or zstd for Parquet, lz4 or zstd for Arrow).
+    """
+    f: ExportFormat = get_format(export_format) if export_format is not None else guess_format(path)
+
+    directory: str = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    f.write(frame, path, cls, compression=compression)
+
+
+def partition_path(root: str, partition: str, export_format: str = 'parquet') -> str:
+    """
+    Get the path of the file of a partition.
+
+    Parameters:
+        root: The root directory of the datasets.
+        partition: The partition directories, such as dataset=pcap-holdings/date=2020-01-31.
+        export_format: The name of the format.
+    """
+    return os.path.join(root, partition, 'part-0' + get_format(export_format).extensions[0])
+
+
+def read(root: str, dataset: str, columns: typing.List[str] = None, filters: typing.Any = None,
+         export_format: str = 'parquet') -> 'pd.DataFrame':
+    """
+    Load a partitioned dataset, reading only the partitions that match the filters and the given columns.
+    The partition keys (such as date) are columns of the dataframe, and may be used in the filters.
+
+    Parameters:
+        root: The root directory of the datasets.
+        dataset: The name of the dataset, such as pcap-holdings.
+        columns: The columns to read, or None for all columns.
+        filters: A pyarrow.dataset expression, e.g. pyarrow.dataset.field('date') >= '2020-01-01'.
+        export_format: The name of the format the dataset was written in.
+
+    Returns:
+        The dataframe.
+    """
+    import pyarrow.dataset as ds
+
+    path: str = os.path.join(root, f'dataset={dataset}')
+    data = ds.dataset(path, format=get_format(export_format).dataset, partitioning='hive')
+
+    return data.to_table(columns=columns, filter=filters).to_pandas()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the export options to the parser of an app.
+    """
+    parser.add_argument('--format', dest='export_format', default=None, choices=list(FORMATS),
+                        help='the export format (default: from the stub extension, parquet for --dataset)')
+    parser.add_argument('--compression', default=None, type=str, help='the compression codec of the export')
+    parser.add_argument('--dataset', dest='dataset', default=None, type=str,
+                        help='append a partition to the datasets in this directory instead of writing the stub')
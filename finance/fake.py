@@ -0,0 +1,236 @@
+"""
+Synthetic stand-ins for the Personal Capital and YNAB API clients, for offline runs and benchmarks.
+
+The payloads are generated on demand (one page or date range at a time) and are deterministic,
+so large datasets cost no memory until they are requested.
+
+    handler = finance.pcap.api.PCAPHandler()
+    finance.fake.install_pcap(handler, transactions=1_000_000, holdings=10_000)
+"""
+import datetime
+import typing
+import json
+
+
+class FakeResponse:
+    """
+    A response with the interface of both a requests response and an (undecoded) urllib3 response.
+    """
+    def __init__(self, payload: typing.Any, status: int = 200):
+        self.payload: typing.Any = payload
+        self.status: int = status
+        self.status_code: int = status
+        self.headers: dict = {}
+
+    @property
+    def data(self) -> bytes:
+        return json.dumps(self.payload).encode()
+
+    def json(self) -> typing.Any:
+        return self.payload
+
+    def to_dict(self) -> typing.Any:
+        return self.payload
+
+
+class FakePersonalCapital:
+    """
+    A stand-in for the personal capital client, with synthetic accounts, holdings, transactions and histories.
+    """
+    def __init__(self, accounts: int = 20, holdings: int = 10_000, transactions: int = 1_000_000,
+                 start: datetime.date = datetime.date(2015, 1, 1), end: datetime.date = datetime.date(2020, 12, 31)):
+        """
+        Parameters:
+            accounts: The number of accounts.
+            holdings: The number of holdings (spread over the accounts).
+            transactions: The number of transactions (spread evenly over the days from start to end).
+            start: The first day with transactions.
+            end: The last day with transactions.
+        """
+        self.accounts: int = max(1, accounts)
+        self.holdings: int = holdings
+        self.start: datetime.date = start
+        self.end: datetime.date = end
+        self.per_day: int = max(1, transactions // ((end - start).days + 1))
+        self.requests: int = 0
+        self._session: dict = {}
+
+    def login(self, username: str, password: str):
+        self._session = {'fake': 'session'}
+
+    def get_session(self) -> dict:
+        return self._session
+
+    def set_session(self, cookies: dict):
+        self._session = cookies
+
+    def account_name(self, i: int) -> str:
+        return f'Bank {i % 5} : Account {i:03d}'
+
+    def fetch(self, endpoint: str, data: dict = None) -> FakeResponse:
+        """
+        Get the synthetic response of an endpoint.
+        """
+        self.requests += 1
+        data: dict = data if data is not None else {}
+
+        if endpoint == '/login/querySession':
+            return FakeResponse({'spHeader': {'success': True, 'authLevel': 'SESSION_AUTHENTICATED'}})
+        elif endpoint == '/newaccount/getAccounts2':
+            return FakeResponse({'spData': {'accounts': [
+                {'userAccountId': i, 'name': self.account_name(i)} for i in range(self.accounts)]}})
+        elif endpoint == '/invest/getHoldings':
+            return FakeResponse({'spData': {'holdings': [self._holding(i) for i in range(self.holdings)]}})
+        elif endpoint == '/transaction/getUserTransactions':
+            return FakeResponse({'spData': {'transactions': self._transactions(data)}})
+        elif endpoint == '/account/getHistories':
+            return FakeResponse({'spData': {'accountSummaries': self._histories(data)}})
+        else:
+            return FakeResponse({'spHeader': {'success': False}}, status=404)
+
+    def _holding(self, i: int) -> dict:
+        account: int = i % self.accounts
+        quantity: float = float(1 + i % 97)
+        price: float = 10.0 + i % 113
+        return {
+            'accountName': self.account_name(account), 'userAccountId': account,
+            'ticker': f'T{i % 500:04d}', 'cusip': f'{i % 500:09d}',
+            'quantity': quantity, 'price': price, 'value': quantity * price,
+        }
+
+    def _transactions(self, data: dict) -> list:
+        """
+        Get one page of the transactions from the start date to the end date (inclusive).
+        """
+        d0: datetime.date = max(self.start, datetime.date.fromisoformat(data['startDate']))
+        d1: datetime.date = min(self.end, datetime.date.fromisoformat(data['endDate']))
+        if d1 < d0:
+            return []
+
+        rows: int = int(data.get('rows_per_page', (d1 - d0).days * self.per_day + self.per_day))
+        first: int = int(data.get('page', 0)) * rows
+        last: int = min(first + rows, ((d1 - d0).days + 1) * self.per_day)
+
+        page: list = []
+        for k in range(first, last):
+            day: datetime.date = d0 + datetime.timedelta(days=k // self.per_day)
+            n: int = (day - self.start).days * self.per_day + k % self.per_day
+            account: int = n % self.accounts
+            page.append({
+                'accountName': self.account_name(account), 'userAccountId': account,
+                'userTransactionId': n, 'transactionDate': f'{day:%Y-%m-%d}',
+                'amount': round((n * 7919 % 20000 - 10000) / 100.0, 2),
+            })
+
+        return page
+
+    def _histories(self, data: dict) -> list:
+        """
+        Get the account summaries from the start date to the end date, which are additive over chained dates.
+        """
+        d0: datetime.date = datetime.date.fromisoformat(data['startDate'])
+        d1: datetime.date = datetime.date.fromisoformat(data['endDate'])
+        days: int = (d1 - d0).days
+
+        return [{
+            'accountName': self.account_name(i), 'userAccountId': i,
+            'dateRangeBalanceValueChange': 12.5 * days * (1 + i % 3),
+            'dateRangePerformanceValueChange': 10.0 * days * (1 + i % 3),
+            'cashFlow': 2.5 * days, 'income': 5.0 * days, 'expense': -2.5 * days,
+            'percentOfTotal': 100.0 / self.accounts,
+        } for i in range(self.accounts)]
+
+
+class FakeYNAB:
+    """
+    A stand-in for the YNAB budgets, accounts and transactions APIs, with synthetic objects.
+    """
+    def __init__(self, budgets: int = 2, accounts: int = 20, transactions: int = 100_000,
+                 start: datetime.date = datetime.date(2015, 1, 1)):
+        """
+        Parameters:
+            budgets: The number of budgets.
+            accounts: The number of accounts per budget.
+            transactions: The number of transactions per budget.
+            start: The date of the first transaction.
+        """
+        self.budgets: int = max(1, budgets)
+        self.accounts: int = max(1, accounts)
+        self.transactions: int = transactions
+        self.start: datetime.date = start
+        self.server_knowledge: int = 1
+        self.created: typing.Dict[str, list] = {}
+        self.requests: int = 0
+
+    @staticmethod
+    def _respond(payload: dict, _preload_content: bool = True, **kwargs) -> FakeResponse:
+        return FakeResponse(payload)
+
+    def _delta(self, rows: typing.Callable[[], list], key: str, last_knowledge_of_server: int = None, **kwargs):
+        self.requests += 1
+        changed: list = rows() if last_knowledge_of_server is None else []
+        return self._respond({'data': {key: changed, 'server_knowledge': self.server_knowledge}}, **kwargs)
+
+    def get_budgets(self, **kwargs) -> FakeResponse:
+        self.requests += 1
+        budgets: list = [{'id': f'budget-{i}', 'name': f'Budget {i}'} for i in range(self.budgets)]
+        return self._respond({'data': {'budgets': budgets}}, **kwargs)
+
+    def get_accounts(self, budget_id: str, **kwargs) -> FakeResponse:
+        return self._delta(lambda: [{
+            'id': f'{budget_id}-account-{i}', 'name': f'Account {i}', 'type': 'checking',
+            'balance': 1000 * i, 'cleared_balance': 1000 * i, 'uncleared_balance': 0,
+            'closed': False, 'deleted': False, 'on_budget': True,
+        } for i in range(self.accounts)], 'accounts', **kwargs)
+
+    def get_transactions(self, budget_id: str, **kwargs) -> FakeResponse:
+        return self._delta(lambda: [{
+            'id': f'{budget_id}-transaction-{n}',
+            'date': f'{self.start + datetime.timedelta(days=n // 100):%Y-%m-%d}',
+            'amount': (n * 7919 % 2000000) - 1000000, 'memo': '', 'cleared': 'cleared', 'approved': True,
+            'account_id': f'{budget_id}-account-{n % self.accounts}', 'account_name': f'Account {n % self.accounts}',
+            'payee_name': f'Payee {n % 101}', 'category_name': f'Category {n % 37}',
+            'transfer_account_id': None, 'import_id': None, 'deleted': False,
+        } for n in range(self.transactions)], 'transactions', **kwargs)
+
+    def create_transaction(self, budget_id: str, data: dict, **kwargs) -> FakeResponse:
+        self.requests += 1
+        created: list = self.created.setdefault(budget_id, [])
+        known: set = {obj.get('import_id') for obj in created}
+
+        ids, duplicates = [], []
+        for obj in data.get('transactions', []):
+            if obj.get('import_id') in known:
+                duplicates.append(obj['import_id'])
+            else:
+                created.append(obj)
+                known.add(obj.get('import_id'))
+                ids.append(f'{budget_id}-created-{len(created)}')
+
+        return self._respond({'data': {'transaction_ids': ids, 'duplicate_import_ids': duplicates}}, **kwargs)
+
+
+def install_pcap(handler, **kwargs) -> FakePersonalCapital:
+    """
+    Use a synthetic client for the Personal Capital handler, instead of logging in.
+
+    Parameters:
+        handler: The Personal Capital handler.
+        **kwargs: The key word arguments to FakePersonalCapital.
+    """
+    client: FakePersonalCapital = FakePersonalCapital(**kwargs)
+    handler._api_client = client
+    return client
+
+
+def install_ynab(handler, **kwargs) -> FakeYNAB:
+    """
+    Use synthetic API objects for the YNAB handler, instead of the YNAB API client.
+
+    Parameters:
+        handler: The YNAB handler.
+        **kwargs: The key word arguments to FakeYNAB.
+    """
+    api: FakeYNAB = FakeYNAB(**kwargs)
+    handler._api_object.update({'budgets': api, 'accounts': api, 'transactions': api})
+    return api
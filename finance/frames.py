@@ -0,0 +1,169 @@
+"""
+Create typed dataframes directly from lists of JSON objects.
+"""
+import dataclasses
+import datetime
+import logging
+import typing
+
+
+import finance.profile
+
+
+from finance.objmap import ObjectMapping, FillnaRules, Fallbacks, UNSET
+
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+def _missing(name: str) -> typing.NoReturn:
+    raise TypeError(f'missing required argument: {name}')
+
+
+def columns_of(cls: typing.Type[ObjectMapping], rows: typing.Iterable[typing.Mapping],
+               instance: typing.Any) -> typing.Dict[str, list]:
+    """
+    Get one list of values per field of the class, without creating the objects.
+    Missing values are taken from the instance attributes, then from the field defaults, and only
+    looked up for the fields that are missing from some of the objects.
+
+    Parameters:
+        cls: The object mapping class.
+        rows: The JSON objects.
+        instance: The object to take missing values from.
+
+    Returns:
+        The columns, keyed by field name.
+    """
+    rows: list = rows if isinstance(rows, list) else list(rows)
+    fallback: Fallbacks = Fallbacks(instance)
+
+    columns: dict = {}
+    for f in dataclasses.fields(cls):
+        if not f.init:
+            continue
+
+        name: str = f.name
+        values: list = [row.get(name, UNSET) for row in rows]
+        if any(value is UNSET for value in values):
+            default = fallback.get(name)
+            if default is not UNSET:
+                pass
+            elif f.default is not dataclasses.MISSING:
+                default = f.default
+            elif f.default_factory is not dataclasses.MISSING:
+                default = f.default_factory()
+            else:
+                _missing(name)
+
+            values: list = [default if value is UNSET else value for value in values]
+
+        columns[name] = values
+
+    return columns
+
+
+def to_datetime(values: 'pd.Series', fmt: str = None) -> 'pd.Series':
+    """
+    Convert a column to datetime64 in one vectorized step.
+
+    Columns that already hold datetimes (for example values reloaded from a YAML cache, or taken from
+    the scraper instance) are converted without any string parsing.
+
+    Parameters:
+        values: The column to convert.
+        fmt: The strftime format of the date strings, if known.
+    """
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    sample: pd.Series = values.dropna()
+    if not sample.empty and isinstance(sample.iloc[0], (datetime.date, datetime.datetime)):
+        return pd.to_datetime(values)
+    else:
+        return pd.to_datetime(values, format=fmt, cache=True)
+
+
+def astype(frame: 'pd.DataFrame', dtypes: typing.Mapping[str, str],
+           formats: typing.Mapping[str, str] = None) -> 'pd.DataFrame':
+    """
+    Convert the columns of the dataframe in place.
+    Columns that can not be converted (for example integers with missing values) are left as they are,
+    and the error is logged.
+
+    Parameters:
+        frame: The dataframe.
+        dtypes: The dtype of each column.
+        formats: The strftime format of each datetime64 column that holds strings.
+    """
+    formats: typing.Mapping[str, str] = formats if formats is not None else {}
+
+    for name, dtype in dtypes.items():
+        if name not in frame.columns or frame[name].dtype == dtype:
+            continue
+
+        try:
+            if dtype.startswith('datetime64'):
+                frame[name] = to_datetime(frame[name], fmt=formats.get(name))
+            else:
+                frame[name] = frame[name].astype(dtype)
+        except (TypeError, ValueError, OverflowError) as error:
+            logging.warning('column %s was left as %s, not converted to %s: %s', name, frame[name].dtype, dtype, error)
+
+    return frame
+
+
+def build_frame(cls: typing.Type[ObjectMapping], rows: typing.Iterable[typing.Mapping], instance: typing.Any,
+                rules: FillnaRules = None, sort: typing.Sequence[str] = None) -> 'pd.DataFrame':
+    """
+    Create a typed dataframe from JSON objects, bypassing the object mapping instances.
+
+    The __post_init__ method of the class is not called, so the conversions it makes to the fields must
+    also be made by the dtypes of the columns (for example date strings parsed to datetime64).
+
+    Parameters:
+        cls: The object mapping class, whose fields are the columns.
+        rows: The JSON objects.
+        instance: The object to take missing values from.
+        rules: The fillna rules, applied before the columns are converted.
+        sort: The columns to sort by (all columns by default).
+
+    Returns:
+        The dataframe.
+    """
+    import pandas as pd
+
+    with finance.profile.timer('frame.columns'):
+        frame: pd.DataFrame = pd.DataFrame(columns_of(cls, rows, instance))
+
+    if rules is not None:
+        with finance.profile.timer('frame.fillna'):
+            frame: pd.DataFrame = rules.fill_frame(frame)
+
+    with finance.profile.timer('frame.astype'):
+        frame: pd.DataFrame = astype(frame, cls.frame_dtypes(), formats=cls.__date_formats__)
+
+    return sort_frame(frame, sort)
+
+
+def sort_frame(frame: 'pd.DataFrame', sort: typing.Sequence[str] = None) -> 'pd.DataFrame':
+    """
+    Sort the rows of a typed dataframe, the same way as build_frame does.
+
+    Parameters:
+        frame: The dataframe.
+        sort: The columns to sort by (all columns by default).
+
+    Returns:
+        The sorted dataframe, with a new index.
+    """
+    columns: list = [c for c in (sort if sort is not None else frame.columns) if c in frame.columns]
+    if columns and not frame.empty:
+        with finance.profile.timer('frame.sort'):
+            frame: 'pd.DataFrame' = frame.sort_values(by=columns)
+            frame: 'pd.DataFrame' = frame.reset_index(drop=True)
+
+    return frame
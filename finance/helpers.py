@@ -4,8 +4,12 @@ A script to save a accounts CSV for the current date.
 import datetime
 import logging
 import typing
+import json
+import time
+import sys
 
 
+import finance.profile
 import finance.config
 
 
@@ -16,29 +20,78 @@ def yyyy_mm_dd(v: str) -> datetime.datetime:
     return datetime.datetime.strptime(v, '%Y-%m-%d')
 
 
-def run(main: typing.Callable, args: typing.Callable, exiting: bool = True) -> int:
+def pop_option(argv: typing.List[str], name: str) -> typing.Union[str, None]:
+    """
+    Remove an option (given as `--name value` or `--name=value`) from the argument list, in place.
+
+    Returns:
+        The value of the option, or None if it was not given.
+    """
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            del argv[i]
+            return argv.pop(i)
+        elif arg.startswith(name + '='):
+            del argv[i]
+            return arg[len(name) + 1:]
+
+    return None
+
+
+def run(main: typing.Callable, args: typing.Callable, exiting: bool = True,
+        profile: str = None, cprofile: str = None) -> int:
     """
     A helper method to execute the main function of a script.
 
+    The --profile and --cprofile options are taken out of the command line arguments before they are parsed.
+
     Parameters:
          main: The main script function.
          args: The command line arguments method.
          exiting: This method will run sys.exit?
+         profile: The path of the JSON timing report (the --profile option).
+         cprofile: The path of the cProfile stats dump (the --cprofile option).
 
     Returns:
         The exitcode, which is >= 0 if the program succeeded.
     """
     exitcode: int = 0
 
+    profile: typing.Union[str, None] = profile if profile is not None else pop_option(sys.argv, '--profile')
+    cprofile: typing.Union[str, None] = cprofile if cprofile is not None else pop_option(sys.argv, '--cprofile')
+
+    profiler = None
+    if cprofile is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    finance.profile.profiler.enabled = profile is not None
+    start: float = time.perf_counter()
+
     # noinspection PyBroadException
     try:
         finance.config.logging()
-        finance.config.pandas()
-        main(**args().__dict__)
+        kwargs: dict = args().__dict__
+        if profiler is not None:
+            profiler.runcall(main, **kwargs)
+        else:
+            main(**kwargs)
     except Exception:
         logging.exception('caught unhandled exception!')
         exitcode = -1
 
+    if profile is not None:
+        report: dict = finance.profile.profiler.report()
+        report['seconds'] = time.perf_counter() - start
+        report['exitcode'] = exitcode
+        with open(profile, 'w') as stream:
+            json.dump(report, stream, indent=1)
+        logging.debug('timing report saved to %s', profile)
+
+    if profiler is not None:
+        profiler.dump_stats(cprofile)
+        logging.debug('cProfile stats saved to %s', cprofile)
+
     if exiting:
         exit(exitcode)
     else:
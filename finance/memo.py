@@ -0,0 +1,118 @@
+"""
+Per-instance cached attributes and a process-wide memory-bounded LRU cache.
+"""
+import collections
+import threading
+import typing
+import os
+
+
+class cached_property:
+    """
+    A property that is computed once per instance and stored in the instance dictionary.
+
+    Unlike a property wrapped in functools.lru_cache, the value is owned by the instance.
+    It is released with the instance and is never shared with (or evicted by) other instances.
+    """
+    def __init__(self, func: typing.Callable):
+        self.func: typing.Callable = func
+        self.name: str = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, instance: typing.Any, owner: type = None) -> typing.Any:
+        if instance is None:
+            return self
+
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            value = instance.__dict__[self.name] = self.func(instance)
+            return value
+
+
+def invalidate(instance: typing.Any, *names: str):
+    """
+    Forget the cached values of the named properties of the instance.
+    """
+    for name in names:
+        instance.__dict__.pop(name, None)
+
+
+class MemoryLRU:
+    """
+    A thread safe least recently used cache that is bounded by the (estimated) size of its values.
+    """
+    def __init__(self, maxbytes: int):
+        """
+        Parameters:
+            maxbytes: The maximum total size of the cached values.
+        """
+        self.maxbytes: int = maxbytes
+        self.nbytes: int = 0
+        self._items: collections.OrderedDict = collections.OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: typing.Hashable, stamp: typing.Hashable = None) -> typing.Any:
+        """
+        Get the value for the key, or None if it is missing or was stored with a different stamp.
+        """
+        with self._lock:
+            try:
+                value, nbytes, _stamp = self._items[key]
+            except KeyError:
+                return None
+
+            if _stamp != stamp:
+                return None
+
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key: typing.Hashable, value: typing.Any, nbytes: int, stamp: typing.Hashable = None):
+        """
+        Store the value for the key, evicting the least recently used values to stay within the bound.
+        Values larger than the bound are not stored.
+        """
+        with self._lock:
+            self._pop(key)
+            if nbytes > self.maxbytes:
+                return
+
+            self._items[key] = (value, nbytes, stamp)
+            self.nbytes += nbytes
+
+            while self.nbytes > self.maxbytes:
+                self._pop(next(iter(self._items)))
+
+    def discard(self, key: typing.Hashable):
+        """
+        Remove the value for the key if it exists.
+        """
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        """
+        Remove all values.
+        """
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def _pop(self, key: typing.Hashable):
+        try:
+            value, nbytes, stamp = self._items.pop(key)
+        except KeyError:
+            pass
+        else:
+            self.nbytes -= nbytes
+
+
+#: The dataframes of scrapers, keyed by (scraper class, cache path)
+frames: MemoryLRU = MemoryLRU(maxbytes=int(os.environ.get('FINANCE_MEMO_BYTES', 256 * 1024 * 1024)))
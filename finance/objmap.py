@@ -2,71 +2,163 @@
 A script to play with the personal capital api.
 """
 import dataclasses
+import functools
+import datetime
 import inspect
 import typing
 
 
+@functools.lru_cache(maxsize=None)
+def _schema(cls: type) -> typing.Tuple[str, ...]:
+    """
+    Get the names of the constructor parameters of the class, resolved once per class.
+    """
+    if dataclasses.is_dataclass(cls):
+        return tuple(f.name for f in dataclasses.fields(cls) if f.init)
+    else:
+        return tuple(inspect.signature(cls).parameters)
+
+
+#: The value of a missing key or attribute
+UNSET: typing.Any = object()
+
+
+class Fallbacks:
+    """
+    The values of the instance attributes that share a name with a constructor parameter.
+
+    An attribute is only looked up the first time its value is missing from a JSON object, and then once
+    for all of the objects, so properties of the instance are never evaluated for nothing.
+    """
+    def __init__(self, instance: typing.Any):
+        self.instance: typing.Any = instance
+        self._values: typing.Dict[str, typing.Any] = {}
+
+    def get(self, name: str) -> typing.Any:
+        """
+        Get the value of the instance attribute, or UNSET if the instance has no such attribute.
+        """
+        try:
+            return self._values[name]
+        except KeyError:
+            self._values[name] = getattr(self.instance, name, UNSET)
+            return self._values[name]
+
+
+#: The dataframe dtypes of the field annotations
+_ANNOTATION_DTYPES: typing.Dict[typing.Any, str] = {
+    int: 'int64',
+    float: 'float64',
+    bool: 'bool',
+    datetime.datetime: 'datetime64[ns]',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _dtypes(cls: type) -> typing.Dict[str, str]:
+    """
+    Get the dataframe dtypes of the fields of the class, resolved once per class.
+    """
+    dtypes: dict = {}
+    for f in dataclasses.fields(cls):
+        try:
+            dtypes[f.name] = cls.__frame_dtypes__[f.name]
+        except KeyError:
+            if f.type in _ANNOTATION_DTYPES:
+                dtypes[f.name] = _ANNOTATION_DTYPES[f.type]
+
+    return dtypes
+
+
 # noinspection PyArgumentList
 @dataclasses.dataclass()
 class ObjectMapping:
     """
     A base class to aid in creating objects from JSON.
     """
+    #: The dataframe dtypes of some fields, overriding the dtypes derived from the annotations
+    __frame_dtypes__: typing.ClassVar[typing.Dict[str, str]] = {}
+    #: The strftime formats of the fields that hold date strings
+    __date_formats__: typing.ClassVar[typing.Dict[str, str]] = {}
+
+    @classmethod
+    def fallbacks(cls, instance: typing.Any) -> dict:
+        """
+        Get the values of the instance attributes that share a name with a constructor parameter.
+        """
+        fallback: dict = {}
+        for name in _schema(cls):
+            try:
+                fallback[name] = getattr(instance, name)
+            except AttributeError:
+                pass
+
+        return fallback
+
+    @classmethod
+    def frame_dtypes(cls) -> typing.Dict[str, str]:
+        """
+        Get the dataframe dtype of each field.
+        Fields of an unknown type (such as str) are left as python objects.
+        """
+        return dict(_dtypes(cls))
+
     @classmethod
     def safe_init(cls, instance: typing.Any, **kwargs) -> 'ObjectMapping':
         """
         Create an object from the keyword arguments.
         Silently ignore any keyword arguments that are not known.
         """
-        skwargs = {}
-        for name in inspect.signature(cls).parameters:
-            try:
-                skwargs[name] = kwargs[name]
-            except KeyError:
-                try:
-                    skwargs[name] = getattr(instance, name)
-                except AttributeError:
-                    pass
-
-        return cls(**skwargs)
+        return cls.safe_init_many([kwargs], instance)[0]
 
-    def fillna(self, rules: typing.List[typing.MutableMapping]) -> 'ObjectMapping':
+    @classmethod
+    def safe_init_many(cls, rows: typing.Iterable[typing.Mapping],
+                       instance: typing.Any) -> typing.List['ObjectMapping']:
         """
-        Fill in missing values based on the list of rules.
+        Create many objects from JSON objects.
+        Silently ignore any keys that are not known.
 
-        The rules is a list of of `where` and `value` mappings.
-        An update occurs when all instance variables match the `where` items.
-        The items from the `values` mapping are used when the update step occurs.
+        The missing values are taken from the instance attributes, which are looked up when a value is
+        first missing, and then once for all rows.
 
         Parameters:
-            rules: A list of rule mappings.
+            rows: The JSON objects.
+            instance: The object to take missing values from.
 
         Returns:
-            The updated instance with missing values filled in based on the rules.
+            A list of objects.
         """
-        for i, rule in enumerate(rules):
-            if self._matches(**rule['where']):
-                self._update(**rule['value'])
-                rules.pop(i)
-                break
+        names: typing.Tuple[str, ...] = _schema(cls)
+        fallback: Fallbacks = Fallbacks(instance)
 
-        return self
+        objects: list = []
+        for row in rows:
+            skwargs: dict = {name: row[name] for name in names if name in row}
+            if len(skwargs) < len(names):
+                for name in names:
+                    if name not in skwargs and fallback.get(name) is not UNSET:
+                        skwargs[name] = fallback.get(name)
+            objects.append(cls(**skwargs))
 
-    def _matches(self, **kwargs) -> bool:
-        """
-        Check to see if key-value pair matches.
+        return objects
 
-        Returns:
-            True if all items match.
+    def fillna(self, rules: typing.Union['FillnaRules', typing.List[typing.Mapping]]) -> 'ObjectMapping':
         """
-        if not kwargs:
-            return False
+        Fill in missing values based on the list of rules.
 
-        for k, v in kwargs.items():
-            if getattr(self, k) != v:
-                return False
+        The rules is a list of of `where` and `value` mappings.
+        An update occurs when all instance variables match the `where` items.
+        The items from the `values` mapping are used when the update step occurs.
+        When many rules match, the first one in the list is used.
 
-        return True
+        Parameters:
+            rules: A list of rule mappings (or the compiled rules).
+
+        Returns:
+            The updated instance with missing values filled in based on the rules.
+        """
+        rules: FillnaRules = rules if isinstance(rules, FillnaRules) else FillnaRules(rules)
+        return rules.apply(self)
 
     def _update(self, **kwargs):
         """
@@ -77,3 +169,107 @@ class ObjectMapping:
                 setattr(self, k, v)
             else:
                 raise AttributeError(k)
+
+
+class FillnaRules:
+    """
+    The fillna rules, compiled into hash indexes keyed by the values of their `where` mappings.
+
+    The rules are grouped by the (sorted) keys of their `where` mappings.
+    Each group maps the tuple of `where` values to the position of the first rule with those values.
+    Matching an object (or a dataframe) then costs one lookup per group, rather than one comparison per rule.
+    """
+    def __init__(self, rules: typing.Iterable[typing.Mapping]):
+        """
+        Parameters:
+            rules: A list of rule mappings.
+        """
+        self.rules: typing.List[typing.Mapping] = list(rules)
+        self.index: typing.Dict[typing.Tuple[str, ...], typing.Dict[tuple, int]] = {}
+
+        for i, rule in enumerate(self.rules):
+            where: typing.Mapping = rule.get('where') or {}
+            if where:
+                keys: typing.Tuple[str, ...] = tuple(sorted(where))
+                self.index.setdefault(keys, {}).setdefault(tuple(where[k] for k in keys), i)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, obj: typing.Any) -> typing.Union[typing.Mapping, None]:
+        """
+        Get the `value` mapping of the first rule that matches the object.
+        """
+        best: typing.Union[int, None] = None
+        for keys, table in self.index.items():
+            i: typing.Union[int, None] = table.get(tuple(getattr(obj, k) for k in keys))
+            if i is not None and (best is None or i < best):
+                best = i
+
+        return self.rules[best]['value'] if best is not None else None
+
+    def apply(self, obj: ObjectMapping) -> ObjectMapping:
+        """
+        Fill in the missing values of the object.
+        """
+        value: typing.Union[typing.Mapping, None] = self.match(obj)
+        if value:
+            # noinspection PyProtectedMember
+            obj._update(**value)
+
+        return obj
+
+    def fill_frame(self, frame):
+        """
+        Fill in the missing values of every row of the dataframe in place.
+
+        Each group of rules is left joined onto the dataframe by its `where` columns.
+        The first matching rule of each row is then applied one `value` column at a time.
+
+        Parameters:
+            frame: The dataframe, with one column per object attribute.
+
+        Returns:
+            The updated dataframe.
+        """
+        import pandas as pd
+
+        if not self.index or frame.empty:
+            return frame
+
+        nomatch: int = len(self.rules)
+        best: pd.Series = pd.Series(nomatch, index=frame.index)
+        for keys, table in self.index.items():
+            for k in keys:
+                if k not in frame.columns:
+                    raise AttributeError(k)
+
+            lookup = pd.DataFrame([values + (i,) for values, i in table.items()], columns=list(keys) + ['__rule__'])
+            left = frame[list(keys)]
+            for k in keys:
+                if lookup[k].dtype != left[k].dtype:
+                    left = left.astype({k: object})
+                    lookup = lookup.astype({k: object})
+
+            matched: pd.Series = left.merge(lookup, how='left', on=list(keys))['__rule__']
+            matched.index = frame.index
+            best = best.where(~(matched < best), matched)
+
+        columns: dict = {}
+        for i in sorted(set(best[best < nomatch])):
+            for k, v in self.rules[int(i)]['value'].items():
+                columns.setdefault(k, {})[i] = v
+
+        for column, values in columns.items():
+            if column not in frame.columns:
+                raise AttributeError(column)
+
+            mask: pd.Series = best.isin(list(values))
+            update: pd.Series = best[mask].map(values)
+            try:
+                frame.loc[mask, column] = update
+            except (TypeError, ValueError):
+                frame[column] = frame[column].astype(object)
+                frame.loc[mask, column] = update
+
+        return frame
@@ -0,0 +1,254 @@
+"""
+Store JSON objects in monthly partition files, with a manifest of the days that are covered.
+"""
+import collections
+import threading
+import datetime
+import typing
+import json
+import os
+
+
+import finance.store
+
+
+#: A lock for each partition directory, shared by all store instances in the process
+_LOCKS: typing.DefaultDict[str, threading.RLock] = collections.defaultdict(threading.RLock)
+
+
+def days_in(d0: datetime.date, d1: datetime.date) -> typing.List[datetime.date]:
+    """
+    Get the days from d0 to d1 (inclusive).
+    """
+    return [d0 + datetime.timedelta(days=i) for i in range((d1 - d0).days + 1)]
+
+
+def ranges_of(days: typing.Iterable[datetime.date]) -> typing.List[typing.Tuple[datetime.date, datetime.date]]:
+    """
+    Group the days into contiguous (first, last) ranges.
+    """
+    ranges: list = []
+    for day in sorted(days):
+        if ranges and (day - ranges[-1][1]).days == 1:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+
+    return ranges
+
+
+class PartitionStore:
+    """
+    Store JSON objects in monthly partition files, with a manifest of the days that are covered.
+    """
+    def __init__(self, root: str, date_key: str, store_format: str):
+        """
+        Parameters:
+            root: The directory of the partition files.
+            date_key: The key of the YYYY-MM-DD date of each JSON object.
+            store_format: The name of the cache format of the partition files.
+        """
+        self.root: str = root
+        self.date_key: str = date_key
+        self.store_format: str = store_format
+        self.manifest_path: str = os.path.join(root, 'manifest.json')
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        Get the lock for the partition directory.
+        """
+        return _LOCKS[os.path.abspath(self.root)]
+
+    def manifest(self) -> dict:
+        """
+        Get the mapping of covered YYYY-MM-DD days to the time they were fetched.
+        """
+        try:
+            with open(self.manifest_path, 'r') as stream:
+                return json.load(stream).get('days', {})
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, days: dict):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.manifest_path + '.tmp', 'w') as stream:
+            json.dump({'days': days}, stream, indent=1, sort_keys=True)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+    def partition(self, day: datetime.date) -> str:
+        """
+        Get the path of the partition file for the day.
+        """
+        return finance.store.with_format(os.path.join(self.root, f'{day:%Y-%m}'), self.store_format)
+
+    def _load(self, path: str) -> list:
+        found: typing.Union[str, None] = finance.store.find(path)
+        return finance.store.load(found) if found is not None else []
+
+    def missing(self, d0: datetime.date, d1: datetime.date,
+                hot: datetime.date = None) -> typing.List[typing.Tuple[datetime.date, datetime.date]]:
+        """
+        Get the ranges of days from d0 to d1 (inclusive) that are not covered yet.
+
+        Parameters:
+            d0: The first day.
+            d1: The last day.
+            hot: Days on or after this day are always considered missing.
+        """
+        covered: dict = self.manifest()
+        return ranges_of(
+            day for day in days_in(d0, d1) if f'{day:%Y-%m-%d}' not in covered or (hot is not None and day >= hot))
+
+    def _rewrite(self, month: str, keep: typing.Callable[[dict], bool], data: typing.Iterable[dict] = ()):
+        """
+        Rewrite the partition file of the YYYY-MM month, keeping some of the existing objects.
+        """
+        path: str = self.partition(datetime.datetime.strptime(month, '%Y-%m'))
+        kept: list = [obj for obj in self._load(path) if keep(obj)] + list(data)
+        if not kept and finance.store.find(path) is None:
+            return
+
+        temp: str = os.path.join(self.root, '.tmp-' + os.path.basename(path))
+        finance.store.dump(kept, temp)
+        os.replace(temp, path)
+
+    def uncover(self, d0: datetime.date, d1: datetime.date):
+        """
+        Mark the days from d0 to d1 (inclusive) as not covered.
+        """
+        with self.lock:
+            covered: dict = self.manifest()
+            for day in days_in(d0, d1):
+                covered.pop(f'{day:%Y-%m-%d}', None)
+            self._save_manifest(covered)
+
+    def replace(self, d0: datetime.date, d1: datetime.date, month: str, data: typing.Iterable[dict] = ()):
+        """
+        Replace the JSON objects for the days from d0 to d1 (inclusive) that fall in the YYYY-MM month,
+        rewriting its partition once. The objects on other days are dropped.
+        """
+        first, last = f'{d0:%Y-%m-%d}', f'{d1:%Y-%m-%d}'
+        data: list = [obj for obj in data if first <= obj[self.date_key][:10] <= last]
+
+        with self.lock:
+            self._rewrite(month, keep=lambda obj: not first <= obj[self.date_key][:10] <= last, data=data)
+
+    def clear(self, d0: datetime.date, d1: datetime.date):
+        """
+        Remove the JSON objects for the days from d0 to d1 (inclusive) and mark the days as not covered.
+        """
+        with self.lock:
+            self.uncover(d0, d1)
+            for month in sorted({f'{day:%Y-%m}' for day in days_in(d0, d1)}):
+                self.replace(d0, d1, month)
+
+    def append(self, d0: datetime.date, d1: datetime.date, data: typing.Iterable[dict]):
+        """
+        Add the JSON objects that fall on the days from d0 to d1 (inclusive) to their partitions.
+        """
+        first, last = f'{d0:%Y-%m-%d}', f'{d1:%Y-%m-%d}'
+
+        months: typing.DefaultDict[str, list] = collections.defaultdict(list)
+        for obj in data:
+            day: str = obj[self.date_key][:10]
+            if first <= day <= last:
+                months[day[:7]].append(obj)
+
+        with self.lock:
+            for month in sorted(months):
+                self._rewrite(month, keep=lambda obj: True, data=months[month])
+
+    def cover(self, d0: datetime.date, d1: datetime.date):
+        """
+        Mark the days from d0 to d1 (inclusive) as covered.
+        """
+        now: str = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+
+        with self.lock:
+            covered: dict = self.manifest()
+            covered.update({f'{day:%Y-%m-%d}': now for day in days_in(d0, d1)})
+            self._save_manifest(covered)
+
+    def write(self, d0: datetime.date, d1: datetime.date, data: typing.Iterable[dict]):
+        """
+        Replace the JSON objects for the days from d0 to d1 (inclusive) and mark the days as covered.
+        """
+        for _ in self.fill(d0, d1, [list(data)]):
+            pass
+
+    def fill(self, d0: datetime.date, d1: datetime.date,
+             pages: typing.Iterable[list]) -> typing.Generator[list, None, None]:
+        """
+        Replace the JSON objects for the days from d0 to d1 (inclusive) with the objects of the pages,
+        and mark the days as covered once every page was consumed.
+
+        The pages are passed through as they are consumed. The objects are buffered by month, and the
+        partition of a month is rewritten once, as soon as a page falls entirely before or after that month
+        (the pages are expected in date order, newest or oldest first) or else after the last page.
+
+        Parameters:
+            d0: The first day.
+            d1: The last day.
+            pages: The lists of JSON objects.
+
+        Yields:
+            The pages.
+        """
+        first, last = f'{d0:%Y-%m-%d}', f'{d1:%Y-%m-%d}'
+        pending: set = {f'{day:%Y-%m}' for day in days_in(d0, d1)}
+        buffers: typing.DefaultDict[str, list] = collections.defaultdict(list)
+
+        def flush(month: str):
+            if month in pending:
+                self.replace(d0, d1, month, buffers.pop(month, []))
+                pending.discard(month)
+            else:
+                self.append(d0, d1, buffers.pop(month, []))
+
+        self.uncover(d0, d1)
+        for page in pages:
+            for obj in page:
+                day: str = obj[self.date_key][:10]
+                if first <= day <= last:
+                    buffers[day[:7]].append(obj)
+
+            yield page
+
+            if page:
+                months: list = [obj[self.date_key][:7] for obj in page]
+                oldest, newest = min(months), max(months)
+                for month in sorted(m for m in buffers if not oldest <= m <= newest):
+                    flush(month)
+
+        for month in sorted(set(buffers) | pending):
+            flush(month)
+        self.cover(d0, d1)
+
+    def iter_read(self, d0: datetime.date, d1: datetime.date,
+                  skip: typing.Container[str] = ()) -> typing.Generator[dict, None, None]:
+        """
+        Iterate over the JSON objects for the days from d0 to d1 (inclusive), one partition at a time.
+
+        Parameters:
+            d0: The first day.
+            d1: The last day.
+            skip: The YYYY-MM-DD days to leave out.
+        """
+        first, last = f'{d0:%Y-%m-%d}', f'{d1:%Y-%m-%d}'
+        months: list = sorted({f'{day:%Y-%m}' for day in days_in(d0, d1)})
+
+        for month in months:
+            with self.lock:
+                data: list = self._load(self.partition(datetime.datetime.strptime(month, '%Y-%m')))
+
+            for obj in data:
+                day: str = obj[self.date_key][:10]
+                if first <= day <= last and day not in skip:
+                    yield obj
+
+    def read(self, d0: datetime.date, d1: datetime.date) -> list:
+        """
+        Get the JSON objects for the days from d0 to d1 (inclusive).
+        """
+        return list(self.iter_read(d0, d1))
@@ -2,18 +2,23 @@
 A wrapper around the Personal Capital API.
 """
 import dataclasses
-import functools
+import threading
+import logging
 import typing
 import json
 import os
 
 
+import finance.profile
+import finance.memo
+
+
 from finance.api import BaseHandler, BaseConfig
 
 
-from personalcapital import TwoFactorVerificationModeEnum
-from personalcapital import RequireTwoFactorException
-from personalcapital import PersonalCapital
+if typing.TYPE_CHECKING:
+    from personalcapital import PersonalCapital
+    import requests
 
 
 @dataclasses.dataclass()
@@ -21,8 +26,14 @@ class PCAPConfig(BaseConfig):
     """
     The configuration for Personal Capital.
     """
+    __settings__: typing.ClassVar[typing.Dict[str, tuple]] = dict(
+        BaseConfig.__settings__, pool_size=('PC_POOL_SIZE', 8, int), rate=('PC_RATE', 5, float),
+        burst=('PC_BURST', 8, int))
+
     #: The path to the personal capital session cookie
     cookies: str = dataclasses.field(init=False, default='session.json')
+    #: The number of pooled keep-alive HTTP connections
+    pool_size: int = None
 
     @property
     def username(self) -> str:
@@ -43,55 +54,204 @@ class PCAPConfig(BaseConfig):
         self.cookies = os.path.join(self.workdir, self.cookies)
 
 
+class ClientSession:
+    """
+    The csrf token and requests session of a personal capital client.
+
+    The personalcapital package keeps them in (name mangled) private attributes, which are checked before
+    they are used, so that another version of the package falls back to logging in on every run.
+    """
+    #: The (name mangled) attribute of the personal capital client that holds the csrf token
+    __csrf_attr__: str = '_PersonalCapital__csrf'
+    #: The (name mangled) attribute of the personal capital client that holds the requests session
+    __http_attr__: str = '_PersonalCapital__session'
+
+    def __init__(self, client: 'PersonalCapital'):
+        self.client: 'PersonalCapital' = client
+
+    @property
+    def resumable(self) -> bool:
+        """
+        Does the client have a csrf token, so that a saved session can be resumed without logging in?
+        """
+        return hasattr(self.client, self.__csrf_attr__)
+
+    @property
+    def csrf(self) -> str:
+        """
+        Get the csrf token of the client, or an empty token.
+        """
+        return getattr(self.client, self.__csrf_attr__, '') or ''
+
+    @csrf.setter
+    def csrf(self, value: str):
+        """
+        Set the csrf token of the client.
+
+        Raises:
+            AttributeError: If the client has no csrf token.
+        """
+        if not self.resumable:
+            raise AttributeError(f'{self.client.__class__.__name__} has no {self.__csrf_attr__}')
+
+        setattr(self.client, self.__csrf_attr__, value)
+
+    @property
+    def http(self) -> typing.Union['requests.Session', None]:
+        """
+        Get the requests session of the client, or None.
+        """
+        import requests
+
+        session = getattr(self.client, self.__http_attr__, None)
+        return session if isinstance(session, requests.Session) else None
+
+
 class PCAPHandler(BaseHandler):
     """
     A wrapper around the Personal Capital API.
     """
+    __provider__: str = 'pcap'
+
     def __init__(self, config: PCAPConfig = None):
         super().__init__(config=config if config is not None else PCAPConfig())
-        self._api_client: typing.Union[PersonalCapital, None] = None
+        self._api_client: typing.Union['PersonalCapital', None] = None
+        self._api_client_lock: threading.RLock = threading.RLock()
 
     @property
-    def client(self) -> PersonalCapital:
+    def client(self) -> 'PersonalCapital':
         """
         Log into Personal Capital and save the session.
         """
+        with self._api_client_lock:
+            return self._get_client()
+
+    def _get_client(self) -> 'PersonalCapital':
+        """
+        Log into Personal Capital and save the session (not thread safe).
+
+        A saved session is probed first, and the login is skipped if it is still valid. If the csrf token
+        of the client can not be restored, the client logs in every time.
+        """
         if self._api_client is None:
+            from personalcapital import TwoFactorVerificationModeEnum
+            from personalcapital import RequireTwoFactorException
+            from personalcapital import PersonalCapital
+
             self._api_client: PersonalCapital = PersonalCapital()
+            session: ClientSession = ClientSession(self._api_client)
+            self._mount_pool(session)
 
             if self._session_cookies:
                 self._api_client.set_session(self._session_cookies)
+                if session.resumable:
+                    session.csrf = self._session_csrf
+                else:
+                    logging.warning('the personal capital session can not be resumed, logging in')
 
-            try:
-                self._api_client.login(self.config.username, self.config.password)
-            except RequireTwoFactorException:
-                self._api_client.two_factor_challenge(TwoFactorVerificationModeEnum.SMS)
-                self._api_client.two_factor_authenticate(TwoFactorVerificationModeEnum.SMS, self._auth_code)
-                self._api_client.authenticate_password(self.config.password)
+            if not self._session_cookies or not session.resumable or not self.is_session_valid(self._api_client):
+                try:
+                    self._api_client.login(self.config.username, self.config.password)
+                except RequireTwoFactorException:
+                    self._api_client.two_factor_challenge(TwoFactorVerificationModeEnum.SMS)
+                    self._api_client.two_factor_authenticate(TwoFactorVerificationModeEnum.SMS, self._auth_code)
+                    self._api_client.authenticate_password(self.config.password)
 
-            with open(self.config.cookies, 'w') as stream:
-                stream.write(json.dumps(self._api_client.get_session()))
+            self._save_session(session)
 
             return self._api_client
         else:
             return self._api_client
 
-    @property
-    @functools.lru_cache(maxsize=1)
+    def fetch(self, endpoint: str, data: dict = None) -> 'requests.Response':
+        """
+        Send a request through the scheduler, which waits for the rate limit and retries 429 and 5xx responses.
+
+        Parameters:
+            endpoint: The API endpoint, for example /invest/getHoldings.
+            data: The request payload.
+
+        Returns:
+            The response.
+        """
+        with finance.profile.timer('pcap.request'):
+            response = self.scheduler.call(self.client.fetch, endpoint, data=data, priority=self.priority)
+
+        finance.profile.response('pcap', response)
+        return response
+
+    def _mount_pool(self, session: ClientSession):
+        """
+        Use a pool of keep-alive connections, sized by the configuration, for the client requests.
+        """
+        import requests.adapters
+
+        http = session.http
+        if http is not None:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.config.pool_size)
+            http.mount('https://', adapter)
+
+    @staticmethod
+    def is_session_valid(client: 'PersonalCapital') -> bool:
+        """
+        Check, with one cheap request, if the session of the client is still authenticated.
+        """
+        # noinspection PyBroadException
+        try:
+            header: dict = client.fetch('/login/querySession').json().get('spHeader', {})
+        except Exception:
+            return False
+
+        return bool(header.get('success')) and header.get('authLevel') == 'SESSION_AUTHENTICATED'
+
+    def _save_session(self, session: ClientSession):
+        """
+        Save the session cookies and csrf token, only if they changed.
+        """
+        cookies: dict = session.client.get_session()
+        csrf: str = session.csrf
+        if cookies == self._session_cookies and csrf == self._session_csrf:
+            return
+
+        with open(self.config.cookies, 'w') as stream:
+            stream.write(json.dumps({'cookies': cookies, 'csrf': csrf}))
+
+        self._saved_session = {'cookies': cookies, 'csrf': csrf}
+
+    @finance.memo.cached_property
     def _auth_code(self) -> str:
         """
         Get the personal capital two factor auth code.
         """
         return input('code: ')
 
-    @property
-    @functools.lru_cache(maxsize=1)
-    def _session_cookies(self) -> dict:
+    @finance.memo.cached_property
+    def _saved_session(self) -> dict:
         """
-        Get the session cookies dictionary if it was saved.
+        Get the saved session (cookies and csrf token), or an empty session.
         """
         try:
             with open(self.config.cookies, 'r') as stream:
-                return json.load(stream)
+                session: dict = json.load(stream)
         except FileNotFoundError:
-            return {}
+            return {'cookies': {}, 'csrf': ''}
+
+        # older session files only hold the cookies
+        if 'cookies' not in session:
+            return {'cookies': session, 'csrf': ''}
+        else:
+            return session
+
+    @property
+    def _session_cookies(self) -> dict:
+        """
+        Get the session cookies dictionary if it was saved.
+        """
+        return self._saved_session.get('cookies', {})
+
+    @property
+    def _session_csrf(self) -> str:
+        """
+        Get the session csrf token if it was saved.
+        """
+        return self._saved_session.get('csrf', '')
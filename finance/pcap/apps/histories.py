@@ -5,8 +5,10 @@ import datetime
 import argparse
 
 
-import finance.scrapers
+import finance.pcap.scrapers
+import finance.exports
 import finance.helpers
+import finance.config
 
 
 from finance.helpers import yyyy_mm_dd
@@ -22,8 +24,17 @@ def get_arguments(args=None) -> argparse.Namespace:
     parser.add_argument('--stub', default='{t0:%Y-%m-%d}-{dt:03d}-pcap-histories.csv', type=str)
     parser.add_argument('--t0', default=datetime.datetime.now(tz=datetime.timezone.utc), type=yyyy_mm_dd)
     parser.add_argument('--dt', default=1, type=int, help='number of days after t0 to fetch')
+    finance.exports.add_arguments(parser)
     return parser.parse_args(args=args)
 
 
+def main(**kwargs) -> finance.pcap.scrapers.HistoriesScraper:
+    """
+    Save the histories CSV for the date range.
+    """
+    finance.config.pandas()
+    return finance.pcap.scrapers.HistoriesScraper.export(**kwargs)
+
+
 if __name__ == '__main__':
-    finance.helpers.run(finance.scrapers.pcap.HistoriesScraper.export, get_arguments)
+    finance.helpers.run(main, get_arguments)
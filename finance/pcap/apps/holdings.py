@@ -4,20 +4,31 @@ A script to save a holdings CSV for the current date.
 import argparse
 
 
-import finance.scrapers
+import finance.pcap.scrapers
+import finance.exports
 import finance.helpers
+import finance.config
 
 
 # noinspection DuplicatedCode
-def get_arguments() -> argparse.Namespace:
+def get_arguments(args=None) -> argparse.Namespace:
     """
     Get the command line arguments.
     """
     parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument('--force', action='store_true', help='force redownload?')
     parser.add_argument('--stub', default='{config.dt:%Y-%m-%d}-pcap-holdings.csv', type=str)
-    return parser.parse_args()
+    finance.exports.add_arguments(parser)
+    return parser.parse_args(args=args)
+
+
+def main(**kwargs) -> finance.pcap.scrapers.HoldingsScraper:
+    """
+    Save the holdings CSV for the current date.
+    """
+    finance.config.pandas()
+    return finance.pcap.scrapers.HoldingsScraper.export(**kwargs)
 
 
 if __name__ == '__main__':
-    finance.helpers.run(finance.scrapers.pcap.HoldingsScraper.export, get_arguments)
+    finance.helpers.run(main, get_arguments)
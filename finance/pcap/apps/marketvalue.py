@@ -13,9 +13,11 @@ import re
 import os
 
 
-import finance.scrapers
+import finance.pcap.scrapers
+import finance.pcap.planner
+import finance.pcap.api
 import finance.helpers
-import finance.apis
+import finance.config
 
 
 from finance.helpers import yyyy_mm_dd
@@ -55,6 +57,13 @@ def make_frame(samples: pd.Series) -> pd.DataFrame:
     return frame.reset_index(drop=True)
 
 
+def utc(times: pd.Series) -> pd.Series:
+    """
+    Get the (naive UTC) times of the histories as timezone aware UTC times, as the intervals were given.
+    """
+    return times.dt.tz_localize(datetime.timezone.utc) if times.dt.tz is None else times
+
+
 def days_of_month(year: int, month: int) -> typing.Tuple[str, pd.DataFrame]:
     """
     Create a dataframe with samples [t0, t1, dt] for each day in a given month, of a given year.
@@ -95,14 +104,14 @@ def months_of_year(year: int) -> typing.Tuple[str, pd.DataFrame]:
     return r'export/{time:%Y-01-01}-M-{name}.csv', make_frame(samples)
 
 
-def get_histories(frame: pd.DataFrame, force: bool) -> typing.Generator[pd.DataFrame, None, None]:
+def get_histories(frame: pd.DataFrame, force: bool, workers: int = 4,
+                  handler: finance.pcap.api.PCAPHandler = None) -> typing.List[pd.DataFrame]:
     """
     Fetch the histories in the given intervals.
+    Intervals that are chains of cached (finer) intervals are summed instead of fetched.
     """
-    handler = finance.apis.pcap.PCAPHandler()
-    for index, row in frame.iterrows():
-        _kwargs = dict(handler=handler, t0=row['t0'], dt=row['dt'], force=force)
-        yield finance.scrapers.pcap.HistoriesScraper(**_kwargs).frame
+    planner = finance.pcap.planner.IntervalPlanner(handler=handler, force=force)
+    return planner.frames(list(zip(frame['t0'], frame['dt'])), workers=workers)
 
 
 def add_rowsum(frame):
@@ -113,6 +122,7 @@ def add_rowsum(frame):
     rowsum.index = ['Total']
 
     rowsum = pd.concat([frame.reset_index(drop=True), rowsum], sort=False)
+    rowsum = rowsum.astype({name: object for name in rowsum.select_dtypes('category').columns})
     rowsum = rowsum.fillna('')
 
     return rowsum
@@ -127,7 +137,7 @@ def debug_dataframe(name, frame):
 
 
 # noinspection DuplicatedCode
-def get_arguments() -> argparse.Namespace:
+def get_arguments(args=None) -> argparse.Namespace:
     """
     Get the command line arguments.
     """
@@ -138,14 +148,18 @@ def get_arguments() -> argparse.Namespace:
     parser.add_argument('--start', default=start, type=yyyy_mm_dd, help='The starting YYYY/MM/DD of the sample')
     parser.add_argument('--frequency', default='W', type=str, choices=['D', 'W', 'M'], help='The sampling frequency')
     parser.add_argument('--ynabframe', action='store_true', help='reformace the dataframe for YNAB import CSV files')
+    parser.add_argument('--ynabpush', action='store_true', help='push the market value changes into YNAB')
+    parser.add_argument('--workers', default=4, type=int, help='The maximum number of concurrent API calls')
 
-    return parser.parse_args()
+    return parser.parse_args(args=args)
 
 
-def main(force: bool, start: datetime.datetime, frequency: str, ynabframe: bool):
+def main(force: bool, start: datetime.datetime, frequency: str, ynabframe: bool, ynabpush: bool = False,
+         workers: int = 4, handler: finance.pcap.api.PCAPHandler = None):
     """
     A script to download the market value for an account.
     """
+    finance.config.pandas()
     stub, frame = {
         'D': lambda: days_of_month(start.year, start.month),
         'W': lambda: weeks_of_month(start.year, start.month),
@@ -154,13 +168,13 @@ def main(force: bool, start: datetime.datetime, frequency: str, ynabframe: bool)
 
     logging.debug('\n%s', frame)
 
-    frame = pd.concat(get_histories(frame, force=force), ignore_index=True)
+    frame = pd.concat(get_histories(frame, force=force, workers=workers, handler=handler), ignore_index=True)
     frame = frame.sort_values(by=['accountName', 't0'])
 
     for account_name, account_data in frame.groupby(by='accountName'):
         if ynabframe:
             account_data = pd.DataFrame({
-                'Date': account_data['t1'], 'Payee': 'Market',
+                'Date': utc(account_data['t1']), 'Payee': 'Market',
                 'Memo': '', 'Amount': account_data['dateRangePerformanceValueChange']
             })
 
@@ -174,6 +188,23 @@ def main(force: bool, start: datetime.datetime, frequency: str, ynabframe: bool)
         account_data = add_rowsum(account_data)
         debug_dataframe(account_name, account_data)
 
+    if ynabpush:
+        push_ynab(frame)
+
+
+def push_ynab(frame: pd.DataFrame):
+    """
+    Push the market value changes of the mapped accounts into YNAB, with one bulk request per budget.
+    """
+    import finance.ynab.push
+    import finance.ynab.api
+
+    handler = finance.ynab.api.YNABHandler()
+    mapping = finance.ynab.push.load_mapping(handler.config.workdir)
+    budgets = finance.ynab.push.market_value_transactions(frame, mapping, handler=handler)
+    for budget_id, summary in finance.ynab.push.push_transactions(handler, budgets).items():
+        logging.debug('YNAB budget %s: %d created, %d duplicates', budget_id, summary['created'], summary['duplicates'])
+
 
 if __name__ == '__main__':
     finance.helpers.run(main, get_arguments)
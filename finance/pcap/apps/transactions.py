@@ -5,15 +5,17 @@ import datetime
 import argparse
 
 
-import finance.scrapers
+import finance.pcap.scrapers
+import finance.exports
 import finance.helpers
+import finance.config
 
 
 from finance.helpers import yyyy_mm_dd
 
 
 # noinspection DuplicatedCode
-def get_arguments() -> argparse.Namespace:
+def get_arguments(args=None) -> argparse.Namespace:
     """
     Get the command line arguments.
     """
@@ -22,8 +24,18 @@ def get_arguments() -> argparse.Namespace:
     parser.add_argument('--stub', default='{t0:%Y-%m-%d}-{dt:03d}-pcap-transactions.csv', type=str)
     parser.add_argument('--t0', default=datetime.datetime.now(tz=datetime.timezone.utc), type=yyyy_mm_dd)
     parser.add_argument('--dt', default=1, type=int, help='number of days after t0 to fetch')
-    return parser.parse_args()
+    parser.add_argument('--hot', default=None, type=int, help='number of trailing days to always refetch')
+    finance.exports.add_arguments(parser)
+    return parser.parse_args(args=args)
+
+
+def main(**kwargs) -> finance.pcap.scrapers.TransactionsScraper:
+    """
+    Save the transactions CSV for the date range.
+    """
+    finance.config.pandas()
+    return finance.pcap.scrapers.TransactionsScraper.export(**kwargs)
 
 
 if __name__ == '__main__':
-    finance.helpers.run(finance.scrapers.pcap.TransactionsScraper.export, get_arguments)
+    finance.helpers.run(main, get_arguments)
@@ -0,0 +1,243 @@
+"""
+Plan the history intervals to fetch, reusing cached intervals and deriving coarse periods from finer ones.
+
+An interval is identified by the dates it spans (the API only receives dates), and like the intervals of
+the marketvalue app, it runs from the end of its start date to the end of its end date.
+Intervals that share an end and start date chain together, and the additive fields of a chain
+are summed to get the fields of the interval from the start of the first to the end of the last.
+"""
+import collections
+import dataclasses
+import datetime
+import typing
+import re
+import os
+
+
+import pandas as pd
+
+
+import finance.pcap.scraper
+import finance.pcap.api
+import finance.catalog
+import finance.frames
+import finance.store
+
+
+from finance.pcap.scrapers.histories import HistoriesScraper, History
+
+
+#: The fields of a history that can be summed over a chain of intervals
+ADDITIVE: typing.Tuple[str, ...] = (
+    'cashFlow', 'income', 'expense', 'dateRangePerformanceValueChange', 'dateRangeBalanceValueChange',
+)
+
+#: The (start date, end date) of an interval
+Span = typing.Tuple[datetime.date, datetime.date]
+
+
+def span_of(t0: datetime.datetime, dt: int) -> Span:
+    """
+    Get the dates spanned by the interval.
+    """
+    d0: datetime.date = finance.pcap.scraper.naive_utc(t0).date() if isinstance(t0, datetime.datetime) else t0
+    return d0, d0 + datetime.timedelta(days=dt)
+
+
+@dataclasses.dataclass()
+class Plan:
+    """
+    The intervals to fetch from the API, and the chains of intervals to derive the other intervals from.
+    """
+    #: The (t0, dt) intervals to fetch or reload
+    fetch: typing.List[typing.Tuple[datetime.datetime, int]]
+    #: The chain of spans of each derived span
+    derive: typing.Dict[Span, typing.List[Span]]
+
+
+class IntervalPlanner:
+    """
+    Get the histories of many intervals with the least number of API calls.
+    """
+    #: The pattern of the history cache file names
+    __cache_pattern__: typing.Pattern = re.compile(r'^(\d{4}-\d{2}-\d{2})-(\d{3})-pcap-histories\.\w+$')
+
+    def __init__(self, handler: finance.pcap.api.PCAPHandler = None, force: bool = False):
+        """
+        Parameters:
+            handler: The api handler instance.
+            force: Use the API even if the intervals are cached?
+        """
+        handler = handler if handler is not None else finance.pcap.api.PCAPHandler()
+        self.handler: finance.pcap.api.PCAPHandler = handler
+        self.force: bool = force
+
+    def cached(self) -> typing.Set[Span]:
+        """
+        Get the spans of the history intervals that are cached, from the cache catalog.
+        The entries of cache files that no longer exist are removed from the catalog.
+        """
+        if self.force:
+            return set()
+
+        catalog: finance.catalog.Catalog = finance.catalog.of(self.handler.config.workdir)
+        if not catalog.scanned(HistoriesScraper.__name__):
+            self.adopt(catalog)
+
+        spans: set = set()
+        for entry in catalog.entries(provider=self.handler.__provider__, scraper=HistoriesScraper.__name__):
+            if not os.path.exists(entry.path):
+                catalog.forget(entry.path)
+                continue
+
+            spans.add(span_of(datetime.datetime.strptime(entry.t0, '%Y-%m-%d').date(), entry.params['dt']))
+
+        return spans
+
+    def adopt(self, catalog: finance.catalog.Catalog):
+        """
+        Record the history cache files that were written before the catalog existed, once.
+        """
+        root: str = os.path.join(self.handler.config.workdir, 'cache')
+        for name in os.listdir(root) if os.path.isdir(root) else []:
+            match: typing.Union[typing.Match, None] = self.__cache_pattern__.match(name)
+            if match is not None and finance.store.guess_format(name) is not None:
+                path: str = os.path.join(root, name)
+                if catalog.lookup(path) is None:
+                    d0, d1 = span_of(datetime.datetime.strptime(match.group(1), '%Y-%m-%d').date(),
+                                     int(match.group(2)))
+                    catalog.record(path, self.handler.__provider__, HistoriesScraper.__name__,
+                                   params={'t0': match.group(1), 'dt': int(match.group(2))}, t0=d0, t1=d1,
+                                   fetched=os.path.getmtime(path))
+
+        catalog.mark_scanned(HistoriesScraper.__name__)
+
+    @staticmethod
+    def chain(span: Span, spans: typing.Iterable[Span]) -> typing.Union[typing.List[Span], None]:
+        """
+        Find the chain of the fewest spans that covers the span exactly, or None.
+
+        Each span of the chain starts on the date the span before it ends, as the histories of a span
+        start at the end of its start date.
+        """
+        d0, d1 = span
+        edges: typing.DefaultDict[datetime.date, list] = collections.defaultdict(list)
+        for s0, s1 in spans:
+            if d0 <= s0 < s1 <= d1:
+                edges[s0].append(s1)
+
+        previous: typing.Dict[datetime.date, datetime.date] = {d0: d0}
+        frontier: list = [d0]
+        while frontier and d1 not in previous:
+            following: list = []
+            for s0 in frontier:
+                for s1 in edges[s0]:
+                    if s1 not in previous:
+                        previous[s1] = s0
+                        following.append(s1)
+            frontier = following
+
+        if d1 not in previous or d0 == d1:
+            return None
+
+        chain: list = []
+        while d1 != d0:
+            chain.append((previous[d1], d1))
+            d1 = previous[d1]
+
+        return chain[::-1]
+
+    def plan(self, intervals: typing.Iterable[typing.Tuple[datetime.datetime, int]]) -> Plan:
+        """
+        Plan the intervals to fetch (or reload) and the intervals to derive.
+
+        The intervals are planned from the finest to the coarsest, so a coarse interval can also be derived
+        from finer intervals that are fetched in the same run.
+        """
+        requested: typing.Dict[Span, tuple] = {}
+        for t0, dt in intervals:
+            requested.setdefault(span_of(t0, dt), (t0, dt))
+
+        cached: typing.Set[Span] = self.cached()
+        available: typing.Set[Span] = set(cached)
+
+        plan: Plan = Plan(fetch=[], derive={})
+        for span in sorted(requested, key=lambda s: ((s[1] - s[0]).days, s)):
+            chain: typing.Union[typing.List[Span], None] = None if span in cached else self.chain(span, available)
+            if chain is not None and len(chain) > 1:
+                plan.derive[span] = chain
+            else:
+                plan.fetch.append(requested[span])
+                available.add(span)
+
+        return plan
+
+    @staticmethod
+    def derive(t0: datetime.datetime, dt: int, frames: typing.List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Sum the additive fields of the chain of interval frames, per account.
+        The percent of total is taken from the last interval.
+        """
+        frame: pd.DataFrame = pd.concat(
+            [f.astype({'accountName': object}) for f in frames], ignore_index=True, sort=False)
+        if frame.empty:
+            return frames[-1].iloc[0:0]
+
+        grouped = frame.groupby(by='userAccountId', sort=True)
+        derived: pd.DataFrame = grouped[list(ADDITIVE)].sum()
+        derived['accountName'] = grouped['accountName'].last()
+        derived['percentOfTotal'] = frames[-1].groupby(by='userAccountId')['percentOfTotal'].last()
+        derived['percentOfTotal'] = derived['percentOfTotal'].fillna(0.0)
+        derived = derived.reset_index()
+
+        t0: datetime.datetime = finance.pcap.scraper.naive_utc(t0)
+        derived['t0'] = pd.Timestamp(t0)
+        derived['t1'] = pd.Timestamp(t0 + datetime.timedelta(days=dt))
+        derived['dt'] = dt
+
+        columns: list = [f.name for f in dataclasses.fields(History)]
+        derived = derived[columns].sort_values(by=['accountName', 'userAccountId']).reset_index(drop=True)
+        return finance.frames.astype(derived, History.frame_dtypes())
+
+    def frames(self, intervals: typing.Iterable[typing.Tuple[datetime.datetime, int]],
+               workers: int = 4) -> typing.List[pd.DataFrame]:
+        """
+        Get the history frame of each interval.
+
+        Parameters:
+            intervals: The (t0, dt) intervals.
+            workers: The maximum number of concurrent API calls.
+
+        Returns:
+            The frames, in the same order as the intervals.
+        """
+        intervals: list = list(intervals)
+        plan: Plan = self.plan(intervals)
+
+        scrapers: list = HistoriesScraper.fetch_many(
+            plan.fetch, handler=self.handler, workers=workers, force=self.force)
+        fetched: typing.Dict[Span, HistoriesScraper] = {
+            span_of(t0, dt): scraper for (t0, dt), scraper in zip(plan.fetch, scrapers)}
+
+        frames: list = []
+        for t0, dt in intervals:
+            span: Span = span_of(t0, dt)
+            if span in plan.derive:
+                frames.append(self.derive(t0, dt, [self._frame_of(s, fetched) for s in plan.derive[span]]))
+            elif fetched[span].t0 == finance.pcap.scraper.naive_utc(t0):
+                frames.append(fetched[span].frame)
+            else:
+                # the same cached interval, with the time of day of this interval in its rows
+                frames.append(HistoriesScraper(handler=self.handler, t0=t0, dt=dt).frame)
+
+        return frames
+
+    def _frame_of(self, span: Span, fetched: typing.Dict[Span, HistoriesScraper]) -> pd.DataFrame:
+        """
+        Get the frame of a cached or fetched span.
+        """
+        if span in fetched:
+            return fetched[span].frame
+        else:
+            t0: datetime.datetime = datetime.datetime.combine(span[0], datetime.time())
+            return HistoriesScraper(handler=self.handler, t0=t0, dt=(span[1] - span[0]).days).frame
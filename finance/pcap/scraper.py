@@ -1,3 +1,4 @@
+import datetime
 import typing
 
 
@@ -6,6 +7,16 @@ from finance.objmap import ObjectMapping
 from finance.scraper import BaseScraper
 
 
+def naive_utc(t: datetime.datetime) -> datetime.datetime:
+    """
+    Convert a timezone aware time to a naive UTC time, so that equal times have equal (cache) keys.
+    """
+    if t.tzinfo is not None:
+        return t.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    else:
+        return t
+
+
 class PCAPScraper(BaseScraper):
     """
     A base class that can preform API calls or reload data using a PCAP handler.
@@ -27,3 +38,57 @@ class PCAPScraper(BaseScraper):
         Get the handler instance.
         """
         return self._handler
+
+
+class PCAPIntervalScraper(PCAPScraper):
+    """
+    A base class for PCAP scrapers that fetch data for an interval of days.
+    """
+    def __init__(self, *args, t0: datetime.datetime, dt: int, **kwargs):
+        """
+        Parameters:
+            t0: The start time to fetch data for (timezone aware times are converted to naive UTC).
+            dt: The number of days after the start time.
+        """
+        t0: datetime.datetime = naive_utc(t0)
+        self.dt: int = dt
+        self.t0: datetime.datetime = t0
+        self.t1: datetime.datetime = t0 + datetime.timedelta(days=dt)
+        super().__init__(*args, **kwargs)
+
+    def catalog_params(self) -> dict:
+        """
+        Get the JSON parameters of the instance that are recorded in the cache catalog.
+        """
+        return {'t0': f'{self.t0:%Y-%m-%d}', 'dt': self.dt}
+
+    @classmethod
+    def catalog_kwargs(cls, params: dict) -> dict:
+        """
+        Get the key word arguments to the constructor from the parameters recorded in the cache catalog.
+        """
+        return {'t0': datetime.datetime.strptime(params['t0'], '%Y-%m-%d'), 'dt': params['dt']}
+
+    def catalog_span(self) -> typing.Tuple[datetime.date, datetime.date]:
+        """
+        Get the first and last dates of the interval.
+        """
+        return self.t0.date(), self.t1.date()
+
+    @classmethod
+    def fetch_many(cls, intervals: typing.Iterable[typing.Tuple[datetime.datetime, int]], handler: PCAPHandler = None,
+                   workers: int = 4, force: bool = False) -> typing.List['PCAPIntervalScraper']:
+        """
+        Fetch (or reload) many intervals concurrently using one authenticated session.
+
+        Parameters:
+            intervals: The (t0, dt) pairs to fetch.
+            handler: The api handler instance shared by all instances.
+            workers: The maximum number of concurrent API calls.
+            force: Use the API even if the store exists?
+
+        Returns:
+            The reloaded instances, in the same order as the intervals.
+        """
+        params = (dict(t0=t0, dt=dt) for t0, dt in intervals)
+        return cls.reload_many(params, handler=handler, workers=workers, force=force)
@@ -6,6 +6,7 @@ import requests
 
 
 import finance.scraper
+import finance.warehouse
 import finance.objmap
 import finance.pcap.api
 import finance.pcap.scraper
@@ -25,7 +26,12 @@ class AccountsScraper(finance.pcap.scraper.PCAPScraper):
     """
     __reload_yaml__: str = '{dt:%Y-%m-%d}-pcap-accounts.yaml'
     __fillna_yaml__: str = 'fillna-pcap-accounts.yaml'
+    __export_path__: str = 'dataset=pcap-accounts/date={dt:%Y-%m-%d}'
+    __warehouse__: finance.warehouse.Table = finance.warehouse.Table(
+        'pcap_accounts', snapshot=True, indexes=(('userAccountId', 'snapshot'),))
     __store_class__: type = Account
+    __snapshot_path__: str = 'pcap-accounts-snapshots'
+    __snapshot_keys__: tuple = ('userAccountId',)
 
     def fetch(self) -> list:
         """
@@ -35,7 +41,7 @@ class AccountsScraper(finance.pcap.scraper.PCAPScraper):
             The json dictionary.
         """
         payload: dict = {}
-        data: requests.Response = self.handler.client.fetch('/newaccount/getAccounts2', data=payload)
+        data: requests.Response = self.handler.fetch('/newaccount/getAccounts2', data=payload)
 
         data: dict = data.json()
         data: list = data.get('spData', {}).get('accounts', [])
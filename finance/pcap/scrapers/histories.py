@@ -1,7 +1,6 @@
 """
 Handle the API to fetch history data.
 """
-import pandas as pd
 import dataclasses
 import calendar
 import datetime
@@ -11,16 +10,23 @@ import typing
 
 
 import finance.scraper
+import finance.warehouse
 import finance.objmap
 import finance.pcap.api
 import finance.pcap.scraper
 
 
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
 @dataclasses.dataclass()
 class History(finance.objmap.ObjectMapping):
     """
     An object with history data.
     """
+    __frame_dtypes__: typing.ClassVar[dict] = {'accountName': 'category'}
+
     accountName: str = ''
     userAccountId: int = -1
     dateRangeBalanceValueChange: float = 0.0
@@ -34,25 +40,18 @@ class History(finance.objmap.ObjectMapping):
     dt: int = 0
 
 
-class HistoriesScraper(finance.pcap.scraper.PCAPScraper):
+class HistoriesScraper(finance.pcap.scraper.PCAPIntervalScraper):
     """
     Scrape the historiess data from personal capital.
     """
     __reload_yaml__: str = '{self.t0:%Y-%m-%d}-{self.dt:03d}-pcap-histories.yaml'
     __fillna_yaml__: str = 'fillna-pcap-histories.yaml'
+    __export_path__: str = 'dataset=pcap-histories/start={self.t0:%Y-%m-%d}/days={self.dt}'
+    __warehouse__: finance.warehouse.Table = finance.warehouse.Table(
+        'pcap_histories', keys=('userAccountId', 'accountName', 't0', 't1'), date='t0',
+        indexes=(('userAccountId', 't0'), ('accountName', 't0')))
     __store_class__: type = History
 
-    def __init__(self, *args, t0: datetime.datetime, dt: int, **kwargs):
-        """
-        Parameters:
-            t0: The start time to fetch histories.
-            dt: The number of days after the start time.
-        """
-        self.dt: int = dt
-        self.t0: datetime.datetime = t0
-        self.t1: datetime.datetime = t0 + datetime.timedelta(days=dt)
-        super().__init__(*args, **kwargs)
-
     def fetch(self) -> list:
         """
         The logic of the API call.
@@ -63,7 +62,7 @@ class HistoriesScraper(finance.pcap.scraper.PCAPScraper):
         payload: dict = {
             'startDate': self.t0.strftime('%Y-%m-%d'), 'endDate': self.t1.strftime('%Y-%m-%d'),
         }
-        data: requests.Response = self.handler.client.fetch('/account/getHistories', data=payload)
+        data: requests.Response = self.handler.fetch('/account/getHistories', data=payload)
 
         data: dict = data.json()
         data: list = data.get('spData', {}).get('accountSummaries', [])
@@ -71,51 +70,71 @@ class HistoriesScraper(finance.pcap.scraper.PCAPScraper):
         return data
 
 
-def for_each_week_in(stub: str, year: int, month: int = 1, **kwargs) -> typing.Generator[pd.DataFrame, None, None]:
+def for_each_week_in(stub: str, year: int, month: int = 1, dataset: str = None,
+                     **kwargs) -> typing.Generator['pd.DataFrame', None, None]:
     """
     Fetch the histories for each week in the given year.
 
     Parameters:
-        stub: The name of the CSV file to save.
+        stub: The name of the file to save, its extension gives the format (CSV, Parquet or Arrow).
         year: The year to fetch the histories for.
         month: The month to start the iteration in.
+        dataset: The root directory of a partitioned dataset to append the intervals to, instead of the stub.
+        **kwargs: The key word arguments to HistoriesScraper.fetch_many (handler, workers, force).
     """
+    import pandas as pd
+
+    intervals: list = []
+
     ti = datetime.datetime(year, month, 1)
     tf = min(datetime.datetime.today(), datetime.datetime(year, 12, 31))
     for t1 in pd.date_range(start=ti, end=tf, freq='W-SAT'):
         t0 = t1 - datetime.timedelta(days=6)
         t0 = t0 if t0 >= ti else ti
-        _kwargs = dict(t0=t0, dt=(t1 - t0).days, **kwargs)
         logging.debug('fetching %s to %s : %s', t0, t1, t1 - t0)
-        yield HistoriesScraper.export(**_kwargs, stub=stub, debug=False).frame
+        intervals.append((t0, (t1 - t0).days))
+
+    for (t0, dt), scraper in zip(intervals, HistoriesScraper.fetch_many(intervals, **kwargs)):
+        yield scraper.save(stub, debug=False, dataset=dataset, t0=t0, dt=dt).frame
 
 
-def for_each_month_in(stub: str, year: int, **kwargs) -> typing.Generator[pd.DataFrame, None, None]:
+def for_each_month_in(stub: str, year: int, dataset: str = None,
+                      **kwargs) -> typing.Generator['pd.DataFrame', None, None]:
     """
     Fetch the histories for each month in the given year.
 
     Parameters:
-        stub: The name of the CSV file to save.
+        stub: The name of the file to save, its extension gives the format (CSV, Parquet or Arrow).
         year: The year to fetch the histories for.
+        dataset: The root directory of a partitioned dataset to append the intervals to, instead of the stub.
+        **kwargs: The key word arguments to HistoriesScraper.fetch_many (handler, workers, force).
     """
+    intervals: list = []
+
     for month in range(1, 13):
         weekday, numdays = calendar.monthrange(year, month)
         t0 = datetime.datetime(year, month, 1)
         t1 = t0 + datetime.timedelta(days=numdays)
-        _kwargs = dict(t0=t0, dt=numdays - 1, **kwargs)
         logging.debug('fetching %s to %s : %s', t0, t1, t1 - t0)
-        yield HistoriesScraper.export(**_kwargs, stub=stub, debug=False).frame
+        intervals.append((t0, numdays - 1))
 
+    for (t0, dt), scraper in zip(intervals, HistoriesScraper.fetch_many(intervals, **kwargs)):
+        yield scraper.save(stub, debug=False, dataset=dataset, t0=t0, dt=dt).frame
 
-def frame_for_each_week_in(**kwargs) -> pd.DataFrame:
+
+def frame_for_each_week_in(**kwargs) -> 'pd.DataFrame':
     """
     Fetch the histories for each week in the given year.
     """
+    import pandas as pd
+
     return pd.concat(finance.pcap.scrapers.histories.for_each_week_in(**kwargs), ignore_index=True)
 
 
-def frame_for_each_month_in(**kwargs) -> pd.DataFrame:
+def frame_for_each_month_in(**kwargs) -> 'pd.DataFrame':
     """
     Fetch the histories for each month in the given year.
     """
+    import pandas as pd
+
     return pd.concat(finance.pcap.scrapers.histories.for_each_month_in(**kwargs), ignore_index=True)
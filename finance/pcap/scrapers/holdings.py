@@ -3,9 +3,11 @@ Handle the API to fetch account data.
 """
 import dataclasses
 import requests
+import typing
 
 
 import finance.scraper
+import finance.warehouse
 import finance.objmap
 import finance.pcap.api
 import finance.pcap.scraper
@@ -16,6 +18,8 @@ class Holding(finance.objmap.ObjectMapping):
     """
     An object with holding data.
     """
+    __frame_dtypes__: typing.ClassVar[dict] = {'accountName': 'category', 'ticker': 'category'}
+
     accountName: str = ''
     ticker: str = ''
     cusip: str = ''
@@ -31,7 +35,12 @@ class HoldingsScraper(finance.pcap.scraper.PCAPScraper):
     """
     __reload_yaml__: str = '{dt:%Y-%m-%d}-pcap-holdings.yaml'
     __fillna_yaml__: str = 'fillna-pcap-holdings.yaml'
+    __export_path__: str = 'dataset=pcap-holdings/date={dt:%Y-%m-%d}'
+    __warehouse__: finance.warehouse.Table = finance.warehouse.Table(
+        'pcap_holdings', snapshot=True, indexes=(('ticker', 'snapshot'), ('userAccountId', 'snapshot')))
     __store_class__: type = Holding
+    __snapshot_path__: str = 'pcap-holdings-snapshots'
+    __snapshot_keys__: tuple = ('userAccountId', 'ticker', 'cusip')
 
     def fetch(self) -> list:
         """
@@ -41,7 +50,7 @@ class HoldingsScraper(finance.pcap.scraper.PCAPScraper):
             THe json dictionary.
         """
         payload: dict = {}
-        data: requests.Response = self.handler.client.fetch('/invest/getHoldings', data=payload)
+        data: requests.Response = self.handler.fetch('/invest/getHoldings', data=payload)
 
         data: dict = data.json()
         data: list = data.get('spData', {}).get('holdings', [])
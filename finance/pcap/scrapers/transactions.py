@@ -2,21 +2,47 @@
 Handle the API to fetch transaction data.
 """
 import dataclasses
+import itertools
+import functools
 import datetime
 import requests
+import typing
+import os
 
 
+import finance.partitions
+import finance.warehouse
+import finance.archive
+import finance.frames
+import finance.profile
+import finance.memo
 import finance.scraper
+import finance.store
 import finance.objmap
 import finance.pcap.api
 import finance.pcap.scraper
 
 
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(value: str) -> datetime.datetime:
+    """
+    Parse a YYYY-MM-DD date, once per distinct date.
+    """
+    return datetime.datetime.strptime(value, '%Y-%m-%d')
+
+
 @dataclasses.dataclass()
 class Transaction(finance.objmap.ObjectMapping):
     """
     An object with transaction data.
     """
+    __frame_dtypes__: typing.ClassVar[dict] = {'accountName': 'category', 'transactionDate': 'datetime64[ns]'}
+    __date_formats__: typing.ClassVar[dict] = {'transactionDate': '%Y-%m-%d'}
+
     accountName: str = ''
     userAccountId: int = -1
     userTransactionId: int = -1
@@ -24,29 +50,216 @@ class Transaction(finance.objmap.ObjectMapping):
     amount: float = 0.0
 
     def __post_init__(self):
-        self.transactionDate: datetime.datetime = \
-            datetime.datetime.strptime(self.transactionDate, '%Y-%m-%d')
+        if isinstance(self.transactionDate, str):
+            self.transactionDate: datetime.datetime = _parse_date(self.transactionDate)
 
 
-class TransactionsScraper(finance.pcap.scraper.PCAPScraper):
+class TransactionsScraper(finance.pcap.scraper.PCAPIntervalScraper):
     """
     Scrape the transactions data from personal capital.
+
+    The transactions are cached in monthly partitions with a manifest of the days that are covered.
+    Only the days that are missing, or that fall in the trailing hot window, are fetched from the API.
+    Each partition has a columnar archive, and the dataframe of the date range is loaded from them once the
+    missing days were fetched into the partitions.
     """
     __reload_yaml__: str = '{self.t0:%Y-%m-%d}-{self.dt:03d}-pcap-transactions.yaml'
     __fillna_yaml__: str = 'fillna-pcpa-transactions.yaml'
+    __export_path__: str = 'dataset=pcap-transactions/start={self.t0:%Y-%m-%d}/days={self.dt}'
     __store_class__: type = Transaction
+    __partitions__: str = 'pcap-transactions'
+    __warehouse__: finance.warehouse.Table = finance.warehouse.Table(
+        'pcap_transactions', keys=('userTransactionId',), date='transactionDate',
+        indexes=(('userAccountId', 'transactionDate'), ('accountName', 'transactionDate')))
+    __archive__: bool = True
+    __hot_days__: int = 7
+    __rows_per_page__: int = 4096
 
-    def __init__(self, *args, t0: datetime.datetime, dt: int, **kwargs):
+    def __init__(self, *args, hot: int = None, **kwargs):
         """
         Parameters:
-            t0: The start time to fetch transactions.
-            dt: The number of days after the start time.
+            hot: The number of trailing days that are always refetched (pending transactions).
         """
-        self.dt: int = dt
-        self.t0: datetime.datetime = t0
-        self.t1: datetime.datetime = t0 + datetime.timedelta(days=dt)
+        self.hot: int = hot if hot is not None else self.__hot_days__
+        #: The YYYY-MM-DD days that the last stream fetched from the API
+        self.fetched_days: typing.Set[str] = set()
+        #: Were the missing days fetched into the partitions?
+        self.synced: bool = False
         super().__init__(*args, **kwargs)
 
+    @property
+    def data(self) -> list:
+        """
+        Get the list of JSON objects of the date range, read from the partitions once they are synced.
+        """
+        if self._data is None:
+            if not self.synced:
+                self.reload()
+            self._data = self.partitions.read(self.t0.date(), self.t1.date())
+
+        return self._data
+
+    @property
+    def partitions(self) -> finance.partitions.PartitionStore:
+        """
+        Get the partitioned transactions store.
+        """
+        root: str = os.path.join(self.handler.config.workdir, 'cache', self.__partitions__)
+        return finance.partitions.PartitionStore(root, date_key='transactionDate', store_format=self.store_format)
+
+    def gaps(self) -> typing.List[typing.Tuple[datetime.date, datetime.date]]:
+        """
+        Get the ranges of days that have to be fetched from the API.
+        """
+        d0: datetime.date = self.t0.date()
+        d1: datetime.date = self.t1.date()
+        partitions: finance.partitions.PartitionStore = self.partitions
+
+        if self.force:
+            return [(d0, d1)]
+
+        # adopt a cache file written before the partitions existed, for the days that are not covered yet
+        legacy: typing.Union[str, None] = finance.store.find(self.store)
+        if legacy is not None:
+            with partitions.lock:
+                missing: list = partitions.missing(d0, d1)
+                data: list = finance.store.load(legacy) if missing else []
+                for m0, m1 in missing:
+                    partitions.write(m0, m1, data)
+
+        hot: datetime.date = self.handler.config.dt.date() - datetime.timedelta(days=self.hot)
+        return partitions.missing(d0, d1, hot=hot)
+
+    def stream(self) -> typing.Generator[dict, None, None]:
+        """
+        Iterate over the JSON objects of the date range in bounded memory.
+
+        The missing days are fetched one page at a time, and each month of pages is written to its
+        partition once. The days that were already covered are then read back one partition at a time.
+
+        Yields:
+            The JSON objects.
+        """
+        partitions: finance.partitions.PartitionStore = self.partitions
+
+        gaps: list = self.gaps()
+        for g0, g1 in gaps:
+            for page in partitions.fill(g0, g1, self.iter_pages(g0, g1)):
+                yield from page
+
+        fetched: set = {f'{day:%Y-%m-%d}' for g0, g1 in gaps for day in finance.partitions.days_in(g0, g1)}
+        self.fetched_days = fetched
+        self.synced = True
+        yield from partitions.iter_read(self.t0.date(), self.t1.date(), skip=fetched)
+
+    def sync(self) -> typing.Set[str]:
+        """
+        Fetch the missing days from the API into the partitions, without keeping the JSON objects.
+
+        Returns:
+            The YYYY-MM-DD days that were fetched.
+        """
+        partitions: finance.partitions.PartitionStore = self.partitions
+
+        gaps: list = self.gaps()
+        for g0, g1 in gaps:
+            for _ in partitions.fill(g0, g1, self.iter_pages(g0, g1)):
+                pass
+
+        self.fetched_days = {f'{day:%Y-%m-%d}' for g0, g1 in gaps for day in finance.partitions.days_in(g0, g1)}
+        self.synced = True
+        return self.fetched_days
+
+    def reload(self) -> 'TransactionsScraper':
+        """
+        Fetch the missing days from the API into the partitions, the JSON objects of the date range are
+        read back from the partitions when they are used.
+        The transactions of the fetched days replace those of the same days in the warehouse.
+        """
+        with finance.profile.timer(f'{self.__class__.__name__}.sync'):
+            self.sync()
+
+        self._data = None
+        finance.memo.invalidate(self, 'objects', 'frame')
+
+        if self.fetched_days and self.handler.config.warehouse:
+            import pandas as pd
+
+            frame: pd.DataFrame = self.frame
+            days: pd.DatetimeIndex = pd.to_datetime(sorted(self.fetched_days))
+            self.store_warehouse(frame[frame['transactionDate'].dt.normalize().isin(days)],
+                                 days=sorted(self.fetched_days))
+
+        return self
+
+    def _stamp(self) -> None:
+        """
+        The partitions change underneath the cache path, so the dataframe is never shared.
+        """
+        return None
+
+    def _build_frame(self) -> 'pd.DataFrame':
+        """
+        Create the typed dataframe from the archives of the partitions, after fetching the missing days into them.
+        """
+        if self.archive is None:
+            return super()._build_frame()
+
+        if not self.synced and (self.force or self.gaps()):
+            self.reload()
+
+        with finance.profile.timer(f'{self.__class__.__name__}.archive'):
+            return self._archived_frame()
+
+    def _archived_frame(self) -> 'pd.DataFrame':
+        """
+        Load the dataframe of the date range from the memory mapped archives of the monthly partitions.
+
+        The archive of a partition is written the first time it is needed (or after the partition changed).
+        The rows are sorted by the sort keys, like the dataframe built from the JSON objects, and the dataframe
+        is a copy that may be changed in place (the memory mapped columns are read-only).
+        """
+        import pandas as pd
+
+        partitions: finance.partitions.PartitionStore = self.partitions
+        d0, d1 = self.t0.date(), self.t1.date()
+        months: list = sorted({datetime.date(day.year, day.month, 1) for day in finance.partitions.days_in(d0, d1)})
+
+        frames: list = []
+        for month in months:
+            with partitions.lock:
+                path: typing.Union[str, None] = finance.store.find(partitions.partition(month))
+                if path is None:
+                    continue
+
+                stamp: list = self._archive_stamp(path)
+                frame_: typing.Union[pd.DataFrame, None] = finance.archive.read(finance.archive.path_of(path), stamp)
+                if frame_ is None:
+                    frame_: pd.DataFrame = finance.frames.build_frame(self.__store_class__, finance.store.load(path),
+                                                                      instance=self, rules=self.rules,
+                                                                      sort=self.__sort_keys__)
+                    finance.archive.write(frame_, finance.archive.path_of(path), self.__store_class__, stamp)
+                else:
+                    finance.profile.count('archive.hits')
+
+            frames.append(frame_)
+
+        if not frames:
+            return finance.frames.build_frame(self.__store_class__, [], instance=self, rules=self.rules)
+
+        dates: pd.Series = pd.concat([f['transactionDate'] for f in frames], ignore_index=True)
+        keep: pd.Series = (dates >= pd.Timestamp(d0)) & (dates < pd.Timestamp(d1 + datetime.timedelta(days=1)))
+        if len(frames) == 1 and keep.all():
+            return frames[0].copy(deep=True)
+
+        frame_: pd.DataFrame = pd.concat(frames, ignore_index=True)[keep.to_numpy()]
+        frame_: pd.DataFrame = finance.frames.astype(frame_, self.__store_class__.frame_dtypes())
+        for name in frame_.columns:
+            if isinstance(frame_[name].dtype, pd.CategoricalDtype):
+                frame_[name] = frame_[name].cat.remove_unused_categories()
+
+        return finance.frames.sort_frame(frame_, self.__sort_keys__)
+
     def fetch(self) -> list:
         """
         The logic of the API call.
@@ -54,14 +267,35 @@ class TransactionsScraper(finance.pcap.scraper.PCAPScraper):
         Returns:
             The json dictionary.
         """
-        payload: dict = {
-            'startDate': self.t0.strftime('%Y-%m-%d'), 'endDate': self.t1.strftime('%Y-%m-%d'),
-            'page': 0, 'rows_per_page': 4096, 'component': 'DATAGRID',
-            'sort_cols': 'transactionTime', 'sort_rev': 'true',
-        }
-        data: requests.Response = self.handler.client.fetch('/transaction/getUserTransactions', data=payload)
+        return [obj for page in self.iter_pages(self.t0, self.t1) for obj in page]
+
+    def iter_pages(self, t0: datetime.date, t1: datetime.date) -> typing.Generator[list, None, None]:
+        """
+        Fetch the transactions from t0 to t1 (inclusive), one page at a time, until the pages are exhausted.
+
+        Yields:
+            The json dictionary of each page.
+        """
+        previous: typing.Union[list, None] = None
+        for page in itertools.count():
+            payload: dict = {
+                'startDate': t0.strftime('%Y-%m-%d'), 'endDate': t1.strftime('%Y-%m-%d'),
+                'page': page, 'rows_per_page': self.__rows_per_page__, 'component': 'DATAGRID',
+                'sort_cols': 'transactionTime', 'sort_rev': 'true',
+            }
+            data: requests.Response = self.handler.fetch('/transaction/getUserTransactions', data=payload)
+
+            data: dict = data.json()
+            data: list = data.get('spData', {}).get('transactions', [])
+
+            # stop if the server ignores the page number and repeats itself
+            identity: list = [obj.get('userTransactionId') for obj in data]
+            if not data or identity == previous:
+                return
+
+            yield data
 
-        data: dict = data.json()
-        data: list = data.get('spData', {}).get('transactions', [])
+            if len(data) < self.__rows_per_page__:
+                return
 
-        return data
+            previous = identity
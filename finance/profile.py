@@ -0,0 +1,101 @@
+"""
+Timers and counters around the hot paths of the scrapers and handlers.
+
+The instrumentation is disabled by default, and then costs one attribute lookup per call.
+It is enabled by the --profile option of finance.helpers.run, which saves a JSON report.
+"""
+import contextlib
+import threading
+import typing
+import time
+
+
+class Profiler:
+    """
+    A thread safe registry of timers (count, total and maximum seconds) and counters.
+    """
+    def __init__(self):
+        self.enabled: bool = False
+        self.timers: typing.Dict[str, typing.List[float]] = {}
+        self.counters: typing.Dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def reset(self):
+        """
+        Forget all timers and counters.
+        """
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def add_time(self, name: str, seconds: float):
+        """
+        Add one timing to the timer.
+        """
+        with self._lock:
+            timer: typing.Union[typing.List[float], None] = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def count(self, name: str, value: float = 1):
+        """
+        Add the value to the counter.
+        """
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> typing.Generator[None, None, None]:
+        """
+        Time the body of the with statement.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def response(self, provider: str, response: typing.Any):
+        """
+        Count a response of the provider by status code, with the size of its body when it is known.
+        """
+        if not self.enabled:
+            return
+
+        status: typing.Any = getattr(response, 'status_code', getattr(response, 'status', None))
+        self.count(f'{provider}.requests')
+        self.count(f'{provider}.status.{status}')
+
+        body: typing.Any = getattr(response, 'content', None)
+        body = body if isinstance(body, (bytes, bytearray)) else getattr(response, 'data', None)
+        if isinstance(body, (bytes, bytearray)):
+            self.count(f'{provider}.bytes', len(body))
+
+    def report(self) -> dict:
+        """
+        Get the timers and counters as a JSON dictionary, with the slowest timers first.
+        """
+        with self._lock:
+            timers: list = sorted(self.timers.items(), key=lambda item: -item[1][1])
+            return {
+                'timers': {name: {'count': count, 'total': total, 'mean': total / count, 'max': maximum}
+                           for name, (count, total, maximum) in timers},
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+
+#: The profiler of the process
+profiler: Profiler = Profiler()
+
+timer: typing.Callable[[str], typing.ContextManager] = profiler.timer
+count: typing.Callable[..., None] = profiler.count
+response: typing.Callable[[str, typing.Any], None] = profiler.response
@@ -1,18 +1,28 @@
 """
 Download and cache files from a REST API.
 """
-import pandas as pd
-import dataclasses
-import functools
+import concurrent.futures
+import datetime
 import logging
 import typing
-import yaml
 import os
 
-from pandas import DataFrame
+import finance.profile
+import finance.warehouse
+import finance.snapshots
+import finance.archive
+import finance.exports
+import finance.catalog
+import finance.frames
+import finance.store
+import finance.memo
 
 from finance.api import BaseHandler
-from finance.objmap import ObjectMapping
+from finance.objmap import ObjectMapping, FillnaRules
+
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
 
 
 class BaseScraper:
@@ -21,8 +31,16 @@ class BaseScraper:
     """
     __reload_yaml__: str = '{dt:%Y-%m-%d}-finance.yaml'
     __fillna_yaml__: str = 'fillna-finance.yaml'
+    __export_path__: str = 'dataset=finance/date={dt:%Y-%m-%d}'
+    __warehouse__: typing.Union[finance.warehouse.Table, None] = None
+    __snapshot_path__: str = 'finance-snapshots'
+    __snapshot_keys__: typing.Union[typing.Tuple[str, ...], None] = None
+    __snapshot_period__: int = 30
+    __archive__: bool = False
     __api_handler__: typing.Callable = BaseHandler
     __store_class__: ObjectMapping = ObjectMapping
+    __store_format__: typing.Union[str, None] = None
+    __sort_keys__: typing.Union[typing.List[str], None] = None
 
     def __init__(self, handler=None, force: bool = False):
         """
@@ -36,6 +54,7 @@ class BaseScraper:
         #: The name of the file to store the API results in
         self.store: str = os.path.join(handler.config.workdir, 'cache', self.__reload_yaml__)
         self.store: str = self.store.format(dt=handler.config.dt, self=self)
+        self.store: str = finance.store.with_format(self.store, self.store_format)
         #: The data that was fetched as json from the API call
         self._data: typing.Union[list, None] = None
         self.force: bool = force
@@ -47,6 +66,13 @@ class BaseScraper:
         """
         return self._handler
 
+    @property
+    def store_format(self) -> str:
+        """
+        Get the name of the cache format, from the class or from the configuration.
+        """
+        return self.__store_format__ if self.__store_format__ is not None else self.handler.config.cache_format
+
     @property
     def data(self) -> list:
         """
@@ -67,31 +93,254 @@ class BaseScraper:
         """
         Download the data from the API or reload it from disk.
         """
-        if self.force or not os.path.exists(self.store):
-            self._data = self.fetch()
-            os.makedirs(os.path.dirname(self.store), exist_ok=True)
-            with open(self.store, 'w') as stream:
-                yaml.dump(self.data, stream)
+        if self.handler.config.snapshots and self.snapshots is not None:
+            return self._reload_snapshot()
+
+        name: str = self.__class__.__name__
+        path: typing.Union[str, None] = None if self.force else self.catalog.find(self.store)
+        if path is None:
+            with finance.profile.timer(f'{name}.fetch'):
+                self._data = self.fetch()
+            with finance.profile.timer(f'{name}.write'):
+                finance.store.dump(self.data, self.store)
+            entry: finance.catalog.Entry = self._record(self.store)
         else:
-            with open(self.store, 'r') as stream:
-                self._data = yaml.load(stream, yaml.SafeLoader)
+            with finance.profile.timer(f'{name}.reload'):
+                self._data = finance.store.load(path)
+            entry: finance.catalog.Entry = self.catalog.lookup(path)
+            if entry is None:
+                entry: finance.catalog.Entry = self._record(path, fetched=os.path.getmtime(path))
+
+        finance.memo.invalidate(self, 'objects', 'frame')
+
+        self._load_warehouse(entry)
+
+        return self
+
+    def _reload_snapshot(self) -> 'BaseScraper':
+        """
+        Reload the day from the snapshot store, or else fetch it (or adopt its daily cache file) and store it.
+        """
+        name: str = self.__class__.__name__
+        day: datetime.date = self.handler.config.dt.date()
+        snapshots: finance.snapshots.SnapshotStore = self.snapshots
+
+        if not self.force and snapshots.has(day):
+            with finance.profile.timer(f'{name}.reload'):
+                self._data = snapshots.read(day)
+            finance.memo.invalidate(self, 'objects', 'frame')
+            return self
+
+        path: typing.Union[str, None] = None if self.force else self.catalog.find(self.store)
+        if path is None:
+            with finance.profile.timer(f'{name}.fetch'):
+                self._data = self.fetch()
+        else:
+            with finance.profile.timer(f'{name}.reload'):
+                self._data = finance.store.load(path)
+
+        with finance.profile.timer(f'{name}.write'):
+            snapshots.write(day, self._data)
+
+        finance.memo.invalidate(self, 'objects', 'frame')
+        self.store_warehouse(snapshot=f'{day:%Y-%m-%d}')
 
         return self
 
+    @finance.memo.cached_property
+    def snapshots(self) -> typing.Union[finance.snapshots.SnapshotStore, None]:
+        """
+        Get the store of daily snapshots of the class, or None if the class has no snapshot keys.
+        The store is created once per instance, so it keeps the state of the last day it read.
+        """
+        if self.__snapshot_keys__ is None:
+            return None
+
+        root: str = os.path.join(self.handler.config.workdir, 'cache', self.__snapshot_path__)
+        root: str = root.format(dt=self.handler.config.dt, self=self)
+        return finance.snapshots.SnapshotStore(
+            root, self.__snapshot_keys__, self.store_format, period=self.__snapshot_period__)
+
+    def snapshot(self, day: datetime.date) -> 'pd.DataFrame':
+        """
+        Get the dataframe of the objects of a day in the snapshot store.
+
+        Raises:
+            KeyError: If the day is not stored.
+        """
+        if self.snapshots is None:
+            raise KeyError(f'{self.__class__.__name__} has no snapshots')
+
+        with finance.profile.timer(f'{self.__class__.__name__}.snapshot'):
+            return finance.frames.build_frame(self.__store_class__, self.snapshots.read(day), instance=self,
+                                              rules=self.rules, sort=self.__sort_keys__)
+
+    def changes(self, a: datetime.date, b: datetime.date) -> 'pd.DataFrame':
+        """
+        Get the objects that were added, removed or changed between two days in the snapshot store.
+
+        The objects of both days are matched on the snapshot keys. Each field has a <field>_a and <field>_b
+        column, numeric fields also have a <field>_change column (b - a), and the change column is one of
+        added, removed or changed.
+
+        Parameters:
+            a: The first day.
+            b: The second day.
+
+        Returns:
+            The dataframe of the changed objects.
+        """
+        import pandas as pd
+        import numpy as np
+
+        keys: list = list(self.__snapshot_keys__ or ())
+        frames: list = []
+        for day in (a, b):
+            frame_: pd.DataFrame = self.snapshot(day)
+            frame_: pd.DataFrame = frame_.astype(
+                {c: object for c in frame_.columns if isinstance(frame_[c].dtype, pd.CategoricalDtype)})
+            # number the occurrences of each key, with the missing keys as a value (groupby drops them)
+            frame_['_n'] = frame_[keys].astype(object).fillna('\0').groupby(keys).cumcount()
+            frames.append(frame_)
+
+        merged: pd.DataFrame = frames[0].merge(
+            frames[1], on=keys + ['_n'], how='outer', suffixes=('_a', '_b'), indicator=True)
+
+        columns: list = list(keys)
+        changed: np.ndarray = np.zeros(len(merged), dtype=bool)
+        for c in (c for c in frames[0].columns if c not in keys and c != '_n'):
+            a_, b_ = merged[f'{c}_a'], merged[f'{c}_b']
+            changed |= ~((a_ == b_) | (a_.isna() & b_.isna())).to_numpy()
+            columns.extend([f'{c}_a', f'{c}_b'])
+            if pd.api.types.is_numeric_dtype(a_) and not pd.api.types.is_bool_dtype(a_):
+                merged[f'{c}_change'] = b_.fillna(0) - a_.fillna(0)
+                columns.append(f'{c}_change')
+
+        merged['change'] = np.select(
+            [merged['_merge'] == 'right_only', merged['_merge'] == 'left_only', changed],
+            ['added', 'removed', 'changed'], default='')
+
+        return merged.loc[merged['change'] != '', ['change'] + columns].reset_index(drop=True)
+
+    @property
+    def catalog(self) -> finance.catalog.Catalog:
+        """
+        Get the catalog of the cache directory.
+        """
+        return finance.catalog.of(self.handler.config.workdir)
+
     @property
-    @functools.lru_cache(maxsize=1)
-    def rules(self):
+    def warehouse(self) -> finance.warehouse.Warehouse:
+        """
+        Get the warehouse of the working directory.
+        """
+        return finance.warehouse.of(self.handler.config.workdir)
+
+    def store_warehouse(self, frame: 'pd.DataFrame' = None, snapshot: str = None,
+                        days: typing.Iterable[str] = None) -> int:
+        """
+        Upsert the objects (or the given dataframe of objects) into the warehouse table of the class.
+
+        Parameters:
+            frame: The dataframe of objects to store, instead of the frame of the instance.
+            snapshot: The YYYY-MM-DD date the objects were fetched, today by default.
+            days: The YYYY-MM-DD days whose rows are replaced by the objects (see Warehouse.upsert).
+
+        Returns:
+            The number of rows stored.
+        """
+        if self.__warehouse__ is None or not self.handler.config.warehouse:
+            return 0
+
+        frame: pd.DataFrame = frame if frame is not None else self.frame
+        snapshot: str = snapshot if snapshot is not None else f'{self.handler.config.dt:%Y-%m-%d}'
+        with finance.profile.timer(f'{self.__class__.__name__}.warehouse'):
+            return self.warehouse.upsert(self.__warehouse__, frame, snapshot=snapshot, days=days)
+
+    def _load_warehouse(self, entry: finance.catalog.Entry):
+        """
+        Store the objects of the cache file in the warehouse, unless that version of the file was already stored.
+        """
+        if self.__warehouse__ is None or not self.handler.config.warehouse:
+            return
+
+        if not self.warehouse.loaded(entry.key, entry.hash):
+            self.store_warehouse(snapshot=entry.date)
+            self.warehouse.mark_loaded(entry.key, entry.hash)
+
+    def catalog_params(self) -> dict:
+        """
+        Get the JSON parameters of the instance that are recorded in the cache catalog.
+        """
+        return {'date': f'{self.handler.config.dt:%Y-%m-%d}'}
+
+    @classmethod
+    def catalog_kwargs(cls, params: dict) -> dict:
+        """
+        Get the key word arguments to the constructor from the parameters recorded in the cache catalog.
+        """
+        return {k: v for k, v in params.items() if k not in ('date', 'dt')}
+
+    @classmethod
+    def from_catalog(cls, entry: finance.catalog.Entry, handler=None) -> 'BaseScraper':
+        """
+        Create an instance that reloads the cache file of a catalog entry, which may be from an earlier day.
+        """
+        handler = handler if handler is not None else cls.__api_handler__(config=None)
+        instance = cls(handler=handler, **cls.catalog_kwargs(entry.params))
+        instance.store = entry.path
+        return instance
+
+    def catalog_span(self) -> typing.Tuple[typing.Optional[datetime.date], typing.Optional[datetime.date]]:
+        """
+        Get the first and last dates of the interval of the instance, if it has one.
+        """
+        return None, None
+
+    def _record(self, path: str, fetched: float = None) -> finance.catalog.Entry:
+        """
+        Record the cache file of the instance in the catalog.
+        """
+        t0, t1 = self.catalog_span()
+        return self.catalog.record(path, self.handler.__provider__, self.__class__.__name__,
+                                   params=self.catalog_params(), t0=t0, t1=t1, fetched=fetched)
+
+    @classmethod
+    def reload_many(cls, params: typing.Iterable[dict], handler=None, workers: int = 4,
+                    force: bool = False) -> typing.List['BaseScraper']:
+        """
+        Create many instances that share one handler and reload them concurrently.
+
+        Parameters:
+            params: The key word arguments to the constructor of each instance.
+            handler: The api handler instance shared by all instances.
+            workers: The maximum number of concurrent API calls.
+            force: Use the API even if the store exists?
+
+        Returns:
+            The reloaded instances, in the same order as the parameters.
         """
-        Get the list of fillna rules from the yaml file.
+        handler = handler if handler is not None else cls.__api_handler__(config=None)
+        instances: list = [cls(handler=handler, force=force, **kwargs) for kwargs in params]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(lambda instance: instance.reload(), instances))
+
+    @finance.memo.cached_property
+    def rules(self) -> FillnaRules:
         """
+        Get the compiled fillna rules from the yaml file.
+        """
+        import yaml
+
         path: str = os.path.join(self.handler.config.workdir, self.__fillna_yaml__)
         if os.path.exists(path):
-            return yaml.load(open(path, 'r'), yaml.SafeLoader).get('rules', [])
+            with open(path, 'r') as stream:
+                return FillnaRules(yaml.load(stream, yaml.SafeLoader).get('rules', []))
         else:
-            return []
+            return FillnaRules([])
 
-    @property
-    @functools.lru_cache(maxsize=1)
+    @finance.memo.cached_property
     def objects(self) -> list:
         """
         Get the store object instances.
@@ -99,7 +348,9 @@ class BaseScraper:
         Returns:
             A list of objects.
         """
-        return [self.__store_class__.safe_init(instance=self, **obj).fillna(self.rules) for obj in self.data]
+        data: list = self.data
+        with finance.profile.timer(f'{self.__class__.__name__}.objects'):
+            return [self.rules.apply(obj) for obj in self.__store_class__.safe_init_many(data, instance=self)]
 
     def __iter__(self) -> typing.Generator[ObjectMapping, None, None]:
         """
@@ -111,38 +362,197 @@ class BaseScraper:
         for instance in self.objects:
             yield instance
 
-    @property
-    @functools.lru_cache(maxsize=1)
-    def frame(self) -> pd.DataFrame:
+    @finance.memo.cached_property
+    def frame(self) -> 'pd.DataFrame':
         """
         Get the objects as a dataframe.
 
+        The dataframe is shared, through a process-wide memory-bounded cache, with other instances
+        of the same class that reload the same (unchanged) cache file. Archived classes also load it from
+        the memory mapped columnar archive of the cache file, which is written when the dataframe is built.
+        Each instance gets its own (deep) copy of a shared dataframe, so it may be changed in place.
+
         Returns:
             The dataframe.
         """
-        frame_: pd.DataFrame = pd.DataFrame(dataclasses.asdict(obj) for obj in self.objects)
+        key: tuple = (self.__class__, self.store)
+        frame_: typing.Union[pd.DataFrame, None] = None
+        if self._data is None and not self.force:
+            frame_: typing.Union[pd.DataFrame, None] = finance.memo.frames.get(key, stamp=self._stamp())
+            if frame_ is not None:
+                finance.profile.count('memo.frames.hits')
+                return frame_.copy(deep=True)
+
+            frame_: typing.Union[pd.DataFrame, None] = self._read_archive()
+
+        if frame_ is None:
+            with finance.profile.timer(f'{self.__class__.__name__}.frame'):
+                frame_: pd.DataFrame = self._build_frame()
+            self._write_archive(frame_)
+
+        stamp: typing.Union[tuple, None] = self._stamp()
+        if stamp is not None:
+            finance.memo.frames.put(key, frame_, nbytes=int(frame_.memory_usage(deep=True).sum()), stamp=stamp)
+            return frame_.copy(deep=True)
+        else:
+            return frame_
+
+    def _build_frame(self) -> 'pd.DataFrame':
+        """
+        Create the typed dataframe directly from the JSON objects.
+
+        When the JSON objects were only loaded to create the dataframe, and they can be reloaded from the
+        cache file, they are released afterwards.
+        """
+        release: bool = self._data is None and not self.force
+
+        frame_: pd.DataFrame = finance.frames.build_frame(
+            self.__store_class__, self.data, instance=self, rules=self.rules, sort=self.__sort_keys__)
 
-        columns: list = [f.name for f in dataclasses.fields(self.__store_class__) if f.name in frame_.columns]
-        if columns:
-            frame_: pd.DataFrame = frame_.sort_values(by=columns)
-            frame_: pd.DataFrame = frame_.reset_index(drop=True)
+        if release and self._stamp() is not None:
+            self._data = None
 
         return frame_
 
+    @property
+    def archive(self) -> typing.Union[str, None]:
+        """
+        Get the path of the columnar archive of the cache file, or None if the class is not archived.
+        """
+        if not self.__archive__ or not self.handler.config.archive or not finance.archive.available():
+            return None
+
+        return finance.archive.path_of(self.store)
+
+    def _read_archive(self) -> typing.Union['pd.DataFrame', None]:
+        """
+        Load the dataframe from the columnar archive, if it was built from the current cache file and rules.
+        """
+        stamp: typing.Union[list, None] = self._archive_stamp()
+        if stamp is None:
+            return None
+
+        with finance.profile.timer(f'{self.__class__.__name__}.archive'):
+            frame_: typing.Union[pd.DataFrame, None] = finance.archive.read(self.archive, stamp)
+
+        if frame_ is not None:
+            finance.profile.count('archive.hits')
+        return frame_
+
+    def _write_archive(self, frame_: 'pd.DataFrame'):
+        """
+        Save the dataframe to the columnar archive, next to the cache file it was built from, unless the
+        archive is already current.
+        """
+        stamp: typing.Union[list, None] = self._archive_stamp()
+        if stamp is None or finance.archive.current(self.archive, stamp):
+            return
+
+        with finance.profile.timer(f'{self.__class__.__name__}.archive.write'):
+            finance.archive.write(frame_, self.archive, self.__store_class__, stamp)
+
+    def _archive_stamp(self, path: str = None) -> typing.Union[list, None]:
+        """
+        Identify the versions of the cache file and fillna rules, and the instance attributes that fill the
+        missing values, that the archived dataframe is built from.
+
+        Parameters:
+            path: The cache file, instead of the cache file of the instance.
+
+        Returns:
+            The JSON stamp, or None if the dataframe can not be archived.
+        """
+        if path is not None:
+            stat: os.stat_result = os.stat(path)
+            stamp: typing.Union[tuple, None] = (path, stat.st_mtime_ns, stat.st_size, self._rules_stamp())
+        else:
+            stamp: typing.Union[tuple, None] = self._stamp()
+
+        if self.archive is None or stamp is None:
+            return None
+
+        fallbacks: dict = self.__store_class__.fallbacks(self)
+        return list(stamp[1:]) + [{k: str(v) for k, v in sorted(fallbacks.items())}]
+
+    def _stamp(self) -> typing.Union[tuple, None]:
+        """
+        Identify the versions of the cache file (or snapshot manifest) and fillna rules that the dataframe
+        is built from.
+
+        Returns:
+            The stamp, or None if the dataframe can not be shared.
+        """
+        if self.handler.config.snapshots and self.snapshots is not None:
+            path: typing.Union[str, None] = self.snapshots.manifest_path if self.snapshots.has(
+                self.handler.config.dt.date()) else None
+        else:
+            path: typing.Union[str, None] = finance.store.find(self.store)
+
+        if path is None:
+            return None
+
+        stat: os.stat_result = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size, self._rules_stamp()
+
+    def _rules_stamp(self) -> typing.Union[int, None]:
+        """
+        Identify the version of the fillna rules file, if there is one.
+        """
+        rules: str = os.path.join(self.handler.config.workdir, self.__fillna_yaml__)
+        return os.stat(rules).st_mtime_ns if os.path.exists(rules) else None
+
+    @property
+    def partition(self) -> str:
+        """
+        Get the partition directories of the instance in a partitioned export dataset.
+        """
+        return self.__export_path__.format(dt=self.handler.config.dt, self=self)
+
+    def save(self, stub: str, debug: bool = True, export_format: str = None, compression: str = None,
+             dataset: str = None, **kwargs) -> 'BaseScraper':
+        """
+        Save the resulting dataframe to a file.
+
+        Parameters:
+            stub: The name of the file to save, its extension gives the format (CSV, Parquet or Arrow).
+            debug: Log the dataframe to the screen?
+            export_format: The name of the export format, instead of the extension of the stub.
+            compression: The compression codec of the file.
+            dataset: The root directory of a partitioned dataset to write the partition of the instance in.
+            **kwargs: The key word arguments used to format the stub.
+        """
+        if dataset is not None:
+            export_format: str = export_format if export_format is not None else 'parquet'
+            path: str = finance.exports.partition_path(
+                dataset.format(**kwargs, config=self.handler.config), self.partition, export_format)
+        else:
+            path: str = stub.format(**kwargs, config=self.handler.config)
+
+        frame_: pd.DataFrame = self.frame
+        with finance.profile.timer(f'{self.__class__.__name__}.save'):
+            finance.exports.write(frame_, path, self.__store_class__, export_format, compression=compression)
+        if debug:
+            logging.debug('%s\n%s', self.__class__.__name__, self.frame)
+            return self
+        else:
+            return self
+
     @classmethod
-    def export(cls, stub: str, debug: bool = True, **kwargs) -> 'BaseScraper':
+    def export(cls, stub: str, debug: bool = True, handler=None, export_format: str = None,
+               compression: str = None, dataset: str = None, **kwargs) -> 'BaseScraper':
         """
         Create and instance and save the resulting dataframe to a file.
 
         Parameters:
-            stub: The name of the CSV file to save.
+            stub: The name of the file to save, its extension gives the format (CSV, Parquet or Arrow).
             debug: Log the dataframe to the screen?
+            handler: The api handler instance, a new one is created if not given.
+            export_format: The name of the export format, instead of the extension of the stub.
+            compression: The compression codec of the file.
+            dataset: The root directory of a partitioned dataset to write the partition of the instance in.
             **kwargs: The key word arguments to the constructor.
         """
-        instance = cls(handler=cls.__api_handler__(config=None), **kwargs)
-        instance.frame.to_csv(stub.format(**kwargs, config=instance.handler.config), index=False)
-        if debug:
-            logging.debug('%s\n%s', cls.__name__, instance.frame)
-            return instance
-        else:
-            return instance
+        with finance.profile.timer(f'{cls.__name__}.export'):
+            instance = cls(handler=handler if handler is not None else cls.__api_handler__(config=None), **kwargs)
+            return instance.save(stub, debug=debug, export_format=export_format, compression=compression,
+                                 dataset=dataset, **kwargs)
@@ -0,0 +1,250 @@
+"""
+Store daily snapshots of JSON objects as periodic full snapshots and compact per-day deltas.
+
+The objects of a snapshot are identified by their key fields (such as userAccountId, ticker and cusip).
+A delta holds one object per added, removed or changed object, with the key fields and only the changed
+fields, so a day on which a few prices changed costs a few small objects instead of a full copy.
+"""
+import collections
+import threading
+import datetime
+import typing
+import bisect
+import json
+import os
+
+
+import finance.store
+
+
+#: A lock for each snapshot directory, shared by all store instances in the process
+_LOCKS: typing.DefaultDict[str, threading.RLock] = collections.defaultdict(threading.RLock)
+
+#: The marker fields of the delta objects
+_ADDED: str = '__added__'
+_DELETED: str = '__deleted__'
+_REMOVED: str = '__removed__'
+_OCCURRENCE: str = '__n__'
+
+#: The state of a snapshot, the objects keyed by their key fields (and occurrence of the key)
+State = typing.Dict[tuple, dict]
+
+
+def _day(day: typing.Union[datetime.date, str]) -> str:
+    """
+    Get the YYYY-MM-DD string of a day.
+    """
+    return day if isinstance(day, str) else f'{day:%Y-%m-%d}'
+
+
+class SnapshotStore:
+    """
+    Store daily snapshots as periodic full snapshots and per-day deltas, with a manifest of the stored days.
+    """
+    def __init__(self, root: str, keys: typing.Sequence[str], store_format: str, period: int = 30):
+        """
+        Parameters:
+            root: The directory of the snapshot files.
+            keys: The fields that identify an object in a snapshot.
+            store_format: The name of the cache format of the snapshot files.
+            period: The number of days after a full snapshot before another full snapshot is written.
+        """
+        self.root: str = root
+        self.keys: typing.Tuple[str, ...] = tuple(keys)
+        self.store_format: str = store_format
+        self.period: int = period
+        self.manifest_path: str = os.path.join(root, 'manifest.json')
+        #: The state of the last day that was read or written
+        self._last: typing.Union[typing.Tuple[str, State], None] = None
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        Get the lock for the snapshot directory.
+        """
+        return _LOCKS[os.path.abspath(self.root)]
+
+    def manifest(self) -> typing.Dict[str, str]:
+        """
+        Get the mapping of stored YYYY-MM-DD days to their kind (full or delta).
+        """
+        try:
+            with open(self.manifest_path, 'r') as stream:
+                return json.load(stream).get('days', {})
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, days: dict):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.manifest_path + '.tmp', 'w') as stream:
+            json.dump({'days': days}, stream, indent=1, sort_keys=True)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+    def days(self) -> typing.List[datetime.date]:
+        """
+        Get the stored days, in order.
+        """
+        return [datetime.datetime.strptime(day, '%Y-%m-%d').date() for day in sorted(self.manifest())]
+
+    def has(self, day: typing.Union[datetime.date, str]) -> bool:
+        """
+        Is the snapshot of the day stored?
+        """
+        return _day(day) in self.manifest()
+
+    def path(self, day: str, kind: str) -> str:
+        """
+        Get the path of the full snapshot or delta file of the YYYY-MM-DD day.
+        """
+        return finance.store.with_format(os.path.join(self.root, f'{kind}-{day}'), self.store_format)
+
+    def _load(self, day: str, kind: str) -> list:
+        found: typing.Union[str, None] = finance.store.find(self.path(day, kind))
+        return finance.store.load(found) if found is not None else []
+
+    def _dump(self, data: list, day: str, kind: str):
+        path: str = self.path(day, kind)
+        temp: str = os.path.join(self.root, '.tmp-' + os.path.basename(path))
+        finance.store.dump(data, temp)
+        os.replace(temp, path)
+
+        other: typing.Union[str, None] = finance.store.find(self.path(day, 'delta' if kind == 'full' else 'full'))
+        if other is not None:
+            os.remove(other)
+
+    def state_of(self, data: typing.Iterable[dict]) -> State:
+        """
+        Key the objects of a snapshot by their key fields, and by the occurrence of the key.
+        """
+        state: State = {}
+        seen: typing.Counter[tuple] = collections.Counter()
+        for obj in data:
+            key: tuple = tuple(obj.get(k) for k in self.keys)
+            state[key + (seen[key],)] = obj
+            seen[key] += 1
+
+        return state
+
+    def delta(self, before: State, after: State) -> list:
+        """
+        Get the delta objects that change the state before into the state after.
+        Each delta object holds the key fields of its object (those that the object has) and the marker fields.
+        """
+        delta: list = []
+        for key, obj in after.items():
+            old: typing.Union[dict, None] = before.get(key)
+            if old is None:
+                change: dict = dict(obj, **{_ADDED: True})
+            elif old != obj:
+                change: dict = {k: v for k, v in obj.items() if k not in old or old[k] != v}
+                change.update((k, obj[k]) for k in self.keys if k in obj)
+                removed: list = [k for k in old if k not in obj]
+                if removed:
+                    change[_REMOVED] = removed
+            else:
+                continue
+
+            if key[-1]:
+                change[_OCCURRENCE] = key[-1]
+            delta.append(change)
+
+        for key in before.keys() - after.keys():
+            change: dict = {k: before[key][k] for k in self.keys if k in before[key]}
+            change[_DELETED] = True
+            if key[-1]:
+                change[_OCCURRENCE] = key[-1]
+            delta.append(change)
+
+        return delta
+
+    def apply(self, state: State, delta: typing.Iterable[dict]) -> State:
+        """
+        Apply the delta objects to (a copy of) the state.
+        """
+        state: State = dict(state)
+        for change in delta:
+            key: tuple = tuple(change.get(k) for k in self.keys) + (change.get(_OCCURRENCE, 0),)
+            if change.get(_DELETED):
+                state.pop(key, None)
+                continue
+
+            fields: dict = {k: v for k, v in change.items() if k not in (_ADDED, _REMOVED, _OCCURRENCE)}
+            if change.get(_ADDED) or key not in state:
+                state[key] = fields
+            else:
+                obj: dict = dict(state[key], **fields)
+                for name in change.get(_REMOVED, ()):
+                    obj.pop(name, None)
+                state[key] = obj
+
+        return state
+
+    def _state(self, day: str, manifest: dict) -> State:
+        """
+        Reconstruct the state of a stored YYYY-MM-DD day, from the last full snapshot and the following deltas.
+        """
+        if self._last is not None and self._last[0] == day:
+            return self._last[1]
+
+        days: list = sorted(d for d in manifest if d <= day)
+        start: int = max(i for i, d in enumerate(days) if manifest[d] == 'full')
+
+        state: State = self.state_of(self._load(days[start], 'full'))
+        for d in days[start + 1:]:
+            state = self.apply(state, self._load(d, 'delta'))
+
+        self._last = (day, state)
+        return state
+
+    def read(self, day: typing.Union[datetime.date, str]) -> list:
+        """
+        Get the JSON objects of the snapshot of the day.
+
+        Raises:
+            KeyError: If the day is not stored.
+        """
+        day: str = _day(day)
+        with self.lock:
+            manifest: dict = self.manifest()
+            if day not in manifest:
+                raise KeyError(f'no snapshot for {day} in {self.root}')
+
+            return list(self._state(day, manifest).values())
+
+    def write(self, day: typing.Union[datetime.date, str], data: typing.Iterable[dict]):
+        """
+        Store (or replace) the snapshot of the day.
+
+        The day is stored as a full snapshot if there is no full snapshot in the period before it,
+        and as a delta to the previous stored day otherwise. If a later day is stored, its delta is
+        rewritten against the new day.
+        """
+        day: str = _day(day)
+        state: State = self.state_of(data)
+
+        with self.lock:
+            manifest: dict = self.manifest()
+            days: list = sorted(d for d in manifest if d != day)
+            i: int = bisect.bisect_left(days, day)
+
+            following: typing.Union[str, None] = days[i] if i < len(days) else None
+            following_state: typing.Union[State, None] = \
+                self._state(following, manifest) if following is not None and manifest[following] == 'delta' else None
+
+            previous: typing.Union[str, None] = days[i - 1] if i > 0 else None
+            fulls: list = [d for d in days[:i] if manifest[d] == 'full']
+            age: int = (datetime.datetime.strptime(day, '%Y-%m-%d') -
+                        datetime.datetime.strptime(fulls[-1], '%Y-%m-%d')).days if fulls else self.period
+
+            if previous is None or age >= self.period:
+                self._dump(list(state.values()), day, 'full')
+                manifest[day] = 'full'
+            else:
+                self._dump(self.delta(self._state(previous, manifest), state), day, 'delta')
+                manifest[day] = 'delta'
+
+            if following_state is not None:
+                self._dump(self.delta(state, following_state), following, 'delta')
+
+            self._save_manifest(manifest)
+            self._last = (day, state)
@@ -0,0 +1,226 @@
+"""
+Read and write cache files in different storage formats.
+"""
+import datetime
+import typing
+import json
+import os
+
+
+def _default(value: typing.Any) -> typing.Any:
+    """
+    Convert values that the serializer does not understand.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    else:
+        return str(value)
+
+
+class StoreFormat:
+    """
+    A cache file format for a list of JSON objects.
+    """
+    #: The unique name of the format
+    name: str = ''
+    #: The file extension of the format
+    extension: str = ''
+
+    def dump(self, data: list, path: str):
+        """
+        Save the list of JSON objects to the path.
+        """
+        raise NotImplementedError
+
+    def load(self, path: str) -> list:
+        """
+        Load the list of JSON objects from the path.
+        """
+        raise NotImplementedError
+
+
+class YAMLFormat(StoreFormat):
+    """
+    The original (slow) YAML cache format.
+    """
+    name: str = 'yaml'
+    extension: str = '.yaml'
+
+    def dump(self, data: list, path: str):
+        import yaml
+
+        with open(path, 'w') as stream:
+            yaml.dump(data, stream, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper))
+
+    def load(self, path: str) -> list:
+        import yaml
+
+        with open(path, 'r') as stream:
+            return yaml.load(stream, getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+class JSONFormat(StoreFormat):
+    """
+    A JSON cache format, parsed by the C accelerated standard library.
+    """
+    name: str = 'json'
+    extension: str = '.json'
+
+    def dump(self, data: list, path: str):
+        with open(path, 'w') as stream:
+            json.dump(data, stream, default=_default, separators=(',', ':'))
+
+    def load(self, path: str) -> list:
+        with open(path, 'r') as stream:
+            return json.load(stream)
+
+
+class MsgpackFormat(StoreFormat):
+    """
+    A compact binary cache format, requires the msgpack package.
+    """
+    name: str = 'msgpack'
+    extension: str = '.msgpack'
+
+    def dump(self, data: list, path: str):
+        import msgpack
+        with open(path, 'wb') as stream:
+            stream.write(msgpack.packb(data, use_bin_type=True, default=_default))
+
+    def load(self, path: str) -> list:
+        import msgpack
+        with open(path, 'rb') as stream:
+            return msgpack.unpackb(stream.read(), raw=False)
+
+
+class ParquetFormat(StoreFormat):
+    """
+    A columnar cache format, requires the pyarrow package.
+
+    Nested values (dicts and lists) and columns with mixed types are stored as JSON strings.
+    Missing keys and null values are both dropped from the objects when loading.
+    """
+    name: str = 'parquet'
+    extension: str = '.parquet'
+
+    #: The schema metadata key that lists the JSON encoded columns
+    __json_key__: bytes = b'finance.json_columns'
+
+    def dump(self, data: list, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        names: dict = {}
+        for obj in data:
+            names.update(dict.fromkeys(obj))
+
+        arrays, encoded = [], []
+        for name in names:
+            values: list = [obj.get(name) for obj in data]
+            try:
+                if any(isinstance(v, (dict, list)) for v in values):
+                    raise TypeError(name)
+                arrays.append(pa.array(values))
+            except (TypeError, ValueError, pa.ArrowException):
+                arrays.append(pa.array([None if v is None else json.dumps(v, default=_default) for v in values]))
+                encoded.append(name)
+
+        table = pa.Table.from_arrays(arrays, names=list(names))
+        table = table.replace_schema_metadata({self.__json_key__: json.dumps(encoded)})
+        pq.write_table(table, path)
+
+    def load(self, path: str) -> list:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        encoded: list = json.loads((table.schema.metadata or {}).get(self.__json_key__, b'[]'))
+
+        data: list = []
+        for row in table.to_pylist():
+            obj: dict = {k: v for k, v in row.items() if v is not None}
+            for name in encoded:
+                if name in obj:
+                    obj[name] = json.loads(obj[name])
+            data.append(obj)
+
+        return data
+
+
+#: The known cache formats, keyed by name
+FORMATS: typing.Dict[str, StoreFormat] = {
+    f.name: f for f in (YAMLFormat(), JSONFormat(), MsgpackFormat(), ParquetFormat())
+}
+
+
+def get_format(name: str) -> StoreFormat:
+    """
+    Get the cache format with the given name.
+    """
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f'unknown cache format: {name} (expected one of {", ".join(FORMATS)})')
+
+
+def guess_format(path: str) -> typing.Union[StoreFormat, None]:
+    """
+    Get the cache format from the extension of the path.
+    """
+    extension: str = os.path.splitext(path)[1]
+    for f in FORMATS.values():
+        if f.extension == extension:
+            return f
+
+    return None
+
+
+def _format_of(path: str) -> StoreFormat:
+    """
+    Get the cache format of the path or fail.
+    """
+    f = guess_format(path)
+    if f is None:
+        raise ValueError(f'unknown cache format: {path}')
+
+    return f
+
+
+def with_format(path: str, name: str) -> str:
+    """
+    Replace the extension of the path with that of the format.
+    """
+    return os.path.splitext(path)[0] + get_format(name).extension
+
+
+def find(path: str) -> typing.Union[str, None]:
+    """
+    Find an existing cache file for the path, written in any known format.
+    The path itself is preferred over paths with the extension of other formats.
+    """
+    if os.path.exists(path):
+        return path
+
+    for name in FORMATS:
+        candidate: str = with_format(path, name)
+        if os.path.exists(candidate):
+            return candidate
+
+    return None
+
+
+def dump(data: list, path: str):
+    """
+    Save the list of JSON objects, using the format given by the extension of the path.
+    The file is written next to the path first, and then replaces it, so that it is never partially written.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp: str = os.path.join(os.path.dirname(path), '.tmp-' + os.path.basename(path))
+    _format_of(path).dump(data, temp)
+    os.replace(temp, path)
+
+
+def load(path: str) -> list:
+    """
+    Load the list of JSON objects, using the format given by the extension of the path.
+    """
+    return _format_of(path).load(path)
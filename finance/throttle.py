@@ -0,0 +1,296 @@
+"""
+A request scheduler, shared by the API handlers of a provider, that stays within the provider rate limits.
+
+The token bucket of a provider can also be shared with the other processes that use the same working
+directory, through a row in a SQLite database, so that concurrent runs together stay within the limits.
+"""
+import email.utils
+import threading
+import datetime
+import logging
+import sqlite3
+import random
+import typing
+import heapq
+import time
+import os
+
+
+#: The priority of requests made for an interactive run
+INTERACTIVE: int = 0
+#: The priority of requests made for a background backfill
+BACKGROUND: int = 1
+
+#: The priorities by name
+PRIORITIES: typing.Dict[str, int] = {'interactive': INTERACTIVE, 'background': BACKGROUND}
+
+#: The HTTP status codes that are retried
+RETRY_STATUS: typing.FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    A thread safe token bucket, where waiting requests are served by priority and then in arrival order.
+    """
+    def __init__(self, rate: float, burst: int):
+        """
+        Parameters:
+            rate: The number of tokens added per second.
+            burst: The maximum number of tokens in the bucket.
+        """
+        self.rate: float = rate
+        self.burst: int = max(1, burst)
+        self.tokens: float = float(self.burst)
+        self.stamp: float = time.monotonic()
+        self._blocked: float = 0.0
+        self._waiting: list = []
+        self._counter: int = 0
+        self._cond: threading.Condition = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(float(self.burst), self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def _take_at(self, now: float) -> float:
+        """
+        Take a token if one is available at the given time.
+
+        Returns:
+            Zero if a token was taken, or else the number of seconds until one may be available.
+        """
+        self._refill(now)
+
+        if now < self._blocked:
+            return self._blocked - now
+        elif self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        else:
+            return (1.0 - self.tokens) / self.rate
+
+    def _block_at(self, now: float, seconds: float):
+        self._blocked = max(self._blocked, now + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+    def _take(self) -> float:
+        return self._take_at(time.monotonic())
+
+    def _block(self, seconds: float):
+        self._block_at(time.monotonic(), seconds)
+
+    def block(self, seconds: float):
+        """
+        Do not hand out any tokens for the given number of seconds (for example, after a Retry-After header).
+        """
+        with self._cond:
+            self._block(seconds)
+            self._cond.notify_all()
+
+    def acquire(self, priority: int = INTERACTIVE):
+        """
+        Wait for a token to become available and take it.
+        """
+        with self._cond:
+            self._counter += 1
+            entry: tuple = (priority, self._counter)
+            heapq.heappush(self._waiting, entry)
+
+            try:
+                while True:
+                    if self._waiting[0] != entry:
+                        self._cond.wait()
+                        continue
+
+                    seconds: float = self._take()
+                    if seconds <= 0.0:
+                        return
+
+                    self._cond.wait(max(seconds, 0.001))
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    A token bucket whose tokens are kept in a SQLite database, and shared by all processes that use it.
+
+    The threads of a process still wait for their turn by priority, and the first waiting thread takes
+    the tokens from the database, in a short write transaction.
+    """
+    def __init__(self, rate: float, burst: int, path: str, name: str):
+        """
+        Parameters:
+            rate: The number of tokens added per second.
+            burst: The maximum number of tokens in the bucket.
+            path: The path of the SQLite database.
+            name: The name of the bucket in the database.
+        """
+        super().__init__(rate, burst)
+        self.path: str = path
+        self.name: str = name
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db: sqlite3.Connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        # the tokens are not worth a sync per commit, but the database is never corrupted (unlike OFF)
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS buckets '
+                         '(name TEXT PRIMARY KEY, tokens REAL, stamp REAL, blocked REAL)')
+
+    def _update(self, update: typing.Callable[[float], typing.Any]) -> typing.Any:
+        """
+        Run the update of the bucket state in one write transaction, with the state loaded into the instance.
+        """
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            now: float = time.time()
+            row: typing.Union[tuple, None] = self._db.execute(
+                'SELECT tokens, stamp, blocked FROM buckets WHERE name = ?', (self.name,)).fetchone()
+            self.tokens, self.stamp, self._blocked = row if row is not None else (float(self.burst), now, 0.0)
+
+            result: typing.Any = update(now)
+
+            self._db.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)',
+                             (self.name, self.tokens, self.stamp, self._blocked))
+            self._db.execute('COMMIT')
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+
+        return result
+
+    def _take(self) -> float:
+        return self._update(self._take_at)
+
+    def _block(self, seconds: float):
+        self._update(lambda now: self._block_at(now, seconds))
+
+
+def retry_after(headers: typing.Union[typing.Mapping, None]) -> typing.Union[float, None]:
+    """
+    Get the number of seconds to wait from the Retry-After header (in seconds or as an HTTP date).
+    """
+    value: typing.Union[str, None] = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when: datetime.datetime = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, (when - datetime.datetime.now(tz=datetime.timezone.utc)).total_seconds())
+
+
+def status_of(obj: typing.Any) -> typing.Tuple[typing.Union[int, None], typing.Union[typing.Mapping, None]]:
+    """
+    Get the HTTP status code and headers of a response or of an API exception.
+    """
+    response: typing.Any = getattr(obj, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) is not None:
+        obj = response
+
+    status: typing.Union[int, None] = getattr(obj, 'status_code', None)
+    status = status if status is not None else getattr(obj, 'status', None)
+
+    headers: typing.Any = getattr(obj, 'headers', None)
+    headers = headers if headers is not None else getattr(obj, 'getheaders', lambda: None)()
+
+    return (status if isinstance(status, int) else None), headers
+
+
+class Scheduler:
+    """
+    Run the requests of a provider through its token bucket, retrying rate limited and failed requests.
+    """
+    def __init__(self, rate: float, burst: int, retries: int = 5, backoff: float = 1.0, max_backoff: float = 60.0,
+                 bucket: TokenBucket = None):
+        """
+        Parameters:
+            rate: The sustained number of requests per second.
+            burst: The number of requests that can be made at once.
+            retries: The maximum number of retries of a request.
+            backoff: The base delay of the exponential backoff, in seconds.
+            max_backoff: The maximum delay of the exponential backoff, in seconds.
+            bucket: The token bucket, a new (process local) bucket by default.
+        """
+        self.bucket: TokenBucket = bucket if bucket is not None else TokenBucket(rate, burst)
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+
+    def delay(self, attempt: int, headers: typing.Union[typing.Mapping, None] = None) -> float:
+        """
+        Get the delay before a retry, from the Retry-After header or with full jitter exponential backoff.
+        """
+        after: typing.Union[float, None] = retry_after(headers)
+        if after is not None:
+            return after
+        else:
+            return random.uniform(0.0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, func: typing.Callable, *args, priority: int = INTERACTIVE, **kwargs) -> typing.Any:
+        """
+        Call the request function once a token is available.
+
+        A response (or raised exception) with a 429 or 5xx status is retried after a delay,
+        during which no other request of the provider is sent.
+
+        Parameters:
+            func: The request function.
+            *args: The positional arguments of the request function.
+            priority: The priority of the request (INTERACTIVE or BACKGROUND).
+            **kwargs: The key word arguments of the request function.
+
+        Returns:
+            The response of the last attempt.
+        """
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire(priority)
+
+            try:
+                result: typing.Any = func(*args, **kwargs)
+            except Exception as exc:
+                status, headers = status_of(exc)
+                if status not in RETRY_STATUS or attempt == self.retries:
+                    raise
+            else:
+                status, headers = status_of(result)
+                if status not in RETRY_STATUS or attempt == self.retries:
+                    return result
+
+            seconds: float = self.delay(attempt, headers)
+            logging.debug('status %s, retrying in %.1fs (attempt %d)', status, seconds, attempt + 1)
+            self.bucket.block(seconds)
+
+
+#: The schedulers, keyed by provider name and shared bucket path, shared by all handlers in the process
+_SCHEDULERS: typing.Dict[typing.Tuple[str, typing.Union[str, None]], Scheduler] = {}
+_SCHEDULERS_LOCK: threading.Lock = threading.Lock()
+
+
+def scheduler(provider: str, rate: float, burst: int, path: str = None) -> Scheduler:
+    """
+    Get the scheduler of the provider, creating it with the given limits on first use.
+
+    Parameters:
+        provider: The name of the provider.
+        rate: The sustained number of requests per second.
+        burst: The number of requests that can be made at once.
+        path: The SQLite database of the token bucket shared with other processes, or None for a process
+              local token bucket.
+    """
+    with _SCHEDULERS_LOCK:
+        try:
+            return _SCHEDULERS[provider, path]
+        except KeyError:
+            bucket: TokenBucket = SharedTokenBucket(rate, burst, path, provider) if path is not None else None
+            _SCHEDULERS[provider, path] = Scheduler(rate, burst, bucket=bucket)
+            return _SCHEDULERS[provider, path]
@@ -0,0 +1,288 @@
+"""
+A local SQLite warehouse of the scraped objects, with indexed queries that return dataframes.
+
+Each scraper class with a warehouse table upserts its objects when they are fetched, or when a cache file
+is reloaded for the first time. A question across days or accounts (such as the quantity of one ticker over
+the past months) is then one indexed query, instead of one cache file parse per day.
+"""
+import dataclasses
+import threading
+import sqlite3
+import typing
+import json
+import time
+import os
+
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+#: The warehouses, keyed by path, shared by all scrapers in the process
+_WAREHOUSES: typing.Dict[str, 'Warehouse'] = {}
+_WAREHOUSES_LOCK: threading.Lock = threading.Lock()
+
+#: The strftime format of the datetime columns, which sorts like the datetimes
+_DATETIME: str = '%Y-%m-%d %H:%M:%S.%f'
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS _tables (
+    name TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    datetimes TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS _loads (
+    key TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    loaded REAL NOT NULL
+);
+"""
+
+
+@dataclasses.dataclass()
+class Table:
+    """
+    The definition of the warehouse table of a scraper class.
+    Every table has a snapshot column, with the YYYY-MM-DD date of the run that stored the rows.
+    """
+    #: The name of the table
+    name: str
+    #: The columns that identify a row, a row with the same key is replaced
+    keys: typing.Tuple[str, ...] = ()
+    #: The columns of each index
+    indexes: typing.Tuple[typing.Tuple[str, ...], ...] = ()
+    #: The column of the date range queries
+    date: str = 'snapshot'
+    #: Does each load replace all of the rows of its snapshot (instead of upserting by key)?
+    snapshot: bool = False
+
+
+def _sqlite_type(dtype: typing.Any) -> str:
+    """
+    Get the SQLite column type of a dataframe dtype.
+    """
+    import pandas as pd
+
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    elif pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    else:
+        return 'TEXT'
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class Warehouse:
+    """
+    A SQLite database with one table per scraped dataset.
+    """
+    def __init__(self, path: str):
+        """
+        Parameters:
+            path: The path of the SQLite database.
+        """
+        self.path: str = path
+        self._lock: threading.RLock = threading.RLock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db: sqlite3.Connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def tables(self) -> typing.Dict[str, dict]:
+        """
+        Get the date column and datetime columns of each table.
+        """
+        with self._lock:
+            rows: list = self._db.execute('SELECT name, date, datetimes FROM _tables').fetchall()
+
+        return {name: {'date': date, 'datetimes': json.loads(datetimes)} for name, date, datetimes in rows}
+
+    def loaded(self, key: str, hash_: str) -> bool:
+        """
+        Were the objects of the cache file (with this hash) already stored?
+        """
+        with self._lock:
+            row = self._db.execute('SELECT hash FROM _loads WHERE key = ?', (key,)).fetchone()
+
+        return row is not None and row[0] == hash_
+
+    def mark_loaded(self, key: str, hash_: str):
+        """
+        Remember that the objects of the cache file (with this hash) were stored.
+        """
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO _loads VALUES (?, ?, ?)', (key, hash_, time.time()))
+            self._db.commit()
+
+    def _create(self, table: Table, frame: 'pd.DataFrame'):
+        """
+        Create the table, its indexes and any of its missing columns.
+        """
+        import pandas as pd
+
+        name: str = _quote(table.name)
+        columns: dict = {'snapshot': 'TEXT'}
+        columns.update((c, _sqlite_type(frame[c].dtype)) for c in frame.columns)
+        datetimes: list = [c for c in frame.columns if pd.api.types.is_datetime64_any_dtype(frame[c])]
+
+        definitions: str = ', '.join(f'{_quote(c)} {t}' for c, t in columns.items())
+        self._db.execute(f'CREATE TABLE IF NOT EXISTS {name} ({definitions})')
+
+        existing: set = {row[1] for row in self._db.execute(f'PRAGMA table_info({name})')}
+        for c, t in columns.items():
+            if c not in existing:
+                self._db.execute(f'ALTER TABLE {name} ADD COLUMN {_quote(c)} {t}')
+
+        if table.keys and not table.snapshot:
+            self._db.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {_quote(table.name + "_key")} '
+                             f'ON {name} ({", ".join(map(_quote, table.keys))})')
+
+        for columns_ in ((table.date,),) + tuple(table.indexes):
+            index: str = _quote(table.name + '_' + '_'.join(columns_))
+            self._db.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {name} ({", ".join(map(_quote, columns_))})')
+
+        self._db.execute('INSERT OR REPLACE INTO _tables VALUES (?, ?, ?)',
+                         (table.name, table.date, json.dumps(['snapshot'] + datetimes)))
+
+    def upsert(self, table: Table, frame: 'pd.DataFrame', snapshot: str,
+               days: typing.Iterable[str] = None) -> int:
+        """
+        Store the rows of the dataframe in the table, in one transaction.
+
+        Parameters:
+            table: The definition of the table.
+            frame: The typed dataframe of the objects.
+            snapshot: The YYYY-MM-DD date of the run.
+            days: The YYYY-MM-DD days (of the date column) whose rows are all replaced by the rows of the
+                  dataframe, so that the rows of removed objects are deleted.
+
+        Returns:
+            The number of rows stored.
+        """
+        import pandas as pd
+
+        rows: pd.DataFrame = frame.copy(deep=False)
+        for c in rows.columns:
+            if pd.api.types.is_datetime64_any_dtype(rows[c]):
+                rows[c] = rows[c].dt.strftime(_DATETIME)
+            elif pd.api.types.is_bool_dtype(rows[c]):
+                rows[c] = rows[c].astype('int64')
+
+        rows: pd.DataFrame = rows.astype(object).where(rows.notna(), None)
+        rows.insert(0, 'snapshot', snapshot)
+
+        names: str = ', '.join(map(_quote, rows.columns))
+        marks: str = ', '.join('?' * len(rows.columns))
+
+        with self._lock:
+            try:
+                self._create(table, frame)
+                if table.snapshot:
+                    self._db.execute(f'DELETE FROM {_quote(table.name)} WHERE snapshot = ?', (snapshot,))
+                if days is not None:
+                    self._db.executemany(
+                        f"DELETE FROM {_quote(table.name)} WHERE {_quote(table.date)} >= ? "
+                        f"AND {_quote(table.date)} < date(?, '+1 day')", ((day, day) for day in days))
+                self._db.executemany(f'INSERT OR REPLACE INTO {_quote(table.name)} ({names}) VALUES ({marks})',
+                                     rows.itertuples(index=False, name=None))
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+
+        return len(rows)
+
+    def query(self, sql: str, params: typing.Sequence = (),
+              parse_dates: typing.List[str] = None) -> 'pd.DataFrame':
+        """
+        Run a SQL query.
+
+        Parameters:
+            sql: The query.
+            params: The parameters of the query.
+            parse_dates: The columns of the result to convert to datetimes.
+
+        Returns:
+            The dataframe.
+        """
+        import pandas as pd
+
+        with self._lock:
+            frame: pd.DataFrame = pd.read_sql_query(sql, self._db, params=list(params))
+
+        for c in parse_dates or []:
+            if c in frame.columns:
+                frame[c] = pd.to_datetime(frame[c])
+
+        return frame
+
+    def select(self, table: str, columns: typing.List[str] = None, start: typing.Any = None, end: typing.Any = None,
+               order: str = None, **where) -> 'pd.DataFrame':
+        """
+        Select the rows of a table, through its indexes.
+
+        For example, the quantity of one ticker in each daily snapshot of 2020:
+
+            warehouse.select('pcap_holdings', ['snapshot', 'accountName', 'quantity'], ticker='VTI',
+                             start='2020-01-01', end='2020-12-31')
+
+        Parameters:
+            table: The name of the table.
+            columns: The columns to select, or None for all columns.
+            start: Only the rows with a date on or after this date (or YYYY-MM-DD string).
+            end: Only the rows with a date on or before this date (or YYYY-MM-DD string).
+            order: The column to sort by, the date column by default.
+            **where: Only the rows with these column values (a list or tuple matches any of its values).
+
+        Returns:
+            The dataframe, with the datetime columns converted.
+        """
+        info: typing.Union[dict, None] = self.tables().get(table)
+        if info is None:
+            raise KeyError(f'unknown warehouse table: {table}')
+
+        clauses, params = [], []
+        for name, value in where.items():
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f'{_quote(name)} IN ({", ".join("?" * len(value))})')
+                params.extend(value)
+            else:
+                clauses.append(f'{_quote(name)} = ?')
+                params.append(value)
+
+        date: str = info['date']
+        if start is not None:
+            clauses.append(f'{_quote(date)} >= ?')
+            params.append(f'{start:%Y-%m-%d}' if not isinstance(start, str) else start)
+        if end is not None:
+            clauses.append(f"{_quote(date)} < date(?, '+1 day')")
+            params.append(f'{end:%Y-%m-%d}' if not isinstance(end, str) else end)
+
+        sql: str = f'SELECT {", ".join(map(_quote, columns)) if columns else "*"} FROM {_quote(table)}'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += f' ORDER BY {_quote(order if order is not None else date)}'
+
+        return self.query(sql, params, parse_dates=info['datetimes'])
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def of(workdir: str) -> Warehouse:
+    """
+    Get the warehouse of the working directory, opening it on first use.
+    """
+    path: str = os.path.abspath(os.path.join(workdir, 'warehouse.sqlite'))
+    with _WAREHOUSES_LOCK:
+        try:
+            return _WAREHOUSES[path]
+        except KeyError:
+            _WAREHOUSES[path] = Warehouse(path)
+            return _WAREHOUSES[path]
@@ -2,14 +2,20 @@
 A wrapper around the YNAB API.
 """
 import dataclasses
+import threading
 import typing
+import json
 import os
 
 
+import finance.profile
+
+
 from finance.api import BaseHandler, BaseConfig
 
 
-import ynab_api as ynab
+if typing.TYPE_CHECKING:
+    import ynab_api as ynab
 
 
 @dataclasses.dataclass()
@@ -17,6 +23,13 @@ class YNABConfig(BaseConfig):
     """
     The configuration for YNAB.
     """
+    #: The settings, with the rate limits of the YNAB API (the quota is 200 requests per hour)
+    __settings__: typing.ClassVar[typing.Dict[str, tuple]] = dict(
+        BaseConfig.__settings__, rate=('YNAB_RATE', 200 / 3600, float), burst=('YNAB_BURST', 200, int))
+
+    #: Parse the response bodies directly, instead of building the API client models?
+    raw: bool = True
+
     @property
     def ynab_apikey(self) -> str:
         """
@@ -29,49 +42,86 @@ class YNABHandler(BaseHandler):
     """
     A wrapper around the YNAB API.
     """
+    __provider__: str = 'ynab'
+
     def __init__(self, config: YNABConfig = None):
         super().__init__(config=config if config is not None else YNABConfig())
-        self._api_config: typing.Union[ynab.Configuration, None] = None
-        self._api_client: typing.Union[ynab.ApiClient, None] = None
+        self._api_config: typing.Union['ynab.Configuration', None] = None
+        self._api_client: typing.Union['ynab.ApiClient', None] = None
         self._api_object: dict = {}
+        self._api_lock: threading.RLock = threading.RLock()
 
     @property
-    def client(self) -> ynab.ApiClient:
+    def client(self) -> 'ynab.ApiClient':
         """
         Log into YNAB and save the session.
         """
-        if self._api_config is None:
-            self._api_config: ynab.Configuration = ynab.Configuration()
-            self._api_config.api_key_prefix['Authorization'] = 'Bearer'
-            self._api_config.api_key['Authorization'] = self.config.ynab_apikey
-
-        if self._api_client is None:
-            self._api_client: ynab.ApiClient = ynab.ApiClient(self._api_config)
-            return self._api_client
+        import ynab_api as ynab
+
+        with self._api_lock:
+            if self._api_config is None:
+                self._api_config: ynab.Configuration = ynab.Configuration()
+                self._api_config.api_key_prefix['Authorization'] = 'Bearer'
+                self._api_config.api_key['Authorization'] = self.config.ynab_apikey
+
+            if self._api_client is None:
+                self._api_client: ynab.ApiClient = ynab.ApiClient(self._api_config)
+                return self._api_client
+            else:
+                return self._api_client
+
+    def request(self, method: typing.Callable, *args, **kwargs) -> dict:
+        """
+        Call an API method and get the response as a JSON dictionary.
+
+        In raw mode, the undecoded response body is parsed with the json module, skipping the
+        deserialization into API client models and their conversion back into dictionaries.
+        The request is sent through the scheduler, which waits for the rate limit and retries 429 and 5xx errors.
+
+        Parameters:
+            method: The API method, for example self.accounts.get_accounts.
+            *args: The positional arguments of the API method.
+            **kwargs: The key word arguments of the API method.
+
+        Returns:
+            The json dictionary.
+        """
+        if self.config.raw:
+            with finance.profile.timer('ynab.request'):
+                response = self.scheduler.call(method, *args, _preload_content=False, priority=self.priority, **kwargs)
+
+            finance.profile.response('ynab', response)
+            return json.loads(response.data)
         else:
-            return self._api_client
+            with finance.profile.timer('ynab.request'):
+                response = self.scheduler.call(method, *args, priority=self.priority, **kwargs)
+
+            finance.profile.count('ynab.requests')
+            return response.to_dict()
 
-    def _get_api_object(self, key: str, klass: typing.Callable):
+    def _get_api_object(self, key: str, klass: str):
         """
         Fetch the API object or create and store it.
         """
-        try:
-            return self._api_object[key]
-        except KeyError:
-            self._api_object[key] = klass(self.client)
-            return self._api_object[key]
+        with self._api_lock:
+            try:
+                return self._api_object[key]
+            except KeyError:
+                import ynab_api as ynab
+                self._api_object[key] = getattr(ynab, klass)(self.client)
+                return self._api_object[key]
 
     @property
-    def budgets(self) -> ynab.BudgetsApi:
+    def budgets(self) -> 'ynab.BudgetsApi':
         """Create or get existing API instance"""
-        return self._get_api_object('budgets', ynab.BudgetsApi)
+        return self._get_api_object('budgets', 'BudgetsApi')
 
     @property
-    def accounts(self) -> ynab.AccountsApi:
+    def accounts(self) -> 'ynab.AccountsApi':
         """Create or get existing API instance"""
-        return self._get_api_object('accounts', ynab.AccountsApi)
+        return self._get_api_object('accounts', 'AccountsApi')
 
     @property
-    def transactions(self) -> ynab.TransactionsApi:
+    def transactions(self) -> 'ynab.TransactionsApi':
         """Create or get existing API instance"""
-        return self._get_api_object('transactions', ynab.TransactionsApi)
+        return self._get_api_object('transactions', 'TransactionsApi')
@@ -4,8 +4,10 @@ A script to save an account CSV.
 import argparse
 
 
-import finance.scrapers
+import finance.ynab.scrapers
+import finance.exports
 import finance.helpers
+import finance.config
 
 
 # noinspection DuplicatedCode
@@ -14,8 +16,17 @@ def get_arguments(args=None) -> argparse.Namespace:
     parser.add_argument('--force', action='store_true', help='force redownload?')
     parser.add_argument('--stub', default='{config.dt:%Y-%m-%d}-ynab-accounts.csv', type=str)
     parser.add_argument('--budget-id', dest='budget_id', default='last-used', help='budget to fetch accounts for')
+    finance.exports.add_arguments(parser)
     return parser.parse_args(args=args)
 
 
+def main(**kwargs) -> finance.ynab.scrapers.AccountsScraper:
+    """
+    Save the accounts CSV for the budget.
+    """
+    finance.config.pandas()
+    return finance.ynab.scrapers.AccountsScraper.export(**kwargs)
+
+
 if __name__ == '__main__':
-    finance.helpers.run(finance.scrapers.ynab.AccountsScraper.export, get_arguments)
+    finance.helpers.run(main, get_arguments)
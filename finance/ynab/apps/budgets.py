@@ -4,8 +4,10 @@ A script to save an budget CSV.
 import argparse
 
 
-import finance.scrapers
+import finance.ynab.scrapers
+import finance.exports
 import finance.helpers
+import finance.config
 
 
 # noinspection DuplicatedCode
@@ -13,8 +15,17 @@ def get_arguments(args=None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument('--force', action='store_true', help='force redownload?')
     parser.add_argument('--stub', default='{config.dt:%Y-%m-%d}-ynab-accounts.csv', type=str)
+    finance.exports.add_arguments(parser)
     return parser.parse_args(args=args)
 
 
+def main(**kwargs) -> finance.ynab.scrapers.BudgetsScraper:
+    """
+    Save the budgets CSV.
+    """
+    finance.config.pandas()
+    return finance.ynab.scrapers.BudgetsScraper.export(**kwargs)
+
+
 if __name__ == '__main__':
-    finance.helpers.run(finance.scrapers.ynab.BudgetsScraper.export, get_arguments)
+    finance.helpers.run(main, get_arguments)
@@ -0,0 +1,32 @@
+"""
+A script to save a transactions CSV.
+"""
+import argparse
+
+
+import finance.ynab.scrapers
+import finance.exports
+import finance.helpers
+import finance.config
+
+
+# noinspection DuplicatedCode
+def get_arguments(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--force', action='store_true', help='force a full redownload?')
+    parser.add_argument('--stub', default='{config.dt:%Y-%m-%d}-ynab-transactions.csv', type=str)
+    parser.add_argument('--budget-id', dest='budget_id', default='last-used', help='budget to fetch transactions for')
+    finance.exports.add_arguments(parser)
+    return parser.parse_args(args=args)
+
+
+def main(**kwargs) -> finance.ynab.scrapers.TransactionsScraper:
+    """
+    Save the transactions CSV for the budget.
+    """
+    finance.config.pandas()
+    return finance.ynab.scrapers.TransactionsScraper.export(**kwargs)
+
+
+if __name__ == '__main__':
+    finance.helpers.run(main, get_arguments)
@@ -0,0 +1,107 @@
+"""
+A persistent name to id index of the YNAB budgets and accounts.
+"""
+import threading
+import typing
+import json
+import os
+
+
+#: The indexes, keyed by path, shared by all handlers in the process
+_INDEXES: typing.Dict[str, 'NameIndex'] = {}
+_INDEXES_LOCK: threading.Lock = threading.Lock()
+
+
+class NameIndex:
+    """
+    A name to id index, kept in memory and in a JSON file.
+
+    The index holds one table per kind of object, for example `budgets` or `accounts:<budget id>`.
+    Each table maps names to ids (and ids to names), so a lookup by either costs one dictionary access.
+    """
+    def __init__(self, path: str):
+        """
+        Parameters:
+            path: The path of the JSON file.
+        """
+        self.path: str = path
+        self._lock: threading.RLock = threading.RLock()
+
+        try:
+            with open(path, 'r') as stream:
+                self._tables: typing.Dict[str, typing.Dict[str, str]] = json.load(stream)
+        except FileNotFoundError:
+            self._tables: typing.Dict[str, typing.Dict[str, str]] = {}
+
+        self._ids: typing.Dict[str, typing.Dict[str, str]] = {
+            kind: {v: k for k, v in table.items()} for kind, table in self._tables.items()}
+
+    def resolve(self, kind: str, key: str) -> typing.Union[str, None]:
+        """
+        Get the id of the object with the given name (or id), or None if it is not known.
+        """
+        with self._lock:
+            if key in self._ids.get(kind, {}):
+                return key
+            else:
+                return self._tables.get(kind, {}).get(key)
+
+    def name(self, kind: str, key: str) -> typing.Union[str, None]:
+        """
+        Get the name of the object with the given id, or None if it is not known.
+        """
+        with self._lock:
+            return self._ids.get(kind, {}).get(key)
+
+    def ids(self, kind: str) -> typing.List[str]:
+        """
+        Get the ids of the objects of the kind.
+        """
+        with self._lock:
+            return list(self._ids.get(kind, {}))
+
+    def update(self, kind: str, rows: typing.Iterable[typing.Mapping]):
+        """
+        Replace the table of the kind with the id and name of the JSON objects, skipping deleted objects.
+        When many objects share a name, the first one is used.
+        """
+        table: typing.Dict[str, str] = {}
+        for row in rows:
+            if not row.get('deleted', False):
+                table.setdefault(row['name'], row['id'])
+
+        with self._lock:
+            if self._tables.get(kind) == table:
+                return
+
+            self._tables[kind] = table
+            self._ids[kind] = {v: k for k, v in table.items()}
+            self._save()
+
+    def invalidate(self, kind: str):
+        """
+        Forget the table of the kind.
+        """
+        with self._lock:
+            if self._tables.pop(kind, None) is not None:
+                self._ids.pop(kind, None)
+                self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.tmp', 'w') as stream:
+            json.dump(self._tables, stream, indent=1, sort_keys=True)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def of(workdir: str) -> NameIndex:
+    """
+    Get the index of the working directory, loading it from disk on first use.
+    """
+    path: str = os.path.abspath(os.path.join(workdir, 'cache', 'ynab-index.json'))
+    with _INDEXES_LOCK:
+        try:
+            return _INDEXES[path]
+        except KeyError:
+            _INDEXES[path] = NameIndex(path)
+            return _INDEXES[path]
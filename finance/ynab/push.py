@@ -0,0 +1,137 @@
+"""
+Push Personal Capital market value changes into YNAB as bulk transactions.
+"""
+import pandas as pd
+import datetime
+import hashlib
+import logging
+import typing
+import yaml
+import os
+
+
+import finance.ynab.index
+import finance.ynab.api
+
+
+from finance.ynab.scrapers.budgets import resolve_budget_id
+from finance.ynab.scrapers.accounts import AccountsScraper
+
+
+#: The name of the file that maps Personal Capital accounts to YNAB accounts
+__mapping_yaml__: str = 'ynab-accounts-map.yaml'
+
+
+def import_id(*parts: typing.Any) -> str:
+    """
+    Create a deterministic YNAB import id (at most 36 characters) from the parts.
+    Re-sending a transaction with the same import id is ignored by YNAB.
+    """
+    return 'FS:' + hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()[:33]
+
+
+def load_mapping(workdir: str) -> typing.List[dict]:
+    """
+    Load the list of account mappings from the yaml file in the working directory.
+
+    Each mapping has a `pcap` account (name or id), a YNAB `account` (name or id),
+    and optionally a YNAB `budget` (name or id, the last used budget by default).
+    """
+    path: str = os.path.join(workdir, __mapping_yaml__)
+    if os.path.exists(path):
+        with open(path, 'r') as stream:
+            return yaml.load(stream, yaml.SafeLoader).get('accounts', [])
+    else:
+        return []
+
+
+def resolve_account_id(handler: finance.ynab.api.YNABHandler, budget_id: str, account: str) -> str:
+    """
+    Get the id of the YNAB account with the given name (or id), from the name index.
+    The accounts are only synced when the account is not in the index.
+    """
+    index: finance.ynab.index.NameIndex = finance.ynab.index.of(handler.config.workdir)
+    found: typing.Union[str, None] = index.resolve(f'accounts:{budget_id}', account)
+    if found is None:
+        AccountsScraper(handler=handler, budget_id=budget_id).reload()
+        found = index.resolve(f'accounts:{budget_id}', account)
+
+    if found is None:
+        raise KeyError(account)
+    else:
+        return found
+
+
+def market_value_transactions(frame: pd.DataFrame, mapping: typing.List[dict], handler: finance.ynab.api.YNABHandler,
+                              today: datetime.date = None) -> typing.Dict[str, typing.List[dict]]:
+    """
+    Create the YNAB transactions for the performance value change of each history interval.
+
+    Intervals that end today or later (the current period, whose end is cut to today) are not complete,
+    and are skipped. Their value change grows every day, so they are pushed once they are complete, and
+    the import id of an interval never changes.
+
+    Parameters:
+        frame: The histories, with accountName, userAccountId, t0, t1 and dateRangePerformanceValueChange.
+        mapping: The list of account mappings.
+        handler: The YNAB api handler instance.
+        today: The current UTC date, today by default.
+
+    Returns:
+        The transactions, keyed by budget id.
+    """
+    today: datetime.date = today if today is not None else datetime.datetime.now(tz=datetime.timezone.utc).date()
+
+    complete: pd.Series = frame['t1'].map(lambda t1: t1.date() < today).astype(bool)
+    if not complete.all():
+        logging.debug('skipped %d market value changes of intervals that end on %s or later', (~complete).sum(), today)
+
+    frame = frame[complete & (frame['dateRangePerformanceValueChange'].abs() > 0.0)]
+
+    budgets: typing.Dict[str, typing.List[dict]] = {}
+    for (account_name, user_account_id), account_data in frame.groupby(by=['accountName', 'userAccountId']):
+        matches: list = [m for m in mapping if str(m['pcap']) in (str(account_name), str(user_account_id))]
+        if not matches:
+            logging.debug('no YNAB account mapped for %s', account_name)
+            continue
+
+        budget_id: str = resolve_budget_id(matches[0].get('budget', 'last-used'), handler=handler)
+        account_id: str = resolve_account_id(handler, budget_id, matches[0]['account'])
+
+        for _, row in account_data.iterrows():
+            budgets.setdefault(budget_id, []).append({
+                'account_id': account_id,
+                'date': f'{row["t1"]:%Y-%m-%d}',
+                'amount': int(round(row['dateRangePerformanceValueChange'] * 1000)),
+                'payee_name': 'Market',
+                'memo': '',
+                'cleared': 'cleared',
+                'approved': False,
+                'import_id': import_id('market', user_account_id, f'{row["t0"]:%Y-%m-%d}', f'{row["t1"]:%Y-%m-%d}'),
+            })
+
+    return budgets
+
+
+def push_transactions(handler: finance.ynab.api.YNABHandler, budgets: typing.Dict[str, typing.List[dict]],
+                      chunk: int = 1000) -> typing.Dict[str, dict]:
+    """
+    Create the transactions with one bulk request per budget (per chunk of transactions).
+
+    Returns:
+        The number of created and duplicate transactions, keyed by budget id.
+    """
+    summary: typing.Dict[str, dict] = {}
+    for budget_id, transactions in budgets.items():
+        created, duplicates = 0, 0
+        for i in range(0, len(transactions), chunk):
+            data: dict = {'transactions': transactions[i:i + chunk]}
+            response: dict = handler.request(handler.transactions.create_transaction, budget_id, data)
+            response: dict = response.get('data', {})
+            created += len(response.get('transaction_ids', []))
+            duplicates += len(response.get('duplicate_import_ids', []))
+
+        logging.debug('budget %s: %d created, %d duplicates', budget_id, created, duplicates)
+        summary[budget_id] = {'created': created, 'duplicates': duplicates}
+
+    return summary
@@ -1,10 +1,23 @@
+import datetime
 import typing
+import json
+import os
+
+import finance.ynab.index
+import finance.profile
+import finance.frames
+import finance.store
+import finance.memo
 
 from finance.objmap import ObjectMapping
 from finance.scraper import BaseScraper
 from finance.ynab.api import YNABHandler
 
 
+#: The budget id that the YNAB API resolves to the budget that was used last
+LAST_USED: str = 'last-used'
+
+
 class YNABScraper(BaseScraper):
     """
     A base class that can preform API calls or reload data using a YNAB handler.
@@ -13,6 +26,7 @@ class YNABScraper(BaseScraper):
     __fillna_yaml__: str = 'fillna-finance.yaml'
     __api_handler__: typing.Callable = YNABHandler
     __store_class__: ObjectMapping = ObjectMapping
+    __index_kind__: typing.Union[str, None] = None
 
     def fetch(self) -> list:
         """
@@ -25,4 +39,197 @@ class YNABScraper(BaseScraper):
         """
         Get the handler instance.
         """
-        return self._handler
\ No newline at end of file
+        return self._handler
+
+    def reload(self) -> 'YNABScraper':
+        """
+        Download the data from the API or reload it from disk, and update the name index.
+        """
+        super().reload()
+        self._update_index()
+        return self
+
+    def catalog_params(self) -> dict:
+        """
+        Get the JSON parameters of the instance that are recorded in the cache catalog, with its budget.
+        """
+        params: dict = super().catalog_params()
+        if hasattr(self, 'budget_id'):
+            params['budget_id'] = self.budget_id
+        return params
+
+    def _update_index(self):
+        """
+        Replace the names and ids of the objects in the name index, if the objects are indexed.
+        """
+        if self.__index_kind__ is not None:
+            index: finance.ynab.index.NameIndex = finance.ynab.index.of(self.handler.config.workdir)
+            index.update(self.__index_kind__.format(self=self), self._data)
+
+
+class YNABDeltaScraper(YNABScraper):
+    """
+    A base class that syncs only the changes since the last request, using the YNAB server knowledge.
+
+    The merged JSON objects are kept in a persistent store, next to the last server knowledge and the day
+    it was synced. The first reload of a day sends one delta request and merges the changed objects (by id)
+    into the store, later reloads of the day load the cache of the day without the API.
+    When forced, or when there is no server knowledge yet, everything is fetched.
+    The last used budget may change between runs, so its objects are always fetched in full.
+    The store is written before the server knowledge, and both are replaced atomically.
+    The persistent store is not in the cache catalog, so it is never pruned.
+    The changed objects are upserted into the warehouse (all objects, for snapshot tables).
+    The merged objects of the day are also kept in a daily cache file, or in the snapshot store.
+    """
+    __delta_yaml__: str = 'ynab-finance.yaml'
+    __delta_key__: str = 'id'
+
+    def fetch_delta(self, knowledge: typing.Union[int, None]) -> typing.Tuple[list, typing.Union[int, None]]:
+        """
+        The logic of the API call.
+
+        Parameters:
+            knowledge: The last server knowledge, or None to fetch everything.
+
+        Returns:
+            The json dictionary of the changed objects and the new server knowledge.
+        """
+        raise NotImplementedError
+
+    def fetch(self) -> list:
+        """
+        The logic of the API call.
+        """
+        return self.fetch_delta(None)[0]
+
+    @property
+    def delta_store(self) -> str:
+        """
+        Get the path of the persistent store of merged objects.
+        """
+        path: str = os.path.join(self.handler.config.workdir, 'cache', self.__delta_yaml__)
+        path: str = path.format(dt=self.handler.config.dt, self=self)
+        return finance.store.with_format(path, self.store_format)
+
+    @property
+    def knowledge_path(self) -> str:
+        """
+        Get the path of the file with the last server knowledge.
+        """
+        return os.path.splitext(self.delta_store)[0] + '.knowledge'
+
+    @property
+    def knowledge(self) -> typing.Union[int, None]:
+        """
+        Get the last server knowledge, if it was saved.
+        """
+        return self._load_knowledge().get('server_knowledge')
+
+    @property
+    def synced(self) -> typing.Union[str, None]:
+        """
+        Get the YYYY-MM-DD day of the last server knowledge, if it was saved.
+        """
+        return self._load_knowledge().get('date')
+
+    @property
+    def resumable(self) -> bool:
+        """
+        Can the changes be merged into the persistent store? Not for the last used budget, since the store
+        may hold the objects of the budget that was used last in an earlier run.
+        """
+        return getattr(self, 'budget_id', None) != LAST_USED
+
+    def _load_knowledge(self) -> dict:
+        """
+        Load the last server knowledge file, or an empty dictionary.
+        """
+        try:
+            with open(self.knowledge_path, 'r') as stream:
+                return json.load(stream)
+        except FileNotFoundError:
+            return {}
+
+    def _dump_knowledge(self, knowledge: typing.Union[int, None]):
+        """
+        Replace the last server knowledge file, with the day of the sync.
+        """
+        temp: str = os.path.join(os.path.dirname(self.knowledge_path), '.tmp-' + os.path.basename(self.knowledge_path))
+        with open(temp, 'w') as stream:
+            json.dump({'server_knowledge': knowledge, 'date': f'{self.handler.config.dt:%Y-%m-%d}'}, stream)
+        os.replace(temp, self.knowledge_path)
+
+    def _reload_day(self) -> typing.Union[list, None]:
+        """
+        Load the merged objects of the day, from the snapshot store or the cache file of the day.
+
+        Returns:
+            The JSON objects, or None if the objects of the day were not kept.
+        """
+        if self.handler.config.snapshots and self.snapshots is not None:
+            day: datetime.date = self.handler.config.dt.date()
+            return self.snapshots.read(day) if self.snapshots.has(day) else None
+
+        path: typing.Union[str, None] = finance.store.find(self.store)
+        return finance.store.load(path) if path is not None else None
+
+    def merge(self, data: list, delta: list) -> list:
+        """
+        Replace (or add) the changed objects, keeping the order of the existing objects.
+        """
+        merged: dict = {obj[self.__delta_key__]: obj for obj in data}
+        merged.update((obj[self.__delta_key__], obj) for obj in delta)
+        return list(merged.values())
+
+    def reload(self) -> 'YNABDeltaScraper':
+        """
+        Fetch the changes from the API and merge them into the persistent store, once per day.
+        """
+        if not self.force and self.resumable and self.synced == f'{self.handler.config.dt:%Y-%m-%d}':
+            with finance.profile.timer(f'{self.__class__.__name__}.reload'):
+                data: typing.Union[list, None] = self._reload_day()
+
+            if data is not None:
+                self._data = data
+                self._update_index()
+                finance.memo.invalidate(self, 'objects', 'frame')
+                return self
+
+        knowledge: typing.Union[int, None] = self.knowledge if not self.force and self.resumable else None
+        path: typing.Union[str, None] = finance.store.find(self.delta_store)
+
+        if knowledge is None or path is None:
+            knowledge, data = None, []
+        else:
+            with finance.profile.timer(f'{self.__class__.__name__}.reload'):
+                data: list = finance.store.load(path)
+
+        with finance.profile.timer(f'{self.__class__.__name__}.fetch'):
+            delta, knowledge = self.fetch_delta(knowledge)
+        self._data = self.merge(data, delta)
+
+        with finance.profile.timer(f'{self.__class__.__name__}.write'):
+            finance.store.dump(self._data, self.delta_store)
+
+        if self.handler.config.snapshots and self.snapshots is not None:
+            self.snapshots.write(self.handler.config.dt.date(), self._data)
+        elif self.store != self.delta_store:
+            finance.store.dump(self._data, self.store)
+            self._record(self.store)
+
+        self._dump_knowledge(knowledge)
+
+        self._update_index()
+        finance.memo.invalidate(self, 'objects', 'frame')
+
+        if self.__warehouse__ is not None and self.handler.config.warehouse:
+            self.store_warehouse(self.frame if self.__warehouse__.snapshot else finance.frames.build_frame(
+                self.__store_class__, delta, instance=self, rules=self.rules))
+
+        return self
+
+    def _stamp(self) -> None:
+        """
+        A reload may sync with the server, so the dataframe is never shared.
+        """
+        return None
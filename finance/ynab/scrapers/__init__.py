@@ -1,2 +1,3 @@
+from .transactions import TransactionsScraper
 from .accounts import AccountsScraper
 from .budgets import BudgetsScraper
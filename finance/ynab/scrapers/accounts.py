@@ -1,11 +1,12 @@
 import finance.objmap
 import finance.ynab.api
 import finance.ynab.scraper
-import ynab_api as ynab
 import dataclasses
+import typing
 
 
 import finance.scraper
+import finance.warehouse
 
 
 from .budgets import resolve_budget_id
@@ -26,17 +27,25 @@ class Account(finance.objmap.ObjectMapping):
     on_budget: bool = True
 
 
-class AccountsScraper(finance.ynab.scraper.YNABScraper):
+class AccountsScraper(finance.ynab.scraper.YNABDeltaScraper):
     __reload_yaml__: str = '{dt:%Y-%m-%d}-ynab-accounts-{self.budget_id}.yaml'
+    __delta_yaml__: str = 'ynab-accounts-{self.budget_id}.yaml'
     __fillna_yaml__: str = 'ynab-accounts-fillna.yaml'
+    __export_path__: str = 'dataset=ynab-accounts/budget={self.budget_id}/date={dt:%Y-%m-%d}'
+    __warehouse__: finance.warehouse.Table = finance.warehouse.Table(
+        'ynab_accounts', snapshot=True, indexes=(('id', 'snapshot'),))
     __store_class__: type = Account
+    __snapshot_path__: str = 'ynab-accounts-{self.budget_id}-snapshots'
+    __snapshot_keys__: tuple = ('id',)
+    __index_kind__: str = 'accounts:{self.budget_id}'
 
     def __init__(self, *args, budget_id: str, **kwargs):
-        self.budget_id: str = resolve_budget_id(budget_id)
+        handler = args[0] if args else kwargs.get('handler')
+        self.budget_id: str = resolve_budget_id(budget_id, handler=handler)
         super().__init__(*args, **kwargs)
 
-    def fetch(self) -> list:
-        accounts: ynab.AccountResponse = self.handler.accounts.get_accounts(self.budget_id)
-        data: dict = accounts.to_dict().get('data', {})
-        data: list = data.get('accounts', [])
-        return data
+    def fetch_delta(self, knowledge: typing.Union[int, None]) -> typing.Tuple[list, typing.Union[int, None]]:
+        kwargs: dict = {'last_knowledge_of_server': knowledge} if knowledge is not None else {}
+        accounts: dict = self.handler.request(self.handler.accounts.get_accounts, self.budget_id, **kwargs)
+        data: dict = accounts.get('data', {})
+        return data.get('accounts', []), data.get('server_knowledge')
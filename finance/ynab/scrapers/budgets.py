@@ -1,9 +1,9 @@
 import finance.objmap
 import finance.ynab.api
 import finance.ynab.scraper
-import ynab_api as ynab
-import pandas as pd
+import finance.ynab.index
 import dataclasses
+import typing
 
 
 import finance.scraper
@@ -18,24 +18,37 @@ class Budget(finance.objmap.ObjectMapping):
 class BudgetsScraper(finance.ynab.scraper.YNABScraper):
     __reload_yaml__: str = '{dt:%Y-%m-%d}-ynab-budgets.yaml'
     __fillna_yaml__: str = 'fillna-ynab-budgets.yaml'
+    __export_path__: str = 'dataset=ynab-budgets/date={dt:%Y-%m-%d}'
     __store_class__: type = Budget
+    __index_kind__: str = 'budgets'
 
     def fetch(self) -> list:
-        budgets: ynab.BudgetSummaryResponse = self.handler.budgets.get_budgets()
-        data: dict = budgets.to_dict().get('data', {})
+        budgets: dict = self.handler.request(self.handler.budgets.get_budgets)
+        data: dict = budgets.get('data', {})
         data: list = data.get('budgets', [])
         return data
 
 
-def resolve_budget_id(budget_id: str, parser: BudgetsScraper = None) -> str:
-    if budget_id == 'last-used':
+def resolve_budget_id(budget_id: str, parser: BudgetsScraper = None,
+                      handler: finance.ynab.api.YNABHandler = None) -> str:
+    """
+    Get the id of the budget with the given name (or id), from the name index.
+    The budgets are only reloaded when the budget is not in the index.
+    """
+    if budget_id == finance.ynab.scraper.LAST_USED:
         return budget_id
 
-    parser: BudgetsScraper = parser if parser is not None else BudgetsScraper()
-    dframe: pd.DataFrame = parser.frame
+    if handler is None:
+        handler = parser.handler if parser is not None else finance.ynab.api.YNABHandler()
 
-    if budget_id in dframe['id']:
-        return budget_id
+    index: finance.ynab.index.NameIndex = finance.ynab.index.of(handler.config.workdir)
+    found: typing.Union[str, None] = index.resolve('budgets', budget_id)
+    if found is None:
+        parser: BudgetsScraper = parser if parser is not None else BudgetsScraper(handler=handler)
+        parser.reload()
+        found = index.resolve('budgets', budget_id)
+
+    if found is None:
+        raise KeyError(budget_id)
     else:
-        dframe.set_index('name', inplace=True)
-        return dframe.loc[budget_id, 'id']
+        return found
@@ -0,0 +1,57 @@
+import finance.objmap
+import finance.ynab.api
+import finance.ynab.scraper
+import dataclasses
+import typing
+
+
+import finance.scraper
+import finance.warehouse
+
+
+from .budgets import resolve_budget_id
+
+
+@dataclasses.dataclass()
+class Transaction(finance.objmap.ObjectMapping):
+    __frame_dtypes__: typing.ClassVar[dict] = {
+        'date': 'datetime64[ns]', 'account_name': 'category', 'category_name': 'category'}
+    __date_formats__: typing.ClassVar[dict] = {'date': '%Y-%m-%d'}
+
+    id: str = ''
+    date: str = ''
+    amount: int = 0
+    memo: str = ''
+    cleared: str = ''
+    approved: bool = False
+
+    account_id: str = ''
+    account_name: str = ''
+    payee_name: str = ''
+    category_name: str = ''
+    transfer_account_id: str = ''
+    import_id: str = ''
+
+    deleted: bool = False
+
+
+class TransactionsScraper(finance.ynab.scraper.YNABDeltaScraper):
+    __reload_yaml__: str = 'ynab-transactions-{self.budget_id}.yaml'
+    __delta_yaml__: str = 'ynab-transactions-{self.budget_id}.yaml'
+    __fillna_yaml__: str = 'fillna-ynab-transactions.yaml'
+    __export_path__: str = 'dataset=ynab-transactions/budget={self.budget_id}/synced={dt:%Y-%m-%d}'
+    __warehouse__: finance.warehouse.Table = finance.warehouse.Table(
+        'ynab_transactions', keys=('id',), date='date', indexes=(('account_id', 'date'), ('payee_name', 'date')))
+    __store_class__: type = Transaction
+
+    def __init__(self, *args, budget_id: str, **kwargs):
+        handler = args[0] if args else kwargs.get('handler')
+        self.budget_id: str = resolve_budget_id(budget_id, handler=handler)
+        super().__init__(*args, **kwargs)
+
+    def fetch_delta(self, knowledge: typing.Union[int, None]) -> typing.Tuple[list, typing.Union[int, None]]:
+        kwargs: dict = {'last_knowledge_of_server': knowledge} if knowledge is not None else {}
+        transactions: dict = \
+            self.handler.request(self.handler.transactions.get_transactions, self.budget_id, **kwargs)
+        data: dict = transactions.get('data', {})
+        return data.get('transactions', []), data.get('server_knowledge')
@@ -0,0 +1,38 @@
+"""
+Tests of the configuration of the API handlers.
+"""
+import pytest
+
+
+import finance.pcap.api
+import finance.ynab.api
+
+
+@pytest.fixture()
+def environ(monkeypatch):
+    # the variables are removed again after the test, even when the environment file set them
+    for name in ('FINANCE_CACHE_FORMAT', 'FINANCE_WAREHOUSE', 'PC_RATE', 'PC_POOL_SIZE', 'YNAB_BURST'):
+        monkeypatch.setenv(name, '')
+        monkeypatch.delenv(name)
+
+
+def test_settings_are_read_from_the_environment_file(tmp_path, environ):
+    (tmp_path / '.env').write_text('FINANCE_CACHE_FORMAT=yaml\nFINANCE_WAREHOUSE=1\nPC_RATE=2.5\nYNAB_BURST=3\n')
+
+    pcap = finance.pcap.api.PCAPConfig(workdir=str(tmp_path))
+    assert pcap.cache_format == 'yaml'
+    assert pcap.warehouse is True
+    assert pcap.rate == 2.5
+    assert pcap.pool_size == 8
+
+    ynab = finance.ynab.api.YNABConfig(workdir=str(tmp_path))
+    assert ynab.burst == 3
+    assert ynab.rate == 200 / 3600
+
+
+def test_given_settings_are_kept(tmp_path, environ):
+    (tmp_path / '.env').write_text('PC_RATE=2.5\nFINANCE_WAREHOUSE=1\n')
+
+    config = finance.pcap.api.PCAPConfig(workdir=str(tmp_path), rate=1e9, warehouse=False)
+    assert config.rate == 1e9
+    assert config.warehouse is False
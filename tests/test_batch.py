@@ -0,0 +1,37 @@
+"""
+Tests of the batch app.
+"""
+import pytest
+
+
+import finance.apps.batch
+import finance.throttle
+
+
+@pytest.fixture(autouse=True)
+def schedulers(monkeypatch):
+    # the handlers of the tests use the default limits, which would throttle the schedulers of later tests
+    monkeypatch.setattr(finance.throttle, '_SCHEDULERS', {})
+
+
+def test_batch_jobs_share_the_rate_limits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('FINANCE_SHARED_RATE', raising=False)
+    (tmp_path / 'jobs.yaml').write_text('jobs:\n  - app: pcap holdings\n')
+    buckets: list = []
+    monkeypatch.setattr(finance.apps.batch, 'run_job',
+                        lambda job, handlers: buckets.append(handlers['pcap'].scheduler.bucket) or 0)
+
+    finance.apps.batch.main(str(tmp_path / 'jobs.yaml'))
+
+    assert isinstance(buckets[0], finance.throttle.SharedTokenBucket)
+    assert buckets[0].path == str(tmp_path / 'cache' / 'throttle.sqlite')
+
+
+def test_interactive_runs_do_not_share_the_rate_limits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('FINANCE_SHARED_RATE', raising=False)
+
+    handler = finance.apps.handler('pcap')
+    assert not isinstance(handler.scheduler.bucket, finance.throttle.SharedTokenBucket)
+    assert not (tmp_path / 'cache' / 'throttle.sqlite').exists()
@@ -0,0 +1,57 @@
+"""
+Tests of the cache catalog and the planner entries it holds.
+"""
+import datetime
+import time
+import os
+
+
+import pytest
+
+
+import finance.catalog
+import finance.fake
+import finance.pcap.api
+import finance.pcap.planner
+
+
+@pytest.fixture()
+def catalog(tmp_path) -> finance.catalog.Catalog:
+    return finance.catalog.Catalog(str(tmp_path / 'cache'))
+
+
+def cache_file(catalog: finance.catalog.Catalog, name: str) -> str:
+    path: str = os.path.join(catalog.root, name)
+    with open(path, 'w') as stream:
+        stream.write('[]')
+    return path
+
+
+def test_prune_keeps_each_interval(catalog):
+    old: float = time.time() - 100 * 86400
+    for day in range(1, 4):
+        catalog.record(cache_file(catalog, f'2020-01-0{day}-pcap-holdings.json'), 'pcap', 'HoldingsScraper',
+                       params={'date': f'2020-01-0{day}'}, fetched=old + day)
+        catalog.record(cache_file(catalog, f'2020-01-0{day}-000-pcap-histories.json'), 'pcap', 'HistoriesScraper',
+                       params={'t0': f'2020-01-0{day}', 'dt': 0}, fetched=old + day)
+
+    removed: list = catalog.prune(time.time() - 90 * 86400, keep=1)
+
+    assert sorted(entry.key for entry in removed) == ['2020-01-01-pcap-holdings', '2020-01-02-pcap-holdings']
+    assert len(catalog.entries(scraper='HistoriesScraper')) == 3
+    assert not os.path.exists(removed[0].path)
+
+
+def test_planner_forgets_missing_intervals(tmp_path, monkeypatch):
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    handler = finance.pcap.api.PCAPHandler(
+        finance.pcap.api.PCAPConfig(workdir=str(tmp_path), rate=1e9, burst=10 ** 6))
+    finance.fake.install_pcap(handler, accounts=2)
+    planner = finance.pcap.planner.IntervalPlanner(handler=handler)
+    planner.frames([(datetime.datetime(2020, 1, d), 0) for d in (1, 2)])
+
+    catalog: finance.catalog.Catalog = finance.catalog.of(str(tmp_path))
+    os.remove(next(e.path for e in catalog.entries(scraper='HistoriesScraper') if e.t0 == '2020-01-01'))
+
+    assert planner.cached() == {(datetime.date(2020, 1, 2), datetime.date(2020, 1, 2))}
+    assert len(catalog.entries(scraper='HistoriesScraper')) == 1
@@ -0,0 +1,52 @@
+"""
+Tests of the indexed fillna rules.
+"""
+import dataclasses
+
+
+import pandas as pd
+
+
+import finance.objmap
+
+
+@dataclasses.dataclass()
+class Holding(finance.objmap.ObjectMapping):
+    cusip: str = ''
+    userAccountId: int = -1
+    ticker: str = ''
+    accountName: str = ''
+
+
+RULES: list = [
+    {'where': {'cusip': 'X1', 'userAccountId': 1}, 'value': {'ticker': 'FIRST'}},
+    {'where': {'cusip': 'X1'}, 'value': {'ticker': 'ANY', 'accountName': 'Fallback'}},
+    {'where': {'cusip': 'X1', 'userAccountId': 1}, 'value': {'ticker': 'SHADOWED'}},
+    {'where': {'cusip': 'X2'}, 'value': {'accountName': 'Second'}},
+]
+
+
+def test_the_first_matching_rule_wins():
+    rules = finance.objmap.FillnaRules(RULES)
+
+    assert rules.match(Holding('X1', 1)) == {'ticker': 'FIRST'}
+    assert rules.match(Holding('X1', 2)) == {'ticker': 'ANY', 'accountName': 'Fallback'}
+    assert rules.match(Holding('X3', 1)) is None
+
+
+def test_rules_are_reusable():
+    rules = finance.objmap.FillnaRules(RULES)
+    objects: list = [rules.apply(Holding('X1', 1)), rules.apply(Holding('X1', 1))]
+
+    assert [o.ticker for o in objects] == ['FIRST', 'FIRST']
+    assert len(rules) == len(RULES)
+
+
+def test_fill_frame_matches_apply():
+    rules = finance.objmap.FillnaRules(RULES)
+    objects: list = [Holding('X1', 1), Holding('X1', 2), Holding('X2', 3), Holding('X3', 4)]
+
+    frame: pd.DataFrame = rules.fill_frame(pd.DataFrame([dataclasses.asdict(o) for o in objects]))
+    expected: pd.DataFrame = pd.DataFrame([dataclasses.asdict(rules.apply(o)) for o in objects])
+
+    pd.testing.assert_frame_equal(frame, expected)
@@ -0,0 +1,47 @@
+"""
+Tests of the typed dataframes built directly from the JSON objects.
+"""
+import dataclasses
+import datetime
+import logging
+
+
+import pandas as pd
+
+
+import finance.fake
+import finance.frames
+import finance.pcap.api
+import finance.pcap.scrapers
+
+
+def test_build_frame_matches_the_objects(tmp_path, monkeypatch):
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    handler = finance.pcap.api.PCAPHandler(
+        finance.pcap.api.PCAPConfig(workdir=str(tmp_path), rate=1e9, burst=10 ** 6))
+    finance.fake.install_pcap(
+        handler, transactions=500, start=datetime.date(2020, 1, 1), end=datetime.date(2020, 1, 31))
+    scraper = finance.pcap.scrapers.TransactionsScraper(handler, t0=datetime.datetime(2020, 1, 1), dt=30, hot=0)
+    scraper.reload()
+    rows: list = scraper.data
+    cls = scraper.__store_class__
+
+    objects: list = cls.safe_init_many(rows, instance=scraper)
+    expected: pd.DataFrame = pd.DataFrame([dataclasses.asdict(obj) for obj in objects])
+    expected: pd.DataFrame = finance.frames.astype(scraper.rules.fill_frame(expected), cls.frame_dtypes())
+    expected: pd.DataFrame = expected.sort_values(by=list(expected.columns)).reset_index(drop=True)
+
+    frame: pd.DataFrame = finance.frames.build_frame(cls, rows, instance=scraper, rules=scraper.rules)
+
+    pd.testing.assert_frame_equal(frame, expected)
+
+
+def test_astype_logs_the_columns_left_as_they_are(caplog):
+    frame: pd.DataFrame = pd.DataFrame({'a': [1, None], 'b': ['1', '2']})
+
+    with caplog.at_level(logging.WARNING):
+        frame: pd.DataFrame = finance.frames.astype(frame, {'a': 'int64', 'b': 'int64'})
+
+    assert frame['b'].dtype == 'int64'
+    assert frame['a'].dtype == 'float64'
+    assert 'column a' in caplog.text
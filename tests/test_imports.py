@@ -0,0 +1,16 @@
+"""
+Tests that the scrapers can be imported without loading the dataframe packages.
+"""
+import subprocess
+import sys
+
+
+import pytest
+
+
+@pytest.mark.parametrize('module', ['finance.scraper', 'finance.pcap.scrapers'])
+def test_dataframe_packages_are_loaded_lazily(module):
+    code: str = f'import sys, {module}; print(sorted({{"pandas", "numpy", "pyarrow"}} & set(sys.modules)))'
+    output: str = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == '[]'
@@ -0,0 +1,60 @@
+"""
+Tests of the object mappings and of the frames built from them.
+"""
+import dataclasses
+
+
+import finance.frames
+import finance.objmap
+
+
+@dataclasses.dataclass()
+class Row(finance.objmap.ObjectMapping):
+    name: str = ''
+    value: float = 0.0
+    account: int = -1
+
+
+class Scraper:
+    """
+    An instance with a fallback attribute and an expensive property.
+    """
+    account: int = 7
+
+    def __init__(self):
+        self.evaluated: int = 0
+
+    @property
+    def value(self) -> float:
+        self.evaluated += 1
+        return 1.5
+
+
+def test_fallbacks_are_only_resolved_for_missing_fields():
+    scraper = Scraper()
+    objects: list = Row.safe_init_many([{'name': 'a', 'value': 2.0}, {'name': 'b', 'value': 3.0}], scraper)
+
+    assert objects == [Row('a', 2.0, 7), Row('b', 3.0, 7)]
+    assert scraper.evaluated == 0
+
+
+def test_fallbacks_are_resolved_once():
+    scraper = Scraper()
+    objects: list = Row.safe_init_many([{'name': 'a'}, {'name': 'b'}, {'name': 'c', 'value': 0.5}], scraper)
+
+    assert [o.value for o in objects] == [1.5, 1.5, 0.5]
+    assert scraper.evaluated == 1
+
+
+def test_columns_of_resolves_fallbacks_lazily():
+    scraper = Scraper()
+    columns: dict = finance.frames.columns_of(Row, [{'name': 'a', 'value': 2.0}, {'name': 'b', 'value': 3.0}], scraper)
+
+    assert columns == {'name': ['a', 'b'], 'value': [2.0, 3.0], 'account': [7, 7]}
+    assert scraper.evaluated == 0
+
+
+def test_columns_of_uses_the_field_defaults():
+    columns: dict = finance.frames.columns_of(Row, [{'name': 'a'}], object())
+
+    assert columns == {'name': ['a'], 'value': [0.0], 'account': [-1]}
@@ -0,0 +1,114 @@
+"""
+Tests of the day-covered monthly partitions of the PCAP transactions.
+"""
+import datetime
+
+
+import pytest
+
+
+import finance.partitions
+
+
+def transaction(day: str, n: int) -> dict:
+    return {'transactionDate': day, 'userTransactionId': n, 'amount': float(n)}
+
+
+@pytest.fixture()
+def store(tmp_path) -> finance.partitions.PartitionStore:
+    return finance.partitions.PartitionStore(str(tmp_path / 'partitions'), date_key='transactionDate',
+                                            store_format='json')
+
+
+def test_days_in_is_inclusive():
+    days: list = finance.partitions.days_in(datetime.date(2020, 1, 30), datetime.date(2020, 2, 2))
+    assert days == [datetime.date(2020, 1, 30), datetime.date(2020, 1, 31),
+                    datetime.date(2020, 2, 1), datetime.date(2020, 2, 2)]
+
+
+def test_ranges_of_groups_contiguous_days():
+    days: list = [datetime.date(2020, 1, d) for d in (5, 1, 2, 3, 7, 8)]
+    assert finance.partitions.ranges_of(days) == [
+        (datetime.date(2020, 1, 1), datetime.date(2020, 1, 3)),
+        (datetime.date(2020, 1, 5), datetime.date(2020, 1, 5)),
+        (datetime.date(2020, 1, 7), datetime.date(2020, 1, 8))]
+
+
+def test_write_covers_days_across_months(store):
+    d0, d1 = datetime.date(2020, 1, 30), datetime.date(2020, 2, 2)
+    store.write(d0, d1, [transaction('2020-01-30', 1), transaction('2020-02-02', 2), transaction('2020-02-03', 3)])
+
+    assert store.missing(d0, d1) == []
+    assert store.missing(d0, datetime.date(2020, 2, 3)) == [(datetime.date(2020, 2, 3), datetime.date(2020, 2, 3))]
+    assert [obj['userTransactionId'] for obj in store.read(d0, d1)] == [1, 2]
+
+
+def test_hot_days_are_always_missing(store):
+    d0, d1 = datetime.date(2020, 1, 1), datetime.date(2020, 1, 10)
+    store.write(d0, d1, [])
+
+    assert store.missing(d0, d1, hot=datetime.date(2020, 1, 8)) == [(datetime.date(2020, 1, 8), d1)]
+
+
+def test_write_replaces_only_its_days(store):
+    store.write(datetime.date(2020, 1, 1), datetime.date(2020, 1, 31),
+                [transaction('2020-01-01', 1), transaction('2020-01-15', 2), transaction('2020-01-31', 3)])
+    store.write(datetime.date(2020, 1, 15), datetime.date(2020, 1, 15), [transaction('2020-01-15', 4)])
+
+    ids: list = [obj['userTransactionId'] for obj in store.read(datetime.date(2020, 1, 1), datetime.date(2020, 1, 31))]
+    assert sorted(ids) == [1, 3, 4]
+
+
+def test_clear_uncovers_and_removes(store):
+    d0, d1 = datetime.date(2020, 1, 1), datetime.date(2020, 1, 3)
+    store.write(d0, d1, [transaction('2020-01-01', 1), transaction('2020-01-02', 2)])
+    store.clear(datetime.date(2020, 1, 2), datetime.date(2020, 1, 2))
+
+    assert store.missing(d0, d1) == [(datetime.date(2020, 1, 2), datetime.date(2020, 1, 2))]
+    assert [obj['userTransactionId'] for obj in store.read(d0, d1)] == [1]
+
+
+def test_iter_read_skips_days(store):
+    d0, d1 = datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)
+    store.write(d0, d1, [transaction('2020-01-01', 1), transaction('2020-01-02', 2)])
+
+    assert [obj['userTransactionId'] for obj in store.iter_read(d0, d1, skip={'2020-01-01'})] == [2]
+
+
+def test_fill_rewrites_each_partition_once(store, monkeypatch):
+    rewrites: list = []
+    rewrite = finance.partitions.PartitionStore._rewrite
+
+    def counted(self, month: str, *args, **kwargs):
+        rewrites.append(month)
+        return rewrite(self, month, *args, **kwargs)
+
+    monkeypatch.setattr(finance.partitions.PartitionStore, '_rewrite', counted)
+
+    d0, d1 = datetime.date(2020, 1, 1), datetime.date(2020, 3, 31)
+    days: list = [f'{day:%Y-%m-%d}' for day in finance.partitions.days_in(d0, d1)]
+    pages: list = [[transaction(day, n) for n, day in enumerate(days[i:i + 10], start=i)]
+                   for i in range(0, len(days), 10)][::-1]
+
+    passed: list = list(store.fill(d0, d1, iter(pages)))
+
+    assert passed == pages
+    assert sorted(rewrites) == ['2020-01', '2020-02', '2020-03']
+    assert store.missing(d0, d1) == []
+    assert len(store.read(d0, d1)) == len(days)
+
+
+def test_fill_covers_only_when_consumed(store):
+    d0, d1 = datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)
+    pages = store.fill(d0, d1, [[transaction('2020-01-02', 1)], [transaction('2020-01-01', 2)]])
+    next(pages)
+
+    assert store.missing(d0, d1) == [(d0, d1)]
+
+
+def test_fill_replaces_the_days_of_months_without_pages(store):
+    d0, d1 = datetime.date(2020, 1, 1), datetime.date(2020, 2, 29)
+    store.write(d0, d1, [transaction('2020-01-05', 1), transaction('2020-02-05', 2)])
+    list(store.fill(d0, d1, [[transaction('2020-02-06', 3)]]))
+
+    assert [obj['userTransactionId'] for obj in store.read(d0, d1)] == [3]
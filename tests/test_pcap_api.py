@@ -0,0 +1,90 @@
+"""
+Tests of the Personal Capital login, against fake personalcapital clients.
+"""
+import types
+import json
+import sys
+
+
+import pytest
+import requests
+
+
+import finance.pcap.api
+
+
+class Response:
+    def json(self) -> dict:
+        return {'spHeader': {'success': True, 'authLevel': 'SESSION_AUTHENTICATED'}}
+
+
+class PersonalCapital:
+    """
+    A client that keeps its csrf token and session in private attributes, like the personalcapital package.
+    """
+    logins: int = 0
+
+    def __init__(self):
+        self.__csrf = ''
+        self.__session = requests.Session()
+        self.cookies: dict = {}
+
+    def login(self, username: str, password: str):
+        PersonalCapital.logins += 1
+        self.__csrf = 'csrf-login'
+
+    def fetch(self, endpoint: str, data: dict = None) -> Response:
+        return Response()
+
+    def get_session(self) -> dict:
+        return self.cookies
+
+    def set_session(self, cookies: dict):
+        self.cookies = cookies
+
+
+class OtherPersonalCapital(PersonalCapital):
+    """
+    A client of another version of the package, without the private attributes.
+    """
+    def __init__(self):
+        super().__init__()
+        del self._PersonalCapital__csrf
+        del self._PersonalCapital__session
+
+    def login(self, username: str, password: str):
+        PersonalCapital.logins += 1
+
+
+@pytest.fixture()
+def handler(tmp_path, monkeypatch):
+    def install(cls: type) -> finance.pcap.api.PCAPHandler:
+        module = types.ModuleType('personalcapital')
+        module.PersonalCapital = cls
+        module.RequireTwoFactorException = type('RequireTwoFactorException', (Exception,), {})
+        module.TwoFactorVerificationModeEnum = types.SimpleNamespace(SMS=0)
+        monkeypatch.setitem(sys.modules, 'personalcapital', module)
+        monkeypatch.setattr(PersonalCapital, 'logins', 0)
+        return finance.pcap.api.PCAPHandler(finance.pcap.api.PCAPConfig(workdir=str(tmp_path)))
+
+    (tmp_path / 'session.json').write_text(json.dumps({'cookies': {'a': 'b'}, 'csrf': 'csrf-saved'}))
+    return install
+
+
+def test_saved_session_is_resumed(handler):
+    client = handler(PersonalCapital).client
+
+    assert PersonalCapital.logins == 0
+    assert finance.pcap.api.ClientSession(client).csrf == 'csrf-saved'
+    assert client.get_session() == {'a': 'b'}
+
+
+def test_clients_without_a_csrf_token_log_in(handler):
+    handler_ = handler(OtherPersonalCapital)
+    client = handler_.client
+
+    assert PersonalCapital.logins == 1
+    assert not finance.pcap.api.ClientSession(client).resumable
+    assert finance.pcap.api.ClientSession(client).http is None
+    with open(handler_.config.cookies) as stream:
+        assert json.load(stream) == {'cookies': {'a': 'b'}, 'csrf': ''}
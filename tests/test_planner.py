@@ -0,0 +1,80 @@
+"""
+Tests of the history interval planner.
+"""
+import datetime
+
+
+import pandas as pd
+import pytest
+
+
+import finance.fake
+import finance.pcap.api
+import finance.pcap.planner
+import finance.pcap.apps.marketvalue
+
+
+def span(m0: int, d0: int, m1: int, d1: int) -> tuple:
+    return datetime.date(2020, m0, d0), datetime.date(2020, m1, d1)
+
+
+@pytest.fixture()
+def planner(tmp_path, monkeypatch) -> finance.pcap.planner.IntervalPlanner:
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    handler = finance.pcap.api.PCAPHandler(
+        finance.pcap.api.PCAPConfig(workdir=str(tmp_path), rate=1e9, burst=10 ** 6))
+    finance.fake.install_pcap(handler, accounts=3)
+    return finance.pcap.planner.IntervalPlanner(handler=handler)
+
+
+def test_chain_of_spans_that_share_dates():
+    spans: list = [span(1, 1, 1, 10), span(1, 10, 1, 20), span(1, 20, 1, 31), span(1, 1, 1, 20)]
+
+    assert finance.pcap.planner.IntervalPlanner.chain(span(1, 1, 1, 31), spans) == [
+        span(1, 1, 1, 20), span(1, 20, 1, 31)]
+
+
+def test_spans_with_a_gap_do_not_chain():
+    spans: list = [span(1, 1, 1, 10), span(1, 11, 1, 20)]
+
+    assert finance.pcap.planner.IntervalPlanner.chain(span(1, 1, 1, 20), spans) is None
+
+
+def test_derived_interval_matches_the_fetched_interval(planner):
+    t0: datetime.datetime = datetime.datetime(2020, 1, 1)
+    weeks: list = [(t0 + datetime.timedelta(days=7 * w), 7) for w in range(4)]
+    planner.frames(weeks)
+
+    plan: finance.pcap.planner.Plan = planner.plan([(t0, 28)])
+    assert plan.fetch == [] and list(plan.derive) == [span(1, 1, 1, 29)]
+
+    derived: pd.DataFrame = planner.frames([(t0, 28)])[0]
+    planner.force = True
+    fetched: pd.DataFrame = planner.frames([(t0, 28)])[0]
+
+    columns: list = list(finance.pcap.planner.ADDITIVE)
+    pd.testing.assert_frame_equal(derived[columns], fetched[columns])
+
+
+def test_month_after_days_matches_the_sum_of_the_days(planner):
+    _, days = finance.pcap.apps.marketvalue.days_of_month(2020, 3)
+    _, months = finance.pcap.apps.marketvalue.months_of_year(2020)
+    month: pd.DataFrame = months.iloc[2:3]
+
+    daily: pd.DataFrame = pd.concat(finance.pcap.apps.marketvalue.get_histories(
+        days, force=False, handler=planner.handler), ignore_index=True)
+    assert len(planner.plan(zip(month['t0'], month['dt'])).derive) == 1
+
+    derived: pd.DataFrame = finance.pcap.apps.marketvalue.get_histories(
+        month, force=False, handler=planner.handler)[0]
+
+    columns: list = list(finance.pcap.planner.ADDITIVE)
+    summed: pd.DataFrame = daily.groupby(by='userAccountId')[columns].sum()
+    pd.testing.assert_frame_equal(derived.set_index('userAccountId')[columns].sort_index(), summed,
+                                  check_names=False)
+
+
+def test_ynab_dates_are_utc():
+    times: pd.Series = pd.Series([pd.Timestamp('2020-01-31 23:59:59.999999')])
+
+    assert str(finance.pcap.apps.marketvalue.utc(times)[0]) == '2020-01-31 23:59:59.999999+00:00'
@@ -0,0 +1,59 @@
+"""
+Tests of the market value transactions pushed into YNAB.
+"""
+import datetime
+
+
+import pandas as pd
+import pytest
+
+
+import finance.fake
+import finance.ynab.api
+import finance.ynab.push
+
+
+@pytest.fixture()
+def handler(tmp_path, monkeypatch) -> finance.ynab.api.YNABHandler:
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    handler = finance.ynab.api.YNABHandler(finance.ynab.api.YNABConfig(workdir=str(tmp_path), rate=1e9))
+    finance.fake.install_ynab(handler, accounts=3, transactions=0)
+    return handler
+
+
+def histories(*intervals: tuple) -> pd.DataFrame:
+    return pd.DataFrame([{
+        'accountName': 'Brokerage', 'userAccountId': 7, 't0': pd.Timestamp(t0), 't1': pd.Timestamp(t1),
+        'dateRangePerformanceValueChange': change} for t0, t1, change in intervals])
+
+
+def test_import_id_is_deterministic():
+    a: str = finance.ynab.push.import_id('market', 7, '2020-01-01', '2020-01-31')
+
+    assert a == finance.ynab.push.import_id('market', 7, '2020-01-01', '2020-01-31')
+    assert a != finance.ynab.push.import_id('market', 7, '2020-01-01', '2020-02-01')
+    assert a.startswith('FS:') and len(a) <= 36
+
+
+def test_incomplete_intervals_are_not_pushed(handler):
+    mapping: list = [{'pcap': 'Brokerage', 'budget': 'Budget 0', 'account': 'Account 1'}]
+    frame: pd.DataFrame = histories(
+        ('2020-01-01', '2020-01-31 23:59:59', 10.0),
+        ('2020-02-01', '2020-02-10 23:59:59', 20.0),
+        ('2020-02-01', '2020-02-29 23:59:59', 30.0),
+        ('2019-12-01', '2019-12-31 23:59:59', 0.0))
+
+    budgets: dict = finance.ynab.push.market_value_transactions(
+        frame, mapping, handler=handler, today=datetime.date(2020, 2, 10))
+
+    assert [(t['date'], t['amount']) for t in budgets['budget-0']] == [('2020-01-31', 10000)]
+    assert budgets['budget-0'][0]['account_id'] == 'budget-0-account-1'
+
+
+def test_pushing_again_creates_duplicates(handler):
+    mapping: list = [{'pcap': 7, 'budget': 'budget-0', 'account': 'Account 0'}]
+    frame: pd.DataFrame = histories(('2020-01-01', '2020-01-31 23:59:59', 10.0))
+    budgets: dict = finance.ynab.push.market_value_transactions(frame, mapping, handler=handler)
+
+    assert finance.ynab.push.push_transactions(handler, budgets) == {'budget-0': {'created': 1, 'duplicates': 0}}
+    assert finance.ynab.push.push_transactions(handler, budgets) == {'budget-0': {'created': 0, 'duplicates': 1}}
@@ -0,0 +1,43 @@
+"""
+Tests of the shared dataframes of the scrapers.
+"""
+
+
+import pytest
+
+
+import finance.fake
+import finance.memo
+import finance.pcap.api
+import finance.pcap.scrapers
+
+
+@pytest.fixture()
+def handler(tmp_path, monkeypatch):
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    handler = finance.pcap.api.PCAPHandler(
+        finance.pcap.api.PCAPConfig(workdir=str(tmp_path), rate=1e9, burst=10 ** 6))
+    finance.fake.install_pcap(handler, holdings=50)
+    finance.memo.frames.clear()
+    return handler
+
+
+def test_shared_frames_can_be_changed_in_place(handler):
+    finance.pcap.scrapers.HoldingsScraper(handler).reload()
+
+    first = finance.pcap.scrapers.HoldingsScraper(handler).frame
+    first.loc[:, 'quantity'] = -1.0
+    first['price'] = first['price'].fillna(0.0) * 0
+
+    second = finance.pcap.scrapers.HoldingsScraper(handler).frame
+    assert (second['quantity'] > 0).all()
+    assert (second['price'] > 0).all()
+
+
+def test_shared_frames_are_built_once(handler):
+    finance.pcap.scrapers.HoldingsScraper(handler).reload()
+    first = finance.pcap.scrapers.HoldingsScraper(handler).frame
+    second = finance.pcap.scrapers.HoldingsScraper(handler).frame
+
+    assert first.equals(second)
+    assert len(finance.memo.frames) == 1
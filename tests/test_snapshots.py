@@ -0,0 +1,76 @@
+"""
+Tests of the daily snapshot store, and of the changes between the snapshots of a scraper.
+"""
+import datetime
+
+
+import pytest
+
+
+import finance.snapshots
+import finance.pcap.api
+import finance.pcap.scrapers
+
+
+KEYS: tuple = ('userAccountId', 'ticker', 'cusip')
+
+
+def holding(account: int, ticker: str, cusip, quantity: float, **kwargs) -> dict:
+    return dict({'accountName': f'Account {account}', 'userAccountId': account, 'ticker': ticker, 'cusip': cusip,
+                 'quantity': quantity, 'price': 10.0, 'value': quantity * 10.0}, **kwargs)
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return finance.snapshots.SnapshotStore(str(tmp_path / 'snapshots'), KEYS, 'yaml', period=30)
+
+
+def test_delta_holds_only_the_changes(store):
+    before = store.state_of([holding(0, 'A', '1', 1.0), holding(0, 'B', '2', 2.0), holding(1, 'C', None, 3.0)])
+    after = store.state_of([holding(0, 'A', '1', 1.0), holding(0, 'B', '2', 5.0), holding(2, 'D', '4', 4.0)])
+
+    delta = store.delta(before, after)
+    assert {'userAccountId': 0, 'ticker': 'B', 'cusip': '2', 'quantity': 5.0, 'value': 50.0} in delta
+    assert {'userAccountId': 1, 'ticker': 'C', 'cusip': None, '__deleted__': True} in delta
+    assert dict(holding(2, 'D', '4', 4.0), __added__=True) in delta
+    assert len(delta) == 3
+
+    assert store.apply(before, delta) == after
+
+
+def test_apply_keeps_repeated_keys_and_removed_fields(store):
+    before = store.state_of([holding(0, 'A', None, 1.0), holding(0, 'A', None, 2.0, note='x')])
+    after = store.state_of([holding(0, 'A', None, 1.0), holding(0, 'A', None, 3.0)])
+
+    delta = store.delta(before, after)
+    assert len(delta) == 1
+    assert delta[0]['__n__'] == 1 and delta[0]['__removed__'] == ['note']
+    assert store.apply(before, delta) == after
+
+
+def test_days_are_read_back_from_fulls_and_deltas(store):
+    days = [datetime.date(2020, 1, 1) + datetime.timedelta(days=i) for i in range(3)]
+    data = [[holding(0, 'A', '1', 1.0 + i), holding(1, 'B', None, 2.0)] for i in range(3)]
+
+    for day, objects in zip([days[0], days[2], days[1]], [data[0], data[2], data[1]]):
+        store.write(day, objects)
+
+    assert store.manifest() == {'2020-01-01': 'full', '2020-01-02': 'delta', '2020-01-03': 'delta'}
+    reopened = finance.snapshots.SnapshotStore(store.root, KEYS, 'yaml')
+    for day, objects in zip(days, data):
+        assert reopened.read(day) == objects
+
+
+def test_changes_match_missing_keys(tmp_path, monkeypatch):
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    handler = finance.pcap.api.PCAPHandler(finance.pcap.api.PCAPConfig(workdir=str(tmp_path)))
+    scraper = finance.pcap.scrapers.HoldingsScraper(handler)
+    assert scraper.snapshots is scraper.snapshots
+
+    a, b = datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)
+    scraper.snapshots.write(a, [holding(0, 'A', '1', 1.0), holding(0, 'Cash', None, 5.0), holding(1, 'B', '2', 2.0)])
+    scraper.snapshots.write(b, [holding(0, 'A', '1', 1.0), holding(0, 'Cash', None, 7.0), holding(2, 'C', '3', 3.0)])
+
+    changes = scraper.changes(a, b).set_index('ticker')
+    assert changes['change'].to_dict() == {'Cash': 'changed', 'B': 'removed', 'C': 'added'}
+    assert changes.loc['Cash', 'quantity_change'] == 2.0
@@ -0,0 +1,69 @@
+"""
+Tests of the token buckets of the request scheduler.
+"""
+import multiprocessing
+import threading
+import time
+
+
+import finance.throttle
+
+
+def test_bucket_hands_out_the_burst_at_once():
+    bucket = finance.throttle.TokenBucket(rate=1e-3, burst=3)
+    for _ in range(3):
+        assert bucket._take() == 0.0
+
+    assert bucket._take() > 0.0
+
+
+def test_bucket_serves_waiting_requests_by_priority():
+    bucket = finance.throttle.TokenBucket(rate=5, burst=1)
+    bucket.acquire()
+    served: list = []
+
+    def request(priority: int):
+        bucket.acquire(priority)
+        served.append(priority)
+
+    threads: list = []
+    for priority in (finance.throttle.BACKGROUND, finance.throttle.INTERACTIVE):
+        threads.append(threading.Thread(target=request, args=(priority,)))
+        threads[-1].start()
+        while len(bucket._waiting) < len(threads):
+            time.sleep(0.001)
+
+    for thread in threads:
+        thread.join()
+
+    assert served == [finance.throttle.INTERACTIVE, finance.throttle.BACKGROUND]
+
+
+def test_blocked_bucket_waits():
+    bucket = finance.throttle.TokenBucket(rate=1e6, burst=10)
+    bucket.block(0.05)
+
+    start: float = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+def take_all(path: str, count: int) -> int:
+    bucket = finance.throttle.SharedTokenBucket(1e-3, 5, path, 'test')
+    return sum(1 for _ in range(count) if bucket._take() == 0.0)
+
+
+def test_shared_bucket_is_shared_by_processes(tmp_path):
+    path: str = str(tmp_path / 'cache' / 'throttle.sqlite')
+    with multiprocessing.get_context('spawn').Pool(2) as pool:
+        taken: list = pool.starmap(take_all, [(path, 5), (path, 5)])
+
+    assert sum(taken) == 5
+    assert take_all(path, 1) == 0
+
+
+def test_shared_bucket_block_is_shared(tmp_path):
+    path: str = str(tmp_path / 'throttle.sqlite')
+    finance.throttle.SharedTokenBucket(1e6, 5, path, 'test').block(60)
+
+    assert finance.throttle.SharedTokenBucket(1e6, 5, path, 'test')._take() > 50
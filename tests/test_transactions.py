@@ -0,0 +1,129 @@
+"""
+Tests of the PCAP transactions scraper against the synthetic client.
+"""
+import datetime
+import os
+
+
+import pytest
+
+
+import finance.fake
+import finance.pcap.api
+import finance.pcap.scrapers
+import finance.warehouse
+import finance.store
+
+
+@pytest.fixture()
+def pcap(tmp_path, monkeypatch) -> tuple:
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    config = finance.pcap.api.PCAPConfig(workdir=str(tmp_path), rate=1e9, burst=10 ** 6)
+    handler = finance.pcap.api.PCAPHandler(config)
+    client = finance.fake.install_pcap(
+        handler, transactions=20_000, start=datetime.date(2020, 1, 1), end=datetime.date(2020, 12, 31))
+    return handler, client
+
+
+def test_reload_syncs_without_keeping_objects(pcap):
+    handler, client = pcap
+    scraper = finance.pcap.scrapers.TransactionsScraper(handler, t0=datetime.datetime(2020, 1, 1), dt=90, hot=0)
+    scraper.reload()
+
+    assert scraper._data is None
+    assert scraper.partitions.missing(datetime.date(2020, 1, 1), datetime.date(2020, 3, 31)) == []
+    assert len(scraper.data) == len(scraper.frame) == 91 * client.per_day
+
+
+def test_covered_days_are_not_fetched_again(pcap):
+    handler, client = pcap
+    finance.pcap.scrapers.TransactionsScraper(handler, t0=datetime.datetime(2020, 1, 1), dt=30, hot=0).reload()
+    requests: int = client.requests
+
+    scraper = finance.pcap.scrapers.TransactionsScraper(handler, t0=datetime.datetime(2020, 1, 10), dt=5, hot=0)
+    assert len(scraper.data) == 6 * client.per_day
+    assert client.requests == requests
+
+
+def test_stream_matches_the_pages(pcap):
+    handler, client = pcap
+    scraper = finance.pcap.scrapers.TransactionsScraper(handler, t0=datetime.datetime(2020, 2, 1), dt=40, hot=0)
+    streamed: list = [obj['userTransactionId'] for obj in scraper.stream()]
+
+    fetched: list = [obj['userTransactionId'] for page in scraper.iter_pages(
+        datetime.date(2020, 2, 1), datetime.date(2020, 3, 12)) for obj in page]
+    assert sorted(streamed) == sorted(fetched)
+
+
+def test_refetched_days_replace_the_warehouse_rows(pcap, monkeypatch):
+    handler, client = pcap
+    handler.config.warehouse = True
+    t0: datetime.datetime = datetime.datetime(2020, 1, 1)
+    finance.pcap.scrapers.TransactionsScraper(handler, t0=t0, dt=9, hot=0).reload()
+
+    warehouse = finance.warehouse.of(handler.config.workdir)
+    with warehouse._lock:
+        warehouse._db.execute("UPDATE pcap_transactions SET userTransactionId = -userTransactionId - 1 "
+                              "WHERE transactionDate < '2020-01-03'")
+        warehouse._db.commit()
+
+    finance.pcap.scrapers.TransactionsScraper(handler, t0=t0, dt=9, hot=0, force=True).reload()
+
+    frame = warehouse.select('pcap_transactions', ['userTransactionId'])
+    assert len(frame) == 10 * client.per_day
+    assert (frame['userTransactionId'] >= 0).all()
+
+
+@pytest.mark.parametrize('t0, dt', [(datetime.datetime(2020, 2, 1), 28), (datetime.datetime(2020, 1, 15), 60)])
+def test_archived_frames_match_the_built_frames(pcap, t0, dt):
+    handler, client = pcap
+    handler.config.dt = datetime.datetime(2020, 3, 5)
+    scraper = finance.pcap.scrapers.TransactionsScraper(handler, t0=t0, dt=dt).reload()
+    assert scraper.gaps()
+
+    archived = scraper.frame
+    assert scraper._data is None
+    assert any(name.endswith('.arrow') for name in os.listdir(scraper.partitions.root))
+
+    handler.config.archive = False
+    built = finance.pcap.scrapers.TransactionsScraper(handler, t0=t0, dt=dt).frame
+    assert len(archived) == (dt + 1) * client.per_day
+    assert archived.astype({'accountName': object}).equals(built.astype({'accountName': object}))
+
+    archived.loc[:, 'amount'] = 0.0
+    assert (archived['amount'] == 0.0).all()
+
+
+def test_histories_are_not_archived(pcap):
+    handler, client = pcap
+    finance.pcap.scrapers.HistoriesScraper(handler, t0=datetime.datetime(2020, 1, 1), dt=0).reload().frame
+
+    assert not [name for name in os.listdir(os.path.join(handler.config.workdir, 'cache')) if name.endswith('.arrow')]
+
+
+def test_legacy_cache_file_only_fills_the_missing_days(pcap):
+    handler, client = pcap
+    t0: datetime.datetime = datetime.datetime(2020, 1, 1)
+    scraper = finance.pcap.scrapers.TransactionsScraper(handler, t0=t0, dt=19, hot=0)
+    stale: list = [dict(obj, amount=-1.0) for page in scraper.iter_pages(t0.date(), scraper.t1.date()) for obj in page]
+    finance.store.dump(stale, scraper.store)
+
+    finance.pcap.scrapers.TransactionsScraper(handler, t0=t0, dt=9, hot=0).reload()
+    requests: int = client.requests
+    assert scraper.gaps() == []
+    assert client.requests == requests
+
+    amounts: dict = {obj['transactionDate'][:10]: obj['amount'] for obj in scraper.data}
+    assert all(amount != -1.0 for day, amount in amounts.items() if day <= '2020-01-10')
+    assert all(amount == -1.0 for day, amount in amounts.items() if day > '2020-01-10')
+    assert len(scraper.data) == 20 * client.per_day
+
+
+@pytest.mark.parametrize('archive', [True, False])
+def test_frames_are_sorted_by_all_columns(pcap, archive):
+    handler, client = pcap
+    handler.config.archive = archive
+    frame = finance.pcap.scrapers.TransactionsScraper(
+        handler, t0=datetime.datetime(2020, 1, 15), dt=60, hot=0).reload().frame
+
+    assert frame.equals(frame.sort_values(by=list(frame.columns)).reset_index(drop=True))
@@ -0,0 +1,64 @@
+"""
+Tests of the YNAB delta scrapers against the synthetic API.
+"""
+import json
+import os
+
+
+import pytest
+
+
+import finance.fake
+import finance.ynab.api
+import finance.ynab.scrapers
+
+
+@pytest.fixture()
+def ynab(tmp_path, monkeypatch) -> tuple:
+    monkeypatch.setenv('FINANCE_WAREHOUSE', '0')
+    handler = finance.ynab.api.YNABHandler(finance.ynab.api.YNABConfig(workdir=str(tmp_path), rate=1e9))
+    api = finance.fake.install_ynab(handler, accounts=5, transactions=100)
+    return handler, api
+
+
+def test_reload_syncs_once_per_day(ynab):
+    handler, api = ynab
+    first = finance.ynab.scrapers.AccountsScraper(handler, budget_id='budget-0').reload()
+    requests: int = api.requests
+
+    second = finance.ynab.scrapers.AccountsScraper(handler, budget_id='budget-0').reload()
+
+    assert api.requests == requests
+    assert second.data == first.data
+
+
+def test_reload_syncs_the_next_day(ynab):
+    handler, api = ynab
+    scraper = finance.ynab.scrapers.TransactionsScraper(handler, budget_id='budget-0').reload()
+    with open(scraper.knowledge_path, 'w') as stream:
+        json.dump({'server_knowledge': 1, 'date': '2000-01-01'}, stream)
+    requests: int = api.requests
+
+    scraper = finance.ynab.scrapers.TransactionsScraper(handler, budget_id='budget-0').reload()
+
+    assert api.requests == requests + 1
+    assert len(scraper.data) == 100
+    assert scraper.synced == f'{handler.config.dt:%Y-%m-%d}'
+    assert not any(name.startswith('.tmp-') for name in os.listdir(os.path.dirname(scraper.knowledge_path)))
+
+
+def test_last_used_budget_is_fetched_in_full(ynab, monkeypatch):
+    handler, api = ynab
+    knowledges: list = []
+    fetch_delta = finance.ynab.scrapers.AccountsScraper.fetch_delta
+
+    def spy(self, knowledge):
+        knowledges.append(knowledge)
+        return fetch_delta(self, knowledge)
+
+    monkeypatch.setattr(finance.ynab.scrapers.AccountsScraper, 'fetch_delta', spy)
+    for _ in range(2):
+        scraper = finance.ynab.scrapers.AccountsScraper(handler, budget_id='last-used').reload()
+        assert len(scraper.data) == 5
+
+    assert knowledges == [None, None]